@@ -1,13 +1,13 @@
-from django.apps import AppConfig
-
-
-class CoreConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'core'
-    
-    def ready(self):
-        # import signals (side-effect registers receivers)
-        try:
-            import core.signals  # noqa
-        except Exception:
-            pass
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+    
+    def ready(self):
+        # import signals (side-effect registers receivers)
+        try:
+            import core.signals  # noqa
+        except Exception:
+            pass
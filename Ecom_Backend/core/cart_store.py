@@ -0,0 +1,202 @@
+# core/cart_store.py
+"""
+Anonymous carts kept out of the database.
+
+GET /api/cart/my/ no longer creates anything for a visitor without a cart:
+it renders an empty cart. A Cart row (and the session pointing at it) is
+written by the first add, through /api/cart/my/ops/.
+
+With ANONYMOUS_CART_STORE set, anonymous carts skip the database entirely:
+their lines live in a signed cookie ("cookie") or in a cache backend keyed
+by a random cookie token ("cache", ANONYMOUS_CART_CACHE alias), or in any
+CartStore subclass given by dotted path. They become rows only
+
+- at login: the next cart request of the now authenticated visitor merges
+  the lines into the user's cart (`promote`) and clears the store, or
+- at checkout: OrderCreateAPIView orders the stored lines and clears them.
+
+A store holds (product id, size, quantity) lines only; titles, prices and
+totals are read from the catalog whenever the cart is rendered.
+"""
+import re
+import secrets
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+from . import carts
+from .models import CartItem, Product, ordered_images_prefetch
+
+MAX_AGE = 60 * 60 * 24 * 30
+MAX_LINES = 50
+
+STORES = {
+    "cookie": "core.cart_store.CookieCartStore",
+    "cache": "core.cart_store.CacheCartStore",
+}
+
+
+class CartStore:
+    """Reads and writes the cart lines of the requesting visitor."""
+
+    cookie_name = "cart"
+
+    def load(self, request):
+        raise NotImplementedError
+
+    def save(self, request, response, lines):
+        raise NotImplementedError
+
+    def set_cookie(self, response, value):
+        response.set_cookie(
+            self.cookie_name, value, max_age=MAX_AGE, httponly=True,
+            secure=settings.SESSION_COOKIE_SECURE, samesite=settings.SESSION_COOKIE_SAMESITE,
+        )
+
+
+class CookieCartStore(CartStore):
+    """The lines themselves, signed (not encrypted) in the `cart` cookie."""
+
+    salt = "core.cart_store"
+
+    def load(self, request):
+        value = request.COOKIES.get(self.cookie_name)
+        if not value:
+            return []
+        try:
+            return clean_lines(signing.loads(value, salt=self.salt, max_age=MAX_AGE))
+        except signing.BadSignature:
+            return []
+
+    def save(self, request, response, lines):
+        if lines:
+            self.set_cookie(response, signing.dumps([list(line) for line in lines], salt=self.salt, compress=True))
+        else:
+            response.delete_cookie(self.cookie_name, samesite=settings.SESSION_COOKIE_SAMESITE)
+
+
+class CacheCartStore(CartStore):
+    """Lines in a cache backend under a random token kept in the `cart_token` cookie."""
+
+    cookie_name = "cart_token"
+    token_re = re.compile(r"[\w-]{20,64}")
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "ANONYMOUS_CART_CACHE", "default")]
+
+    def token(self, request):
+        token = request.COOKIES.get(self.cookie_name) or ""
+        return token if self.token_re.fullmatch(token) else None
+
+    def load(self, request):
+        token = self.token(request)
+        return clean_lines(self.cache.get(f"anon-cart:{token}")) if token else []
+
+    def save(self, request, response, lines):
+        token = self.token(request)
+        if lines:
+            token = token or secrets.token_urlsafe(24)
+            self.cache.set(f"anon-cart:{token}", [list(line) for line in lines], MAX_AGE)
+            self.set_cookie(response, token)
+        else:
+            if token:
+                self.cache.delete(f"anon-cart:{token}")
+            response.delete_cookie(self.cookie_name, samesite=settings.SESSION_COOKIE_SAMESITE)
+
+
+def get_store():
+    """The configured CartStore, or None while anonymous carts are Cart rows."""
+    name = getattr(settings, "ANONYMOUS_CART_STORE", None)
+    if not name:
+        return None
+    return import_string(STORES.get(name, name))()
+
+
+def clean_lines(data):
+    """[(product id, size, quantity)] from stored data, dropping anything malformed."""
+    lines = []
+    for line in data if isinstance(data, list) else ():
+        try:
+            pid, size, quantity = line
+        except (TypeError, ValueError):
+            continue
+        if isinstance(pid, int) and isinstance(size, str) and isinstance(quantity, int) and quantity > 0:
+            lines.append((pid, size, quantity))
+    return lines[:MAX_LINES]
+
+
+def load(request):
+    """Lines of the visitor's ephemeral cart (pending changes included)."""
+    pending = getattr(request, "_cart_lines", None)
+    if pending is not None:
+        return pending
+    store = get_store()
+    return store.load(request) if store else []
+
+
+def save(request, lines):
+    """Stage `lines` as the visitor's cart; `write` puts them on the response."""
+    request._cart_lines = list(lines)
+
+
+def write(request, response):
+    lines = getattr(request, "_cart_lines", None)
+    store = get_store()
+    if lines is not None and store is not None:
+        store.save(request, response, lines)
+    return response
+
+
+def apply_ops(lines, ops):
+    """`lines` after the cart ops `ops` (see carts.plan_ops)."""
+    quantities = {(pid, size): quantity for pid, size, quantity in lines}
+    wanted, _ = carts.plan_ops(ops, quantities)
+    for key, (quantity, _) in wanted.items():
+        quantities[key] = quantity
+    result = [(pid, size, quantity) for (pid, size), quantity in quantities.items() if quantity]
+    if len(result) > MAX_LINES:
+        raise carts.CartOpError(len(ops) - 1, f"A cart holds at most {MAX_LINES} lines.")
+    return result
+
+
+def promote(request, cart):
+    """
+    Merge the visitor's ephemeral lines into `cart` (a Cart row) and clear
+    the store. Lines whose product or size is no longer sold are dropped.
+    """
+    ops = [
+        {"op": "add", "product_id": pid, "size": size, "quantity": quantity}
+        for pid, size, quantity in load(request)
+    ]
+    if not ops:
+        return False
+    while ops:
+        try:
+            carts.apply_ops(cart, ops)
+            break
+        except carts.CartOpError as exc:
+            del ops[exc.index]
+    save(request, [])
+    return True
+
+
+class EphemeralCart:
+    """Unsaved stand-in for a Cart, rendered by the same serializers."""
+
+    id = user = created = updated = None
+
+    def __init__(self, lines, compact=False):
+        products = Product.objects.filter(pk__in={pid for pid, _, _ in lines}, is_active=True)
+        if not compact:
+            # what cart_items_prefetch loads for a stored cart
+            products = products.select_related("brand").prefetch_related(ordered_images_prefetch(), "colors", "sizes")
+        by_id = {product.pk: product for product in products}
+        self.items = [
+            CartItem(product=by_id[pid], size=size, quantity=quantity)
+            for pid, size, quantity in lines if pid in by_id
+        ]
+        self.item_count = sum(item.quantity for item in self.items)
+        self.subtotal = sum((item.line_total() for item in self.items), carts.ZERO)
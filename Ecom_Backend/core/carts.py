@@ -0,0 +1,245 @@
+# core/carts.py
+"""
+Stored cart totals (Cart.subtotal / Cart.item_count).
+
+Every code path that changes cart lines calls `apply_delta` inside the same
+transaction: one `UPDATE cart SET subtotal = subtotal + x, item_count =
+item_count + n` with F() expressions, so concurrent changes to one cart add
+up instead of overwriting each other, and reading the totals (navbar badge,
+/api/cart/my/summary/) never touches the items.
+
+Line amounts use the product price at the time of the change. Price edits
+or writes made outside these paths leave the stored totals stale;
+`refresh_totals` recomputes given carts exactly and `reconcile` (manage.py
+reconcile_cart_totals) sweeps every cart and fixes the ones that drifted.
+
+`add_line` is the increment path of add_item: an F() UPDATE of the line,
+falling back to an INSERT, so parallel adds never lose quantity.
+
+`apply_ops` applies a batch of add / set / remove operations
+(/api/cart/{id}/ops/) with one upsert and one DELETE, whatever the batch size.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import inventory
+from .models import Cart, CartItem, Product
+
+ZERO = Decimal("0.00")
+BATCH_SIZE = 1000
+OPS = ("add", "set", "remove")
+MAX_OPS = 100
+
+
+class CartOpError(ValueError):
+    """An operation of a batch cannot be applied; `index` is its position."""
+
+    def __init__(self, index, message):
+        super().__init__(message)
+        self.index = index
+
+
+def line_amount(price, quantity):
+    return (price or ZERO) * Decimal(quantity)
+
+
+def apply_delta(cart, quantity, amount):
+    """
+    Add `quantity` items worth `amount` (both may be negative) to the totals
+    of `cart` (an instance, whose fields are reloaded, or a primary key).
+    `updated` is set as well: .update() skips auto_now, and the purge of
+    abandoned carts (core.purge) goes by it.
+    """
+    if not quantity and not amount:
+        return
+    cart_id = getattr(cart, "pk", cart)
+    Cart.objects.filter(pk=cart_id).update(
+        item_count=F("item_count") + quantity,
+        subtotal=F("subtotal") + amount,
+        updated=timezone.now(),
+    )
+    if isinstance(cart, Cart):
+        cart.refresh_from_db(fields=["item_count", "subtotal", "updated"])
+
+
+def add_line(cart, product, size, quantity, variant=None):
+    """
+    Add `quantity` of `product` in `size` to `cart` and to its totals.
+
+    The line is incremented in SQL (UPDATE ... SET quantity = quantity + n);
+    only when no row matched is one inserted, in a savepoint. If a parallel
+    request inserted the same line first, the unique (cart, product, size)
+    key rejects the INSERT and the UPDATE is retried against its row; any
+    other IntegrityError (no such line appeared) is re-raised.
+    """
+    lines = CartItem.objects.filter(cart_id=cart.pk, product_id=product.pk, size=size)
+    increment = {"quantity": F("quantity") + quantity, "variant": variant}
+    with transaction.atomic():
+        if not lines.update(**increment):
+            try:
+                with transaction.atomic():
+                    CartItem.objects.create(cart_id=cart.pk, product=product, size=size, quantity=quantity, variant=variant)
+            except IntegrityError:
+                if not lines.update(**increment):
+                    raise
+        apply_delta(cart, quantity, line_amount(product.price, quantity))
+
+
+def clear(cart):
+    """Delete every line of `cart` and zero its totals."""
+    with transaction.atomic():
+        CartItem.objects.filter(cart=cart).delete()
+        Cart.objects.filter(pk=cart.pk).update(item_count=0, subtotal=ZERO, updated=timezone.now())
+
+
+def items_totals(items):
+    """(quantity, amount) of a CartItem queryset, in one query."""
+    quantity, amount = 0, ZERO
+    for qty, price in items.values_list("quantity", "product__price"):
+        quantity += qty
+        amount += line_amount(price, qty)
+    return quantity, amount
+
+
+def computed_totals(cart_ids):
+    """{cart id: (item count, subtotal)} from the cart lines, for `cart_ids`."""
+    totals = defaultdict(lambda: (0, ZERO))
+    for cart_id, qty, price in CartItem.objects.filter(cart_id__in=cart_ids).values_list(
+        "cart_id", "quantity", "product__price",
+    ):
+        count, subtotal = totals[cart_id]
+        totals[cart_id] = (count + qty, subtotal + line_amount(price, qty))
+    return totals
+
+
+def refresh_totals(cart_ids):
+    """Recompute the stored totals of `cart_ids` from their lines."""
+    cart_ids = list(cart_ids)
+    totals = computed_totals(cart_ids)
+    with transaction.atomic():
+        for cart_id in cart_ids:
+            count, subtotal = totals[cart_id]
+            Cart.objects.filter(pk=cart_id).update(item_count=count, subtotal=subtotal)
+
+
+def reconcile(batch_size=BATCH_SIZE, dry_run=False, progress=None):
+    """
+    Compare stored and computed totals for every cart, walking the primary
+    key in batches; rewrite the carts that differ. Returns (checked, fixed).
+    """
+    checked = fixed = 0
+    last_id = 0
+    while True:
+        stored = list(
+            Cart.objects.filter(pk__gt=last_id).order_by("pk")
+            .values_list("pk", "item_count", "subtotal")[:batch_size]
+        )
+        if not stored:
+            break
+        last_id = stored[-1][0]
+        totals = computed_totals([pk for pk, _, _ in stored])
+        drifted = [
+            (pk, totals[pk]) for pk, count, subtotal in stored
+            if (count, subtotal) != totals[pk]
+        ]
+        if drifted and not dry_run:
+            # a correction is not visitor activity: `updated` stays, so the
+            # purge still sees an abandoned cart as abandoned
+            with transaction.atomic():
+                for pk, (count, subtotal) in drifted:
+                    Cart.objects.filter(pk=pk).update(item_count=count, subtotal=subtotal)
+        checked += len(stored)
+        fixed += len(drifted)
+        if progress:
+            progress(checked, fixed)
+    return checked, fixed
+
+
+def plan_ops(ops, quantities):
+    """
+    Fold `ops` - dicts with "op" (add / set / remove), "product_id", "size"
+    and "quantity" - in order over `quantities` ({(product id, size):
+    quantity} of the current lines). Returns ({(product id, size):
+    (quantity, variant)} for every line the ops touch, {product id: price}).
+    Raises CartOpError for an unknown product or size.
+    """
+    products = {
+        pid: (price, active)
+        for pid, price, active in Product.objects.filter(
+            pk__in={op["product_id"] for op in ops},
+        ).values_list("id", "price", "is_active")
+    }
+    variants = inventory.variant_lookup(products)
+    wanted = {}
+    for index, op in enumerate(ops):
+        pid, size = op["product_id"], (op.get("size") or "").strip()
+        if pid not in products:
+            raise CartOpError(index, f"Unknown product {pid}.")
+        key = (pid, size)
+        before = wanted[key][0] if key in wanted else quantities.get(key, 0)
+        if op["op"] == "remove":
+            quantity = 0
+        elif op["op"] == "set":
+            quantity = op["quantity"]
+        else:
+            quantity = before + op["quantity"]
+        variant = None
+        if quantity:
+            variant = variants.get((pid, size.lower()))
+            # a line that only shrinks may keep a size that no longer resolves
+            # (a blank size from before sizes were required): checkout asks
+            if quantity > before and (variant is None or not products[pid][1]):
+                raise CartOpError(index, inventory.size_error(f"Product {pid}", size))
+        wanted[key] = (quantity, variant)
+    return wanted, {pid: price for pid, (price, _) in products.items()}
+
+
+def apply_ops(cart, ops):
+    """
+    Apply `ops` (see plan_ops) to `cart`, in order and in one transaction.
+
+    The ops are folded into a final quantity per (product, size) line first,
+    so the writes are one INSERT ... ON CONFLICT (cart, product, size) DO
+    UPDATE for the lines that stay, one DELETE for the lines that drop to
+    zero, and one totals update. Raises CartOpError (nothing written) for an
+    unknown product or size. Returns (lines written, lines deleted).
+    """
+    with transaction.atomic():
+        # one batch per cart at a time where the database has row locks
+        list(Cart.objects.select_for_update().filter(pk=cart.pk).values_list("pk"))
+        current = {
+            (item.product_id, item.size): item
+            for item in CartItem.objects.filter(
+                cart=cart, product_id__in={op["product_id"] for op in ops},
+            ).only("id", "product_id", "size", "quantity")
+        }
+        wanted, prices = plan_ops(ops, {key: item.quantity for key, item in current.items()})
+
+        upserts, deletes = [], []
+        count, amount = 0, ZERO
+        for (pid, size), (quantity, variant) in wanted.items():
+            item = current.get((pid, size))
+            before = item.quantity if item else 0
+            if quantity == before:
+                continue
+            count += quantity - before
+            amount += line_amount(prices[pid], quantity - before)
+            if quantity:
+                upserts.append(CartItem(cart_id=cart.pk, product_id=pid, size=size, quantity=quantity, variant=variant))
+            else:
+                deletes.append(item.pk)
+        if upserts:
+            CartItem.objects.bulk_create(
+                upserts,
+                update_conflicts=True,
+                unique_fields=["cart", "product", "size"],
+                update_fields=["quantity", "variant"],
+            )
+        if deletes:
+            CartItem.objects.filter(pk__in=deletes).delete()
+        apply_delta(cart, count, amount)
+    return len(upserts), len(deletes)
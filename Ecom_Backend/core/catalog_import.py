@@ -0,0 +1,524 @@
+# core/catalog_import.py
+"""
+Streaming bulk catalog importer (used by `manage.py import_catalog`).
+
+Input is read record by record and written in chunks, so memory stays
+bounded by the chunk size regardless of file size:
+
+- JSON: a Django fixture array (as in core/fixtures/*.json), parsed
+  incrementally object by object. brand / color / size records are upserted
+  by pk, product records reference them by pk.
+- NDJSON: one JSON object per line, either fixture records or flat product
+  records (see below).
+- CSV: flat product records, one per row. Multi-valued columns (sizes,
+  colors, images) are "|"-separated; a color is "Name" or "Name:#hex" (a
+  new color named without a code is created with an empty hex).
+
+A flat product record looks like:
+
+    {"slug": "marco-tan-loafer", "title": "Marco", "price": "2499.00",
+     "brand": "Marco", "sizes": ["UK(6)", "UK(7)"],
+     "colors": [{"name": "Tan", "hex": "#d2b48c"}],
+     "images": ["products/marco-tan-loafer.jpg"], ...}
+
+Products are upserted on `slug` with bulk_create(update_conflicts=True), their
+sizes / colors through rows are replaced with one DELETE and one bulk
+INSERT per chunk (images likewise, when the record lists them). Brand / Color / Size rows are resolved through in-memory
+lookup caches and only created on a miss.
+
+Bulk writes bypass model signals, so the importer refreshes the search
+index and the size variants (core.inventory) per chunk, and once at the end
+recomputes similar products (core.recommendations; skipped with
+`refresh_similar=False`, then run `manage.py rebuild_similar_products`) and
+bumps the catalog version. A record's `stock` seeds the variants of sizes
+the product did not have yet; existing variants keep their stock, and
+Product.stock is reset to the variant total.
+
+Fixture image records name their product by its fixture pk, while products
+are upserted on slug and may get another database pk. The pk pairs of every
+chunk go to a temporary table (PK_TABLE) that later chunks resolve image
+records against, so memory stays bounded by the chunk size here too.
+"""
+import csv
+import gzip
+import io
+import json
+import logging
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+from django.utils.text import slugify
+
+from . import inventory, recommendations, search
+from .models import Brand, Color, Product, ProductImage, Size
+from .response_cache import bump_catalog_version
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_FIELDS = [
+    "title", "subtitle", "price", "mrp", "description", "category",
+    "style", "brand", "rating", "stock", "is_active",
+]
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+# fixture product pk -> database pk, per connection for the length of a run
+PK_TABLE = "core_import_product_pks"
+
+
+class ImportRecordError(ValueError):
+    pass
+
+
+# ---------- readers ----------
+def iter_json_array(fh, buffer_size=64 * 1024):
+    """Yield the objects of a top-level JSON array without loading the file."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    started = False
+    eof = False
+    while True:
+        if not eof and len(buf) < buffer_size:
+            chunk = fh.read(buffer_size)
+            if chunk:
+                buf += chunk
+            else:
+                eof = True
+        buf = buf.lstrip()
+        if not started:
+            if not buf:
+                if eof:
+                    return
+                continue
+            if buf[0] != "[":
+                raise ImportRecordError("JSON input must be an array of records.")
+            buf = buf[1:]
+            started = True
+            continue
+        buf = buf.lstrip(", \t\r\n")
+        if buf.startswith("]"):
+            return
+        if not buf:
+            if eof:
+                raise ImportRecordError("Unexpected end of JSON input.")
+            continue
+        try:
+            obj, end = decoder.raw_decode(buf)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # object continues past the buffer: read more
+            chunk = fh.read(buffer_size)
+            if chunk:
+                buf += chunk
+            else:
+                eof = True
+            continue
+        yield obj
+        buf = buf[end:]
+
+
+def iter_ndjson(fh):
+    for lineno, line in enumerate(fh, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ImportRecordError(f"line {lineno}: {exc}")
+
+
+def _split(value):
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [v.strip() for v in str(value).split("|") if v.strip()]
+
+
+def iter_csv(fh):
+    for row in csv.DictReader(fh):
+        record = {k: (v if v != "" else None) for k, v in row.items() if k}
+        record["sizes"] = _split(record.get("sizes"))
+        colors = []
+        for raw in _split(record.get("colors")):
+            name, _, hex_ = raw.partition(":")
+            colors.append({"name": name.strip(), "hex": hex_.strip()})
+        record["colors"] = colors
+        yield record
+
+
+READERS = {"json": iter_json_array, "ndjson": iter_ndjson, "csv": iter_csv}
+
+
+def detect_format(path):
+    lower = path.lower()
+    if lower.endswith(".gz"):
+        lower = lower[:-3]
+    if lower.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if lower.endswith(".csv"):
+        return "csv"
+    return "json"
+
+
+# ---------- importer ----------
+@dataclass
+class ImportStats:
+    products_created: int = 0
+    products_updated: int = 0
+    lookups: int = 0
+    images: int = 0
+    skipped: int = 0
+    errors: list = field(default_factory=list)
+
+    @property
+    def products(self):
+        return self.products_created + self.products_updated
+
+
+@dataclass
+class _Row:
+    product: Product
+    sizes: list
+    colors: list
+    images: list = None  # None: leave existing images alone
+    source_pk: int = None
+
+
+class CatalogImporter:
+    def __init__(self, chunk_size=1000, progress=None, refresh_similar=None):
+        self.chunk_size = chunk_size
+        self.progress = progress
+        if refresh_similar is None:
+            refresh_similar = getattr(settings, "SIMILAR_PRODUCTS_AUTO_REFRESH", True)
+        self.refresh_similar = refresh_similar
+        self.stats = ImportStats()
+        self.brands = {}
+        self.colors = {}
+        self.sizes = {}
+        self.brand_pks = set()
+        self.color_pks = set()
+        self.size_pks = set()
+        # PK_TABLE exists on this connection
+        self._pk_table = False
+        self._rows = []
+        self._images = []
+        self._load_lookups()
+
+    def _load_lookups(self):
+        for pk, name, slug in Brand.objects.values_list("id", "name", "slug"):
+            self._remember_brand(pk, name, slug)
+        for pk, name, hex_ in Color.objects.values_list("id", "name", "hex"):
+            self._remember_color(pk, name, hex_)
+        for pk, label in Size.objects.values_list("id", "label"):
+            self._remember_size(pk, label)
+
+    def _remember_brand(self, pk, name, slug):
+        self.brand_pks.add(pk)
+        self.brands[slug] = pk
+        self.brands[name.lower()] = pk
+
+    def _remember_color(self, pk, name, hex_):
+        self.color_pks.add(pk)
+        self.colors[(name.lower(), hex_.lower())] = pk
+        self.colors.setdefault((name.lower(), ""), pk)
+
+    def _remember_size(self, pk, label):
+        self.size_pks.add(pk)
+        self.sizes[label.lower()] = pk
+
+    # -- lookup resolution: cache first, create on a miss --
+    @staticmethod
+    def _known_pk(pks, value, kind):
+        pk = int(value)
+        if pk not in pks:
+            raise ImportRecordError(f"unknown {kind} pk {value}")
+        return pk
+
+    def _brand_id(self, value, by_pk):
+        if value in (None, ""):
+            return None
+        if by_pk:
+            return self._known_pk(self.brand_pks, value, "brand")
+        name = str(value).strip()
+        pk = self.brands.get(slugify(name)) or self.brands.get(name.lower())
+        if pk is None:
+            brand = Brand.objects.create(name=name, slug=slugify(name))
+            self._remember_brand(brand.pk, brand.name, brand.slug)
+            self.stats.lookups += 1
+            pk = brand.pk
+        return pk
+
+    def _color_id(self, value, by_pk):
+        if by_pk:
+            return self._known_pk(self.color_pks, value, "color")
+        if isinstance(value, dict):
+            name, hex_ = (value.get("name") or "").strip(), (value.get("hex") or "").strip()
+        else:
+            name, hex_ = str(value).strip(), ""
+        pk = self.colors.get((name.lower(), hex_.lower()))
+        if pk is None:
+            # no code given: leave it empty rather than invent one
+            color = Color.objects.create(name=name, hex=hex_)
+            self._remember_color(color.pk, color.name, hex_)
+            self.stats.lookups += 1
+            pk = color.pk
+        return pk
+
+    def _size_id(self, value, by_pk):
+        if by_pk:
+            return self._known_pk(self.size_pks, value, "size")
+        label = str(value).strip()
+        pk = self.sizes.get(label.lower())
+        if pk is None:
+            size = Size.objects.create(label=label)
+            self._remember_size(size.pk, size.label)
+            self.stats.lookups += 1
+            pk = size.pk
+        return pk
+
+    # -- fixture records --
+    def _upsert_lookup(self, model, pk, fields):
+        if model == "core.brand":
+            Brand.objects.update_or_create(pk=pk, defaults={"name": fields["name"], "slug": fields["slug"]})
+            self._remember_brand(pk, fields["name"], fields["slug"])
+        elif model == "core.color":
+            Color.objects.update_or_create(pk=pk, defaults={"name": fields["name"], "hex": fields["hex"]})
+            self._remember_color(pk, fields["name"], fields["hex"])
+        elif model == "core.size":
+            Size.objects.update_or_create(pk=pk, defaults={"label": fields["label"]})
+            self._remember_size(pk, fields["label"])
+        else:
+            return False
+        self.stats.lookups += 1
+        return True
+
+    def _add_fixture_image(self, fields):
+        product_pk = int(fields["product"])
+        self._images.append((product_pk, fields["image"], fields.get("alt_text") or "", int(fields.get("order") or 0)))
+
+    # -- products --
+    def _build_row(self, data, by_pk, source_pk=None):
+        slug = (data.get("slug") or "").strip() or slugify(data.get("title") or "")
+        if not slug:
+            raise ImportRecordError("product needs a slug or title")
+        try:
+            price = Decimal(str(data["price"]))
+            mrp = Decimal(str(data["mrp"])) if data.get("mrp") not in (None, "") else None
+        except (KeyError, InvalidOperation):
+            raise ImportRecordError(f"{slug}: invalid or missing price")
+        is_active = data.get("is_active", True)
+        if isinstance(is_active, str):
+            is_active = is_active.strip().lower() in TRUE_VALUES
+        product = Product(
+            slug=slug,
+            title=data.get("title") or "",
+            subtitle=data.get("subtitle") or "",
+            price=price,
+            mrp=mrp,
+            description=data.get("description") or "",
+            category=data.get("category") or "womens",
+            style=data.get("style") or "",
+            brand_id=self._brand_id(data.get("brand"), by_pk),
+            rating=float(data.get("rating") or 0),
+            stock=int(data.get("stock") or 0),
+            is_active=bool(is_active),
+        )
+        created = data.get("created")
+        product.created = parse_datetime(created) if isinstance(created, str) and created else None
+        images = data.get("images")
+        return _Row(
+            product=product,
+            sizes=[self._size_id(v, by_pk) for v in _split(data.get("sizes"))],
+            colors=[self._color_id(v, by_pk) for v in _split(data.get("colors"))],
+            images=_split(images) if images is not None else None,
+            source_pk=source_pk,
+        )
+
+    def _add(self, record):
+        if "model" not in record:
+            self._rows.append(self._build_row(record, by_pk=False))
+            return
+        model = record["model"].lower()
+        fields = record.get("fields") or {}
+        if model == "core.product":
+            self._rows.append(self._build_row(fields, by_pk=True, source_pk=record.get("pk")))
+        elif model == "core.productimage":
+            self._add_fixture_image(fields)
+        elif not self._upsert_lookup(model, record.get("pk"), fields):
+            raise ImportRecordError(f"unsupported model {record['model']}")
+
+    def run(self, records):
+        try:
+            for index, record in enumerate(records, 1):
+                try:
+                    self._add(record)
+                except (ImportRecordError, KeyError, TypeError, ValueError) as exc:
+                    self.stats.skipped += 1
+                    if len(self.stats.errors) < 20:
+                        self.stats.errors.append(f"record {index}: {exc}")
+                    continue
+                if len(self._rows) + len(self._images) >= self.chunk_size:
+                    self.flush()
+            self.flush()
+        finally:
+            self._drop_pk_table()
+        # bulk writes skipped the model signals
+        if self.refresh_similar and self.stats.products:
+            recommendations.rebuild()
+        transaction.on_commit(bump_catalog_version)
+        return self.stats
+
+    @transaction.atomic
+    def flush(self):
+        if self._rows:
+            self._write_products(self._rows)
+        if self._images:
+            self._write_fixture_images(self._images)
+        self._rows, self._images = [], []
+        if self.progress:
+            self.progress(self.stats)
+
+    def _write_products(self, rows):
+        # the last occurrence of a slug within a chunk wins
+        rows = list({row.product.slug: row for row in rows}.values())
+        existing = set(Product.objects.filter(slug__in=[r.product.slug for r in rows]).values_list("slug", flat=True))
+
+        products = [row.product for row in rows]
+        dated = [(p, p.created) for p in products if p.created is not None]
+        # one INSERT .. ON CONFLICT(slug) DO UPDATE per batch; bulk_update's
+        # CASE WHEN statements are far slower at this size
+        Product.objects.bulk_create(
+            products,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["slug"],
+            update_fields=PRODUCT_FIELDS,
+        )
+        if any(p.pk is None for p in products):
+            pks = dict(Product.objects.filter(slug__in=[p.slug for p in products]).values_list("slug", "id"))
+            for product in products:
+                product.pk = pks[product.slug]
+        if dated:
+            # auto_now_add stamped `created` on insert; restore the imported value
+            created_field = Product._meta.get_field("created")
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f"UPDATE {Product._meta.db_table} SET created = %s WHERE id = %s",
+                    [(created_field.get_db_prep_value(created, connection), p.pk) for p, created in dated],
+                )
+
+        ids = [row.product.pk for row in rows]
+        self._remember_product_pks([(int(r.source_pk), r.product.pk) for r in rows if r.source_pk is not None])
+        self._replace_through(Product.sizes.through, "size_id", ids, ((r.product.pk, r.sizes) for r in rows))
+        self._replace_through(Product.colors.through, "color_id", ids, ((r.product.pk, r.colors) for r in rows))
+        inventory.sync_variants(ids)
+
+        with_images = [r for r in rows if r.images is not None]
+        if with_images:
+            self._replace_images(with_images)
+
+        search.index_products(row.product for row in rows)
+        self.stats.products_updated += len(existing)
+        self.stats.products_created += len(rows) - len(existing)
+
+    @staticmethod
+    def _replace_through(through, column, product_ids, pairs):
+        through.objects.filter(product_id__in=product_ids).delete()
+        through.objects.bulk_create(
+            [through(product_id=pk, **{column: value}) for pk, values in pairs for value in set(values)],
+            batch_size=1000,
+        )
+
+    def _replace_images(self, rows):
+        current = {}
+        for product_id, name in (
+            ProductImage.objects.filter(product_id__in=[r.product.pk for r in rows])
+            .order_by("order", "id")
+            .values_list("product_id", "image")
+        ):
+            current.setdefault(product_id, []).append(name)
+        # re-importing an unchanged row should not touch its images
+        changed = [r for r in rows if current.get(r.product.pk, []) != r.images]
+        if not changed:
+            return
+        ProductImage.objects.filter(product_id__in=[r.product.pk for r in changed]).delete()
+        images = [
+            ProductImage(product_id=r.product.pk, image=name, order=order)
+            for r in changed
+            for order, name in enumerate(r.images)
+        ]
+        ProductImage.objects.bulk_create(images, batch_size=1000)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"UPDATE {Product._meta.db_table} SET primary_image = %s, image_count = %s WHERE id = %s",
+                [(r.images[0] if r.images else "", len(r.images), r.product.pk) for r in changed],
+            )
+        self.stats.images += len(images)
+
+    # -- fixture pk -> database pk, kept in the database --
+    def _remember_product_pks(self, pairs):
+        if not pairs:
+            return
+        with connection.cursor() as cursor:
+            if not self._pk_table:
+                cursor.execute(f"DROP TABLE IF EXISTS {PK_TABLE}")
+                cursor.execute(f"CREATE TEMPORARY TABLE {PK_TABLE} (source_pk integer PRIMARY KEY, pk integer NOT NULL)")
+                self._pk_table = True
+            # a later record for the same fixture pk wins
+            cursor.executemany(f"DELETE FROM {PK_TABLE} WHERE source_pk = %s", [[source_pk] for source_pk, _ in pairs])
+            cursor.executemany(f"INSERT INTO {PK_TABLE} (source_pk, pk) VALUES (%s, %s)", pairs)
+
+    def _product_pks(self, source_pks):
+        if not self._pk_table or not source_pks:
+            return {}
+        source_pks = sorted(source_pks)
+        found = {}
+        with connection.cursor() as cursor:
+            for start in range(0, len(source_pks), 500):
+                batch = source_pks[start:start + 500]
+                cursor.execute(
+                    f"SELECT source_pk, pk FROM {PK_TABLE} WHERE source_pk IN ({', '.join(['%s'] * len(batch))})",
+                    batch,
+                )
+                found.update(cursor.fetchall())
+        return found
+
+    def _drop_pk_table(self):
+        if self._pk_table:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {PK_TABLE}")
+            self._pk_table = False
+
+    def _write_fixture_images(self, images):
+        product_pks = self._product_pks({source_pk for source_pk, *_ in images})
+        resolved = []
+        for source_pk, name, alt_text, order in images:
+            pk = product_pks.get(source_pk)
+            if pk is None:
+                self.stats.skipped += 1
+                continue
+            resolved.append((pk, name, alt_text, order))
+        if not resolved:
+            return
+        product_ids = {pk for pk, *_ in resolved}
+        present = set(ProductImage.objects.filter(product_id__in=product_ids).values_list("product_id", "image"))
+        new = [
+            ProductImage(product_id=pk, image=name, alt_text=alt_text, order=order)
+            for pk, name, alt_text, order in resolved
+            if (pk, name) not in present
+        ]
+        ProductImage.objects.bulk_create(new, batch_size=1000)
+        self.stats.images += len(new)
+        for pk in product_ids:
+            Product.refresh_image_summary(pk)
+
+
+def open_records(path, fmt):
+    """Open `path` and return (file handle, record iterator) for format `fmt`."""
+    opener = gzip.open if path.lower().endswith(".gz") else io.open
+    fh = opener(path, "rt", encoding="utf-8", newline="" if fmt == "csv" else None)
+    return fh, READERS[fmt](fh)
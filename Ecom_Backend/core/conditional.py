@@ -0,0 +1,66 @@
+# core/conditional.py
+"""
+Conditional GET (ETag / Last-Modified) for read-only content endpoints.
+
+Validators come from the content version counters in core.response_cache,
+which model signals bump on every write. They are shared database rows, so
+a worker never keeps answering 304 for content another process changed.
+Computing them costs one primary-key lookup per namespace: the body is never rendered or hashed, and a matching
+If-None-Match / If-Modified-Since is answered with 304 before the view
+(and its serializer) runs at all.
+
+Usage on a DRF view or viewset:
+
+    @conditional_get("catalog", "list", "retrieve")
+    class ProductViewSet(...):
+
+or `@conditional_get(("catalog", "stock"), "list")` for a body that also
+shows stock.
+"""
+import hashlib
+from datetime import datetime, timezone
+
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from .response_cache import request_state
+
+
+def make_etag_func(namespaces):
+    def etag_func(request, *args, **kwargs):
+        raw = "|".join((
+            *namespaces,
+            *(str(request_state(request, namespace)[0]) for namespace in namespaces),
+            request.get_host(),
+            request.get_full_path(),
+            request.META.get("HTTP_ACCEPT", ""),
+        ))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return etag_func
+
+
+def make_last_modified_func(namespaces):
+    def last_modified_func(request, *args, **kwargs):
+        modified = max(request_state(request, namespace)[1] for namespace in namespaces)
+        return datetime.fromtimestamp(modified, tz=timezone.utc)
+    return last_modified_func
+
+
+def conditional_get(namespace, *method_names):
+    """
+    Class decorator applying django's `condition` to the named handler methods
+    (e.g. "get", or viewset actions such as "list" / "retrieve").
+    `namespace` may be a tuple for a body drawn from several: the validators
+    change with any of them.
+    """
+    namespaces = (namespace,) if isinstance(namespace, str) else tuple(namespace)
+    decorator = condition(
+        etag_func=make_etag_func(namespaces),
+        last_modified_func=make_last_modified_func(namespaces),
+    )
+
+    def wrap(cls):
+        for name in method_names:
+            cls = method_decorator(decorator, name=name)(cls)
+        return cls
+    return wrap
@@ -0,0 +1,246 @@
+# core/exports.py
+"""
+Streaming NDJSON / CSV exports of the catalog and of orders.
+
+Rows come from `QuerySet.iterator(chunk_size=...)` (related rows are
+fetched once per chunk), are encoded one at a time and grouped into ~64 KiB pieces, so
+memory stays flat however many rows are exported. With `compress=True`
+each piece is gzip-compressed and sync-flushed as it is produced, so the
+client receives bytes as soon as the first chunk of rows is read.
+
+Product rows use the flat record shape understood by `import_catalog`, so
+an export can be loaded back as is.
+"""
+import csv
+import json
+import zlib
+from decimal import Decimal
+from itertools import islice
+
+from .models import Order, OrderItem, Product, ProductImage
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+DEFAULT_CHUNK_SIZE = 2000
+FLUSH_BYTES = 64 * 1024
+
+PRODUCT_COLUMNS = [
+    "id", "slug", "title", "subtitle", "price", "mrp", "description", "category", "style",
+    "brand", "sizes", "colors", "images", "rating", "stock", "is_active", "created",
+]
+ORDER_ITEM_COLUMNS = [
+    "order_id", "created", "user_id", "email", "payment_method", "paid", "total_amount",
+    "item_id", "product_id", "title", "size", "price", "quantity", "line_total",
+]
+
+
+# ---------- rows ----------
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _grouped(rows):
+    groups = {}
+    for key, *value in rows:
+        groups.setdefault(key, []).append(value[0] if len(value) == 1 else value)
+    return groups
+
+
+def product_records(chunk_size=DEFAULT_CHUNK_SIZE):
+    # values rows + one query per relation per chunk; model instances and
+    # prefetch_related are several times slower for a full dump
+    rows = (
+        Product.objects.order_by("id")
+        .values_list(
+            "id", "slug", "title", "subtitle", "price", "mrp", "description", "category", "style",
+            "brand__name", "rating", "stock", "is_active", "created",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    for batch in _batches(rows, chunk_size):
+        ids = [row[0] for row in batch]
+        sizes = _grouped(
+            Product.sizes.through.objects.filter(product_id__in=ids)
+            .order_by("size_id").values_list("product_id", "size__label")
+        )
+        colors = _grouped(
+            Product.colors.through.objects.filter(product_id__in=ids)
+            .order_by("color_id").values_list("product_id", "color__name", "color__hex")
+        )
+        images = _grouped(
+            ProductImage.objects.filter(product_id__in=ids)
+            .order_by("order", "id").values_list("product_id", "image")
+        )
+        for (pk, slug, title, subtitle, price, mrp, description, category, style,
+             brand, rating, stock, is_active, created) in batch:
+            yield {
+                "id": pk,
+                "slug": slug,
+                "title": title,
+                "subtitle": subtitle,
+                "price": price,
+                "mrp": mrp,
+                "description": description,
+                "category": category,
+                "style": style,
+                "brand": brand,
+                "sizes": sizes.get(pk, []),
+                "colors": [{"name": name, "hex": hex_} for name, hex_ in colors.get(pk, [])],
+                "images": images.get(pk, []),
+                "rating": rating,
+                "stock": stock,
+                "is_active": is_active,
+                "created": created,
+            }
+
+
+def order_records(chunk_size=DEFAULT_CHUNK_SIZE, since=None, until=None):
+    qs = Order.objects.order_by("id")
+    if since is not None:
+        qs = qs.filter(created__gte=since)
+    if until is not None:
+        qs = qs.filter(created__lt=until)
+    rows = qs.values_list(
+        "id", "created", "user_id", "fullname", "email", "payment_method", "paid",
+        "total_amount", "shipping_address",
+    ).iterator(chunk_size=chunk_size)
+    for batch in _batches(rows, chunk_size):
+        items = _grouped(
+            OrderItem.objects.filter(order_id__in=[row[0] for row in batch])
+            .order_by("id").values_list("order_id", "id", "product_id", "title", "size", "price", "quantity")
+        )
+        for pk, created, user_id, fullname, email, payment_method, paid, total_amount, shipping_address in batch:
+            yield {
+                "id": pk,
+                "created": created,
+                "user_id": user_id,
+                "fullname": fullname,
+                "email": email,
+                "payment_method": payment_method,
+                "paid": paid,
+                "total_amount": total_amount,
+                "shipping_address": shipping_address,
+                "items": [
+                    {
+                        "id": item_id,
+                        "product_id": product_id,
+                        "title": title,
+                        "size": size,
+                        "price": price,
+                        "quantity": quantity,
+                        "line_total": (price or Decimal("0")) * Decimal(quantity),
+                    }
+                    for item_id, product_id, title, size, price, quantity in items.get(pk, [])
+                ],
+            }
+
+
+def order_item_rows(orders):
+    """Flatten order records to one CSV row per order item."""
+    for order in orders:
+        for item in order["items"]:
+            yield {
+                "order_id": order["id"],
+                "created": order["created"],
+                "user_id": order["user_id"],
+                "email": order["email"],
+                "payment_method": order["payment_method"],
+                "paid": order["paid"],
+                "total_amount": order["total_amount"],
+                "item_id": item["id"],
+                "product_id": item["product_id"],
+                "title": item["title"],
+                "size": item["size"],
+                "price": item["price"],
+                "quantity": item["quantity"],
+                "line_total": item["line_total"],
+            }
+
+
+# ---------- encoders ----------
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def ndjson_lines(records):
+    for record in records:
+        yield json.dumps(record, default=_json_default, ensure_ascii=False) + "\n"
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        # same "|" / "Name:#hex" conventions import_catalog reads back
+        return "|".join(
+            f"{v['name']}:{v['hex']}" if isinstance(v, dict) else str(v) for v in value
+        )
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(records, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for record in records:
+        yield writer.writerow([_csv_value(record.get(c)) for c in columns])
+
+
+def buffered(lines, flush_bytes=FLUSH_BYTES):
+    """
+    Encode text lines to UTF-8 and group them into ~flush_bytes pieces.
+    The first line goes out on its own so the response starts right away.
+    """
+    parts, size = [], 0
+    for index, line in enumerate(lines):
+        data = line.encode("utf-8")
+        parts.append(data)
+        size += len(data)
+        if size >= flush_bytes or index == 0:
+            yield b"".join(parts)
+            parts, size = [], 0
+    if parts:
+        yield b"".join(parts)
+
+
+def gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(dataset, fmt, compress=False, chunk_size=DEFAULT_CHUNK_SIZE, **filters):
+    """Byte chunks of `dataset` ("products" / "orders") encoded as `fmt`."""
+    if dataset == "products":
+        records, columns = product_records(chunk_size), PRODUCT_COLUMNS
+    elif dataset == "orders":
+        records, columns = order_records(chunk_size, **filters), None
+        if fmt == "csv":
+            records, columns = order_item_rows(records), ORDER_ITEM_COLUMNS
+    else:
+        raise ValueError(f"unknown dataset {dataset!r}")
+    if fmt == "ndjson":
+        lines = ndjson_lines(records)
+    elif fmt == "csv":
+        lines = csv_lines(records, columns)
+    else:
+        raise ValueError(f"unknown format {fmt!r}")
+    chunks = buffered(lines)
+    return gzipped(chunks) if compress else chunks
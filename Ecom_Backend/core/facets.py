@@ -0,0 +1,250 @@
+# core/facets.py
+"""
+In-memory facet index for the category filter sidebar.
+
+For every category the index keeps one bitset per facet value (style, size,
+brand, color). Bit N is set when active product N has that value, so the
+products matching a filter combination are a handful of integer ANDs and a
+facet count is `bits.bit_count()` - no database round-trip per request.
+
+The index is built lazily on first use and remembers the catalog version
+(core.response_cache) it is at. Every catalog write bumps that shared
+version - from any worker, import_catalog, the admin or a migration. A
+request that finds it moved catches the index up: when every bump since
+was recorded with the products it touched, only those products are re-read
+and their bits replaced; a bump of unknown scope (brand / color / size
+edits, imports) means a full rebuild. While one thread catches up, the
+others answer from the previous bits, as SuggestIndex does.
+"""
+import threading
+from collections import defaultdict
+
+from .models import Brand, Color, Product, Size
+from .response_cache import catalog_changes, catalog_version
+
+DIMENSIONS = ("style", "size", "brand", "color")
+
+# bucket key used for "no category" (all active products)
+ALL = None
+
+
+class _Bucket:
+    __slots__ = ("all", "style", "size", "brand", "color")
+
+    def __init__(self):
+        self.all = 0
+        self.style = defaultdict(int)
+        self.size = defaultdict(int)
+        self.brand = defaultdict(int)
+        self.color = defaultdict(int)
+
+
+class FacetIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        # catalog version the bits are at; None until built / after invalidate()
+        self._version = None
+        self._buckets = {}
+        self._style_labels = {}
+        self._sizes = {}
+        self._brands = {}
+        self._colors = {}
+
+    # ---- maintenance ----
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+
+    def build(self, version=None):
+        # read the version first: a write landing mid-build leaves it stale, not wrong
+        version = catalog_version() if version is None else version
+        rows, sizes, colors = self._read_products(Product.objects.filter(is_active=True))
+        with self._lock:
+            self._buckets = {}
+            self._style_labels = {}
+            self._load_metadata()
+            for pid, category, style, brand_id in rows:
+                self._add(pid, category, style, brand_id, sizes.get(pid, ()), colors.get(pid, ()))
+            self._version = version
+
+    def update_products(self, product_ids, version):
+        """Replace the bits of `product_ids` with their current rows (inactive or deleted ones drop out)."""
+        products = Product.objects.filter(pk__in=product_ids, is_active=True)
+        rows, sizes, colors = self._read_products(products)
+        with self._lock:
+            known = (
+                all(brand_id is None or brand_id in self._brands for _, _, _, brand_id in rows)
+                and all(sid in self._sizes for ids in sizes.values() for sid in ids)
+                and all(cid in self._colors for ids in colors.values() for cid in ids)
+            )
+            if not known:
+                self._load_metadata()
+            keep = ~sum(1 << pid for pid in product_ids)
+            for bucket in self._buckets.values():
+                bucket.all &= keep
+                for dimension in DIMENSIONS:
+                    table = getattr(bucket, dimension)
+                    for key in table:
+                        table[key] &= keep
+            for pid, category, style, brand_id in rows:
+                self._add(pid, category, style, brand_id, sizes.get(pid, ()), colors.get(pid, ()))
+            self._version = version
+
+    def catch_up(self, version):
+        """Move the index to `version`: re-read only the products changed since, or rebuild."""
+        changed = catalog_changes(self._version, version)
+        if changed is None:
+            self.build(version)
+        else:
+            self.update_products(changed, version)
+
+    def ensure_built(self, version=None):
+        """Build the index, or catch it up if the catalog version moved since."""
+        version = catalog_version() if version is None else version
+        if self._version is not None and version <= self._version:
+            return
+        if self._version is None:
+            with self._build_lock:
+                if self._version is None:
+                    self.build(version)
+            return
+        # stale: one thread catches up, the rest answer from the current bits
+        if self._build_lock.acquire(blocking=False):
+            try:
+                if version > self._version:
+                    self.catch_up(version)
+            finally:
+                self._build_lock.release()
+
+    @staticmethod
+    def _read_products(products):
+        rows = list(products.values_list("id", "category", "style", "brand_id"))
+        sizes = defaultdict(set)
+        for pid, sid in Product.sizes.through.objects.filter(product__in=products).values_list("product_id", "size_id"):
+            sizes[pid].add(sid)
+        colors = defaultdict(set)
+        for pid, cid in Product.colors.through.objects.filter(product__in=products).values_list("product_id", "color_id"):
+            colors[pid].add(cid)
+        return rows, sizes, colors
+
+    def _load_metadata(self):
+        self._sizes = dict(Size.objects.values_list("id", "label"))
+        self._brands = {b[0]: (b[1], b[2]) for b in Brand.objects.values_list("id", "name", "slug")}
+        self._colors = {c[0]: (c[1], c[2]) for c in Color.objects.values_list("id", "name", "hex")}
+
+    def _add(self, pid, category, style, brand_id, size_ids, color_ids):
+        bit = 1 << pid
+        style_key = (style or "").lower()
+        if style_key:
+            self._style_labels.setdefault(style_key, style)
+        for key in ((category or "").lower(), ALL):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket()
+            bucket.all |= bit
+            if style_key:
+                bucket.style[style_key] |= bit
+            if brand_id is not None:
+                bucket.brand[brand_id] |= bit
+            for sid in size_ids:
+                bucket.size[sid] |= bit
+            for cid in color_ids:
+                bucket.color[cid] |= bit
+
+    # ---- querying ----
+    def _resolve(self, dimension, raw):
+        """Map a request param (same syntax as ProductViewSet) to facet keys."""
+        raw = (raw or "").strip()
+        if not raw:
+            return None
+        if dimension == "style":
+            return {raw.lower()}
+        if dimension == "brand":
+            if raw.isdigit():
+                return {int(raw)}
+            return {bid for bid, (_, slug) in self._brands.items() if slug == raw}
+        # color / size accept comma-separated values, any of which matches
+        keys = set()
+        for value in (v.strip().lower() for v in raw.split(",")):
+            if not value:
+                continue
+            if value.isdigit():
+                keys.add(int(value))
+            elif dimension == "color" and value.startswith("#"):
+                keys |= {cid for cid, (_, hex_) in self._colors.items() if hex_.lower() == value}
+            elif dimension == "color":
+                keys |= {cid for cid, (name, _) in self._colors.items() if name.lower() == value}
+            else:
+                keys |= {sid for sid, label in self._sizes.items() if label.lower() == value}
+        return keys
+
+    def facets(self, category=None, version=None, **selected):
+        """
+        Return the filter sidebar payload for `category` with per-value counts.
+
+        `version` is the current catalog version when the caller already has
+        it. `selected` maps dimension -> raw param value. The count for a value is
+        the number of products matching every *other* active filter plus that
+        value, so the sidebar shows what each click would return.
+        """
+        self.ensure_built(version)
+        with self._lock:
+            bucket = self._buckets.get((category or "").lower() if category else ALL) or _Bucket()
+
+            masks = {}
+            for dimension in DIMENSIONS:
+                keys = self._resolve(dimension, selected.get(dimension))
+                if keys is None:
+                    continue
+                table = getattr(bucket, dimension)
+                mask = 0
+                for key in keys:
+                    mask |= table.get(key, 0)
+                masks[dimension] = mask
+
+            def matching(excluding=None):
+                bits = bucket.all
+                for dimension, mask in masks.items():
+                    if dimension != excluding:
+                        bits &= mask
+                return bits
+
+            def counts(dimension):
+                base = matching(excluding=dimension)
+                return {
+                    key: (base & bits).bit_count()
+                    for key, bits in getattr(bucket, dimension).items()
+                    if bits
+                }
+
+            style_counts = counts("style")
+            size_counts = counts("size")
+            brand_counts = counts("brand")
+            color_counts = counts("color")
+
+            return {
+                "style": [
+                    {"id": label, "label": label, "value": label, "count": style_counts[key]}
+                    for key, label in sorted(
+                        ((k, self._style_labels.get(k, k)) for k in style_counts),
+                        key=lambda kv: kv[1].lower(),
+                    )
+                ],
+                "size": [
+                    {"id": sid, "label": self._sizes.get(sid, ""), "count": size_counts[sid]}
+                    for sid in sorted(size_counts)
+                ],
+                "brands": [
+                    {"id": bid, "name": self._brands[bid][0], "slug": self._brands[bid][1], "count": brand_counts[bid]}
+                    for bid in sorted(brand_counts) if bid in self._brands
+                ],
+                "color": [
+                    {"id": cid, "name": self._colors[cid][0], "value": self._colors[cid][1], "count": color_counts[cid]}
+                    for cid in sorted(color_counts) if cid in self._colors
+                ],
+                "total": matching().bit_count(),
+            }
+
+
+facet_index = FacetIndex()
@@ -0,0 +1,133 @@
+# core/fast_render.py
+"""
+Flat, instance-free rendering of the product list payload.
+
+`render_products` builds exactly what `ProductSerializer(many=True).data`
+would for the same products, but from `values_list()` rows joined in plain
+dicts: no model instances, no per-row serializer field machinery. The
+number of queries is fixed (products + brand join, images, colors, sizes)
+regardless of page size.
+
+`manage.py bench_product_list` checks the output is byte-identical to the
+serializer path and reports the throughput difference. Any change to
+ProductSerializer's shape must be mirrored here.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from .images import build_srcset
+from .models import Color, Product, ProductImage, Size
+
+PRODUCT_COLUMNS = (
+    "id", "title", "subtitle", "slug", "price", "mrp", "description",
+    "category", "style", "rating", "stock", "primary_image", "image_count",
+    "brand_id", "brand__name", "brand__slug",
+)
+
+_price_field = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+def _decimal(value):
+    return None if value is None else _price_field.to_representation(value)
+
+
+def _url_builder(request):
+    """Mirror ProductImageSerializer.get_url for a whole page at once."""
+    if request is not None:
+        return request.build_absolute_uri
+    site_protocol = getattr(settings, "SITE_PROTOCOL", None)
+    site_domain = getattr(settings, "SITE_DOMAIN", None)
+    if site_protocol and site_domain:
+        prefix = f"{site_protocol}://{site_domain}"
+        return lambda url: f"{prefix}{url}"
+    return lambda url: url
+
+
+def render_products(ids, request=None, fields=None, active_only=False):
+    """
+    Return ProductSerializer-shaped dicts for `ids`, in the order given.
+    Ids with no product (or no active one, with `active_only`) are skipped.
+
+    `fields` optionally restricts the keys (same semantics as the sparse
+    fieldsets on ProductViewSet); relations that are not requested are not
+    queried.
+    """
+    from .serializers import ProductSerializer
+
+    names = [f for f in ProductSerializer.Meta.fields if fields is None or f in fields]
+    if not ids or not names:
+        return [{} for _ in ids]
+    wanted = set(names)
+
+    products = Product.objects.filter(pk__in=ids)
+    if active_only:
+        products = products.filter(is_active=True)
+    rows = {row[0]: row for row in products.order_by().values_list(*PRODUCT_COLUMNS)}
+    ids = [pid for pid in ids if pid in rows]
+    if not ids:
+        return []
+
+    build_url = _url_builder(request)
+    storage_url = default_storage.url
+
+    images = defaultdict(list)
+    if "images" in wanted:
+        for pid, image_id, name, alt_text, order in (
+            ProductImage.objects.filter(product__in=ids)
+            .order_by("order", "id")
+            .values_list("product_id", "id", "image", "alt_text", "order")
+        ):
+            images[pid].append({
+                "id": image_id,
+                "url": build_url(storage_url(name)) if name else None,
+                "alt_text": alt_text,
+                "order": order,
+                "srcset": build_srcset(name, build_url),
+            })
+
+    colors = defaultdict(list)
+    if "colors" in wanted:
+        for pid, color_id, name, hex_ in (
+            Color.objects.filter(products__in=ids).values_list("products", "id", "name", "hex")
+        ):
+            colors[pid].append({"id": color_id, "name": name, "hex": hex_})
+
+    sizes = defaultdict(list)
+    if "sizes" in wanted:
+        for pid, size_id, label in Size.objects.filter(products__in=ids).values_list("products", "id", "label"):
+            sizes[pid].append({"id": size_id, "label": label})
+
+    out = []
+    for pid in ids:
+        (
+            _, title, subtitle, slug, price, mrp, description,
+            category, style, rating, stock, primary_image, image_count,
+            brand_id, brand_name, brand_slug,
+        ) = rows[pid]
+        values = {
+            "id": pid,
+            "title": title,
+            "subtitle": subtitle,
+            "slug": slug,
+            "price": _decimal(price),
+            "mrp": _decimal(mrp),
+            "description": description,
+            "category": category,
+            "style": style,
+            "brand": (
+                {"id": brand_id, "name": brand_name, "slug": brand_slug}
+                if brand_id is not None else None
+            ),
+            "sizes": sizes.get(pid, []),
+            "colors": colors.get(pid, []),
+            "rating": float(rating),
+            "images": images.get(pid, []),
+            "stock": stock,
+            "main_image": build_url(storage_url(primary_image)) if primary_image else None,
+            "image_count": image_count,
+        }
+        out.append({name: values[name] for name in names})
+    return out
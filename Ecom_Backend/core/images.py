@@ -0,0 +1,180 @@
+# core/images.py
+"""
+On-demand image resizing for media uploads.
+
+`/media/r/<w>x<h>/<path>` serves a downscaled WebP (or JPEG, for clients
+that do not accept WebP) variant of MEDIA_ROOT/<path>. Only the widths /
+heights listed in settings.IMAGE_RESIZE_WIDTHS are accepted (height 0 keeps
+the aspect ratio), so the set of variants per source is bounded.
+
+Variants are written once to IMAGE_RESIZE_CACHE_DIR and served from there
+afterwards. The directory is bounded by IMAGE_RESIZE_CACHE_MAX_BYTES with
+least-recently-used eviction: a hit touches the file's mtime, and when the
+running total exceeds the limit the oldest files are removed down to 90%.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.utils._os import safe_join
+from django.utils.encoding import filepath_to_uri
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTHS = (160, 320, 640, 960, 1280)
+
+FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def resize_widths():
+    return tuple(getattr(settings, "IMAGE_RESIZE_WIDTHS", DEFAULT_WIDTHS))
+
+
+def is_allowed_size(width, height):
+    allowed = resize_widths()
+    return width in allowed and (height == 0 or height in allowed)
+
+
+def resized_url(name, width, height=0):
+    """Relative URL of the `width`x`height` variant of media file `name`."""
+    return f"{settings.MEDIA_URL}r/{width}x{height}/{filepath_to_uri(name)}"
+
+
+def build_srcset(name, build_absolute=None):
+    """`srcset` attribute value listing every configured width of `name`."""
+    if not name:
+        return None
+    parts = []
+    for width in resize_widths():
+        url = resized_url(name, width)
+        if build_absolute is not None:
+            url = build_absolute(url)
+        parts.append(f"{url} {width}w")
+    return ", ".join(parts)
+
+
+class ResizeCache:
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total = None
+
+    def variant_path(self, source, width, height, fmt):
+        stat = source.stat()
+        key = f"{source}|{stat.st_mtime_ns}|{stat.st_size}|{width}x{height}|{fmt}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.{fmt}", digest
+
+    def open(self, source, width, height, fmt):
+        """Return an open binary file of the variant, rendering it on a miss."""
+        path, _ = self.variant_path(source, width, height, fmt)
+        try:
+            handle = open(path, "rb")
+        except FileNotFoundError:
+            pass
+        else:
+            try:
+                os.utime(path)  # LRU: most recently used = newest mtime
+            except OSError:
+                pass
+            return handle
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                render_variant(source, out, width, height, fmt)
+            os.replace(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        # open before accounting: eviction may unlink it, the handle stays valid
+        handle = open(path, "rb")
+        self._account(os.fstat(handle.fileno()).st_size)
+        return handle
+
+    def _scan(self):
+        files = []
+        for entry in self.directory.glob("*/*"):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, entry))
+        return files
+
+    def _account(self, added):
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._scan())
+            else:
+                self._total += added
+            if self._total <= self.max_bytes:
+                return
+            self._total = self.evict(target=int(self.max_bytes * 0.9))
+
+    def evict(self, target):
+        """Delete least recently used variants until the cache is <= target bytes."""
+        files = sorted(self._scan(), key=lambda f: f[0])
+        total = sum(size for _, size, _ in files)
+        for _, size, entry in files:
+            if total <= target:
+                break
+            try:
+                entry.unlink()
+                total -= size
+            except OSError:
+                logger.warning("Could not evict resized image %s", entry)
+        return total
+
+
+class ImageTooLarge(ValueError):
+    """The source has more pixels than Pillow's decompression bomb limit."""
+
+
+def render_variant(source, out, width, height, fmt):
+    from PIL import Image, ImageOps
+
+    pil_format, _, save_kwargs = FORMATS[fmt]
+    try:
+        img = Image.open(source)
+    except Image.DecompressionBombError as exc:
+        raise ImageTooLarge(str(exc)) from exc
+    with img:
+        img = ImageOps.exif_transpose(img)
+        # never upscale: thumbnail only shrinks, keeping the aspect ratio
+        img.thumbnail((width, height or img.height), Image.LANCZOS)
+        if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            rgba = img.convert("RGBA")
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            img = background
+        elif img.mode == "P":
+            img = img.convert("RGBA")
+        img.save(out, pil_format, **save_kwargs)
+
+
+def source_path(name):
+    """Absolute path of media file `name`; raises SuspiciousFileOperation outside MEDIA_ROOT."""
+    return Path(safe_join(str(settings.MEDIA_ROOT), name))
+
+
+_cache = None
+
+
+def get_resize_cache():
+    global _cache
+    directory = Path(getattr(settings, "IMAGE_RESIZE_CACHE_DIR", Path(settings.BASE_DIR) / "media_cache"))
+    max_bytes = getattr(settings, "IMAGE_RESIZE_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+    if _cache is None or _cache.directory != directory or _cache.max_bytes != max_bytes:
+        _cache = ResizeCache(directory, max_bytes)
+    return _cache
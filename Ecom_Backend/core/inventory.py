@@ -0,0 +1,177 @@
+# core/inventory.py
+"""
+Per-size stock on core.ProductVariant.
+
+A product has one variant per size in Product.sizes, or a single size-less
+("one size") variant while it has none. Stock lives on the variants;
+Product.stock is a denormalized total for the list cards, refreshed with one
+UPDATE after the writes that move variant stock.
+
+Checkout (OrderCreateSerializer) locks and decrements only the variant rows
+it sells from, so concurrent orders for different sizes of one shoe no
+longer queue on the Product row.
+
+`sync_variants` creates the variants a product is missing: from
+core.signals when sizes are edited, and from the catalog importer. A new
+product's stock seeds its first variants; when sizes are added to a
+one-size product, the size-less variant's stock is split across them.
+Variants of sizes removed from a product are kept (orders reference them)
+but no longer count: `current_variants` leaves them out of the lookups
+carts and checkout resolve sizes with, and out of Product.stock.
+
+Stock moves bump the "stock" content version, not the catalog one: cached
+product payloads stay addressed and get their stock figures patched in
+(`fresh_stock`), while the facet, suggest and similar-product indexes,
+which never show stock, are left alone.
+
+A blank size resolves only for a product with a single current variant. A
+cart line without one (e.g. added before sizes were required) stays in the
+cart; checkout asks for a size instead of guessing one.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Product, ProductVariant
+from .response_cache import bump_content_version
+
+
+def make_sku(product_id, size_id=None):
+    return f"P{product_id}-{size_id if size_id is not None else 'OS'}"
+
+
+def split_stock(total, parts):
+    """Split `total` into `parts` near-equal integers, the remainder going first."""
+    base, extra = divmod(max(total, 0), parts)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
+
+
+def sync_variants(product_ids):
+    """Create missing variants for `product_ids` and refresh their Product.stock."""
+    product_ids = list(product_ids)
+    if not product_ids:
+        return 0
+    sizes = defaultdict(list)
+    for pid, sid in (
+        Product.sizes.through.objects.filter(product_id__in=product_ids)
+        .order_by("size_id").values_list("product_id", "size_id")
+    ):
+        sizes[pid].append(sid)
+    colors = defaultdict(list)
+    for pid, cid in Product.colors.through.objects.filter(product_id__in=product_ids).values_list("product_id", "color_id"):
+        colors[pid].append(cid)
+    existing = defaultdict(dict)
+    for vid, pid, sid, stock in ProductVariant.objects.filter(product_id__in=product_ids).values_list(
+        "id", "product_id", "size_id", "stock",
+    ):
+        existing[pid][sid] = (vid, stock)
+
+    created, dropped = [], []
+    for pid, stock in Product.objects.filter(pk__in=product_ids).values_list("id", "stock"):
+        wanted = sizes.get(pid) or [None]
+        have = existing.get(pid, {})
+        missing = [sid for sid in wanted if sid not in have]
+        if not missing:
+            continue
+        if not have:
+            seed = stock
+        elif None in have and None not in wanted:
+            # a one-size product got sizes: its stock moves to them
+            vid, seed = have[None]
+            dropped.append(vid)
+        else:
+            seed = 0
+        # a single-color product's variants carry that color
+        color_id = colors[pid][0] if len(colors.get(pid, ())) == 1 else None
+        created.extend(
+            ProductVariant(product_id=pid, size_id=sid, color_id=color_id, sku=make_sku(pid, sid), stock=quantity)
+            for sid, quantity in zip(missing, split_stock(seed, len(missing)))
+        )
+
+    with transaction.atomic():
+        if dropped:
+            ProductVariant.objects.filter(pk__in=dropped).delete()
+        ProductVariant.objects.bulk_create(created, batch_size=1000, ignore_conflicts=True)
+        refresh_product_stock(product_ids)
+    return len(created)
+
+
+def current_variants():
+    """Variants of a size the product still has, or its size-less one."""
+    has_size = Product.sizes.through.objects.filter(product_id=OuterRef("product_id"), size_id=OuterRef("size_id"))
+    return ProductVariant.objects.filter(Q(size__isnull=True) | Exists(has_size))
+
+
+def refresh_product_stock(product_ids):
+    """Recompute Product.stock from the current variants (one UPDATE, no model signals)."""
+    variants = current_variants().filter(product=OuterRef("pk"))
+    total = variants.order_by().values("product").annotate(total=Sum("stock")).values("total")
+    Product.objects.filter(pk__in=list(product_ids)).filter(Exists(variants)).update(
+        stock=Coalesce(Subquery(total), Value(0)),
+    )
+
+
+def stock_changed(product_ids):
+    """After variant stock moved in bulk: refresh totals and cached payloads on commit."""
+    product_ids = set(product_ids)
+
+    def refresh():
+        refresh_product_stock(product_ids)
+        bump_content_version("stock")
+
+    transaction.on_commit(refresh)
+
+
+def fresh_stock(data):
+    """
+    A cached product payload with the current `stock` of every product card
+    and variant (a dict with a `sku`) in it, read in at most two queries.
+    None if a stock figure cannot be traced back to its row (no `id`).
+    """
+    cards, variants = [], []
+    nodes = [data]
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, dict):
+            if "stock" in node:
+                if "id" not in node:
+                    return None
+                (variants if "sku" in node else cards).append(node)
+            nodes.extend(node.values())
+        elif isinstance(node, list):
+            nodes.extend(node)
+    for model, found in ((Product, cards), (ProductVariant, variants)):
+        if found:
+            stock = dict(model.objects.filter(pk__in={node["id"] for node in found}).values_list("id", "stock"))
+            for node in found:
+                node["stock"] = stock.get(node["id"], node["stock"])
+    return data
+
+
+def variant_lookup(product_ids):
+    """
+    {(product id, lower-cased size label): current variant} for `product_ids`.
+    A product with a single current variant is also reachable with a blank size.
+    """
+    table, count = {}, defaultdict(int)
+    for variant in current_variants().filter(product_id__in=list(product_ids)).select_related("size"):
+        label = variant.size.label.strip().lower() if variant.size_id else ""
+        table.setdefault((variant.product_id, label), variant)
+        count[variant.product_id] += 1
+    for (pid, _), variant in list(table.items()):
+        if count[pid] == 1:
+            table.setdefault((pid, ""), variant)
+    return table
+
+
+def size_error(name, size):
+    """Message for a `size` of product `name` that did not resolve to a variant."""
+    if not size:
+        return f"Choose a size for {name}."
+    return f"{name} is not available in size {size!r}."
+
+
+def find_variant(product_id, size):
+    return variant_lookup([product_id]).get((product_id, (size or "").strip().lower()))
@@ -0,0 +1,83 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from core.models import Product
+from core.views import color_exists, size_exists, split_values
+
+DEFAULT_CASES = [
+    "color=black",
+    "color=black,white",
+    "size=uk(6),uk(7)",
+    "category=womens&color=black,white&size=uk(5),uk(6)",
+]
+
+
+def _join_filter(qs, colors, sizes):
+    """The previous pipeline: JOIN the M2M tables, then DISTINCT the whole row."""
+    if colors:
+        match = Q()
+        for value in colors:
+            if value.startswith("#"):
+                match |= Q(colors__hex__lower=value.lower())
+            elif value.isdigit():
+                match |= Q(colors__id=int(value))
+            else:
+                match |= Q(colors__name__lower=value.lower())
+        qs = qs.filter(match)
+    if sizes:
+        match = Q()
+        for value in sizes:
+            match |= Q(sizes__id=int(value)) if value.isdigit() else Q(sizes__label__lower=value.lower())
+        qs = qs.filter(match)
+    return qs.distinct()
+
+
+def _exists_filter(qs, colors, sizes):
+    if colors:
+        qs = qs.filter(color_exists(colors))
+    if sizes:
+        qs = qs.filter(size_exists(sizes))
+    return qs
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare JOIN + DISTINCT against EXISTS for the product list color/size "
+        "filters: check both return the same rows and report timings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("cases", nargs="*", help='Query strings, e.g. "color=red,blue&size=6,7".')
+        parser.add_argument("--limit", type=int, default=24)
+        parser.add_argument("--iterations", type=int, default=20)
+
+    def handle(self, *args, **options):
+        limit, iterations = options["limit"], options["iterations"]
+        for case in options["cases"] or DEFAULT_CASES:
+            params = dict(part.split("=", 1) for part in case.split("&") if "=" in part)
+            base = Product.objects.filter(is_active=True).order_by("-created", "-id")
+            if params.get("category"):
+                base = base.filter(category__lower=params["category"].lower())
+            colors, sizes = split_values(params.get("color")), split_values(params.get("size"))
+
+            def page(build):
+                qs = build(base, colors, sizes)
+                return qs.count(), list(qs.values_list("id", flat=True)[:limit])
+
+            joined, exists = page(_join_filter), page(_exists_filter)
+            if joined != exists:
+                raise CommandError(f"{case}: results differ (join {joined[0]} rows, exists {exists[0]} rows)")
+
+            timings = {}
+            for label, build in (("join+distinct", _join_filter), ("exists", _exists_filter)):
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    page(build)
+                timings[label] = (time.perf_counter() - started) / iterations * 1000
+            speedup = timings["join+distinct"] / timings["exists"] if timings["exists"] else 0
+            self.stdout.write(
+                f"{case}: {exists[0]} matches | join+distinct {timings['join+distinct']:.2f} ms | "
+                f"exists {timings['exists']:.2f} ms | x{speedup:.1f}"
+            )
@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.fast_render import render_products
+from core.models import Product, ordered_images_prefetch
+from core.serializers import ProductSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the product list page built by ProductSerializer with the flat "
+        "core.fast_render path: verify byte-identical JSON and report throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=48, help="Products per page.")
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--category", default="")
+
+    def handle(self, *args, **options):
+        limit = options["limit"]
+        iterations = options["iterations"]
+
+        qs = Product.objects.filter(is_active=True).order_by("-created", "-id")
+        if options["category"]:
+            qs = qs.filter(category__iexact=options["category"])
+        ids = list(qs.values_list("id", flat=True)[:limit])
+        if not ids:
+            raise CommandError("No active products to benchmark.")
+
+        position = {pk: i for i, pk in enumerate(ids)}
+        request = Request(APIRequestFactory().get("/api/products/", {"limit": limit}))
+        renderer = JSONRenderer()
+
+        def serializer_page():
+            page = list(
+                Product.objects.filter(pk__in=ids)
+                .select_related("brand")
+                .prefetch_related(ordered_images_prefetch(), "colors", "sizes")
+            )
+            page.sort(key=lambda p: position[p.pk])
+            data = ProductSerializer(page, many=True, context={"request": request}).data
+            return renderer.render(data)
+
+        def fast_page():
+            return renderer.render(render_products(ids, request))
+
+        expected = serializer_page()
+        actual = fast_page()
+        if expected != actual:
+            raise CommandError("Fast renderer output differs from ProductSerializer output.")
+        self.stdout.write(f"Output identical: {len(actual)} bytes for {len(ids)} products")
+
+        for label, fn in (("serializer", serializer_page), ("fast_render", fast_page)):
+            with CaptureQueriesContext(connection) as ctx:
+                fn()
+            started = time.perf_counter()
+            for _ in range(iterations):
+                fn()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{label:12s} {iterations / elapsed:8.1f} pages/s  "
+                f"{elapsed / iterations * 1000:7.2f} ms/page  {len(ctx.captured_queries)} queries"
+            )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core.response_cache import cache_stats, reset_cache_stats
+from core.views import ProductViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Show the hit / miss counters of the product response cache. Counters live in the "
+        "catalog cache alias, so a per-process backend (locmem) only shows this process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after printing them.")
+
+    def handle(self, *args, **options):
+        actions = ProductViewSet.cached_actions
+        for action, counts in cache_stats(actions).items():
+            rate = "-" if counts["hit_rate"] is None else f"{counts['hit_rate']:.1%}"
+            self.stdout.write(f"{action}: {counts['hits']} hits, {counts['misses']} misses, hit rate {rate}")
+        if options["reset"]:
+            reset_cache_stats(actions)
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
@@ -0,0 +1,55 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date, parse_datetime
+
+from core.exports import DEFAULT_CHUNK_SIZE, FORMATS, export_stream
+
+
+class Command(BaseCommand):
+    help = "Stream products or orders to NDJSON / CSV (optionally gzipped) in constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=["products", "orders"])
+        parser.add_argument("--format", choices=sorted(FORMATS), default="ndjson")
+        parser.add_argument("--gzip", action="store_true")
+        parser.add_argument("--output", "-o", help="File to write; defaults to stdout.")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--since", help="Orders created on/after this ISO date or datetime.")
+        parser.add_argument("--until", help="Orders created before this ISO date or datetime.")
+
+    def _moment(self, value):
+        if not value:
+            return None
+        moment = parse_datetime(value) or parse_date(value)
+        if moment is None:
+            raise CommandError(f"Not an ISO date or datetime: {value}")
+        return moment
+
+    def handle(self, *args, **options):
+        filters = {}
+        if options["dataset"] == "orders":
+            filters = {"since": self._moment(options["since"]), "until": self._moment(options["until"])}
+        chunks = export_stream(
+            options["dataset"],
+            options["format"],
+            compress=options["gzip"],
+            chunk_size=options["chunk_size"],
+            **filters,
+        )
+        started = time.monotonic()
+        written = 0
+        out = open(options["output"], "wb") if options["output"] else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+        finally:
+            if options["output"]:
+                out.close()
+            else:
+                out.flush()
+        if options["output"]:
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['output']} in {elapsed:.2f}s"))
@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.catalog_import import READERS, CatalogImporter, ImportRecordError, detect_format, open_records
+
+
+class Command(BaseCommand):
+    help = "Bulk import products from a JSON fixture, NDJSON or CSV file (streamed, chunked upserts on slug)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=sorted(READERS), help="Defaults to the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--no-similar", action="store_true",
+            help="Do not recompute similar products afterwards (run rebuild_similar_products later).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or detect_format(path)
+        started = time.monotonic()
+
+        def progress(stats):
+            if options["verbosity"] > 1:
+                elapsed = time.monotonic() - started
+                self.stdout.write(f"  {stats.products} products ({stats.products / elapsed if elapsed else 0:.0f} rows/s)")
+
+        importer = CatalogImporter(
+            chunk_size=options["chunk_size"], progress=progress,
+            refresh_similar=False if options["no_similar"] else None,
+        )
+        try:
+            fh, records = open_records(path, fmt)
+        except OSError as exc:
+            raise CommandError(str(exc))
+        try:
+            with fh:
+                stats = importer.run(records)
+        except (ImportRecordError, ValueError) as exc:
+            raise CommandError(f"{path}: {exc}")
+
+        elapsed = time.monotonic() - started
+        for error in stats.errors:
+            self.stderr.write(f"  skipped {error}")
+        rate = stats.products / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats.products} products ({stats.products_created} new, {stats.products_updated} updated), "
+            f"{stats.images} images, {stats.lookups} brands/colors/sizes, skipped {stats.skipped} "
+            f"in {elapsed:.2f}s ({rate:.0f} rows/s)"
+        ))
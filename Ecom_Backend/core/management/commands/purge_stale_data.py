@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import purge
+
+
+class Command(BaseCommand):
+    help = "Delete abandoned anonymous carts, expired sessions and old checkout details in small batches."
+
+    def add_arguments(self, parser):
+        defaults = purge.retention_days()
+        for target in purge.TARGETS:
+            parser.add_argument(
+                f"--{target.replace('_', '-')}-days", type=int, dest=f"{target}_days", default=defaults[target],
+                help=f"Retention for {target} in days (default {defaults[target]}).",
+            )
+        parser.add_argument("--only", action="append", choices=purge.TARGETS, help="Purge only this target (repeatable).")
+        parser.add_argument("--batch-size", type=int, default=purge.BATCH_SIZE)
+        parser.add_argument("--pause", type=float, default=0, help="Seconds to sleep between batches.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the rows that would be deleted.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        verbose = options["verbosity"] > 1
+        verb = "would remove" if options["dry_run"] else "removed"
+        total = 0
+
+        for target in options["only"] or purge.TARGETS:
+            queryset = purge.stale(target, options[f"{target}_days"])
+            if queryset is None:
+                self.stdout.write(f"{target}: skipped (not stored in the database)")
+                continue
+
+            def progress(removed, target=target):
+                if verbose:
+                    self.stdout.write(f"  {target}: {sum(removed.values())} rows so far")
+
+            target_started = time.monotonic()
+            removed = purge.purge(
+                queryset, batch_size=options["batch_size"], dry_run=options["dry_run"],
+                pause=options["pause"], progress=progress,
+            )
+            count = sum(removed.values())
+            total += count
+            detail = ", ".join(f"{label}: {n}" for label, n in sorted(removed.items()) if n)
+            self.stdout.write(
+                f"{target}: {verb} {count} rows{f' ({detail})' if detail else ''} "
+                f"in {time.monotonic() - target_started:.2f}s"
+            )
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Total: {verb} {total} rows in {elapsed:.2f}s"))
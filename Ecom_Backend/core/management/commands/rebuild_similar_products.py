@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import recommendations
+
+
+class Command(BaseCommand):
+    help = "Recompute the precomputed similar products of every active product (needs numpy)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--k", type=int, default=None, help="Neighbours per product (default SIMILAR_PRODUCTS_K).")
+        parser.add_argument("--batch-size", type=int, default=recommendations.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            total = recommendations.rebuild(k=options["k"], batch_size=options["batch_size"])
+        except ImportError as exc:
+            raise CommandError(f"numpy is required: {exc}")
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Computed similar products for {total} products in {elapsed:.2f}s"))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import carts
+
+
+class Command(BaseCommand):
+    help = "Recompute stored cart totals (subtotal / item_count) and fix the carts that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=carts.BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many carts differ.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        verbose = options["verbosity"] > 1
+
+        def progress(checked, fixed):
+            if verbose:
+                self.stdout.write(f"  {checked} carts checked, {fixed} drifted")
+
+        checked, fixed = carts.reconcile(
+            batch_size=options["batch_size"], dry_run=options["dry_run"], progress=progress,
+        )
+        elapsed = time.monotonic() - started
+        verb = "would fix" if options["dry_run"] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} carts, {verb} {fixed} in {elapsed:.2f}s"))
@@ -1,70 +1,70 @@
-# Generated by Django 5.2.6 on 2025-09-16 11:45
-
-import django.db.models.deletion
-from django.db import migrations, models
-
-
-class Migration(migrations.Migration):
-
-    dependencies = [
-        ('core', '0003_remove_product_brand_remove_productimage_product_and_more'),
-    ]
-
-    operations = [
-        migrations.CreateModel(
-            name='Brand',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('name', models.CharField(max_length=120, unique=True)),
-                ('slug', models.SlugField(max_length=140, unique=True)),
-            ],
-        ),
-        migrations.CreateModel(
-            name='Color',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('name', models.CharField(max_length=50)),
-                ('hex', models.CharField(help_text='#rrggbb or named color', max_length=7)),
-            ],
-        ),
-        migrations.CreateModel(
-            name='Size',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('label', models.CharField(max_length=40)),
-            ],
-        ),
-        migrations.CreateModel(
-            name='Product',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('title', models.CharField(max_length=200)),
-                ('subtitle', models.CharField(blank=True, max_length=255)),
-                ('slug', models.SlugField(max_length=220, unique=True)),
-                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
-                ('mrp', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
-                ('description', models.TextField(blank=True)),
-                ('category', models.CharField(choices=[('womens', 'Womens'), ('mens', 'Mens'), ('kids', 'Kids')], default='womens', max_length=40)),
-                ('style', models.CharField(blank=True, help_text='e.g. Sandals, Trainers', max_length=80)),
-                ('rating', models.FloatField(default=0.0)),
-                ('is_active', models.BooleanField(default=True)),
-                ('created', models.DateTimeField(auto_now_add=True)),
-                ('brand', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='products', to='core.brand')),
-                ('colors', models.ManyToManyField(blank=True, related_name='products', to='core.color')),
-                ('sizes', models.ManyToManyField(blank=True, related_name='products', to='core.size')),
-            ],
-        ),
-        migrations.CreateModel(
-            name='ProductImage',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('image', models.ImageField(upload_to='products/')),
-                ('alt_text', models.CharField(blank=True, max_length=200)),
-                ('order', models.PositiveSmallIntegerField(default=0)),
-                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='core.product')),
-            ],
-            options={
-                'ordering': ('order',),
-            },
-        ),
-    ]
+# Generated by Django 5.2.6 on 2025-09-16 11:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_remove_product_brand_remove_productimage_product_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Brand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120, unique=True)),
+                ('slug', models.SlugField(max_length=140, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Color',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('hex', models.CharField(help_text='#rrggbb or named color', max_length=7)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Size',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=40)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Product',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('subtitle', models.CharField(blank=True, max_length=255)),
+                ('slug', models.SlugField(max_length=220, unique=True)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('mrp', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('description', models.TextField(blank=True)),
+                ('category', models.CharField(choices=[('womens', 'Womens'), ('mens', 'Mens'), ('kids', 'Kids')], default='womens', max_length=40)),
+                ('style', models.CharField(blank=True, help_text='e.g. Sandals, Trainers', max_length=80)),
+                ('rating', models.FloatField(default=0.0)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('brand', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='products', to='core.brand')),
+                ('colors', models.ManyToManyField(blank=True, related_name='products', to='core.color')),
+                ('sizes', models.ManyToManyField(blank=True, related_name='products', to='core.size')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProductImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.ImageField(upload_to='products/')),
+                ('alt_text', models.CharField(blank=True, max_length=200)),
+                ('order', models.PositiveSmallIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='core.product')),
+            ],
+            options={
+                'ordering': ('order',),
+            },
+        ),
+    ]
@@ -1,38 +1,38 @@
-# Generated by Django 5.2.6 on 2025-09-18 09:30
-
-import django.db.models.deletion
-from django.conf import settings
-from django.db import migrations, models
-
-
-class Migration(migrations.Migration):
-
-    dependencies = [
-        ('core', '0005_product_stock_cart_order_orderitem_cartitem'),
-        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
-    ]
-
-    operations = [
-        migrations.CreateModel(
-            name='UserCheckoutDetail',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('first_name', models.CharField(max_length=100)),
-                ('last_name', models.CharField(blank=True, max_length=100)),
-                ('email', models.EmailField(max_length=254)),
-                ('phone_number', models.CharField(blank=True, max_length=20)),
-                ('card_holder_name', models.CharField(blank=True, max_length=150)),
-                ('card_number', models.CharField(blank=True, max_length=20)),
-                ('cvv', models.CharField(blank=True, max_length=10)),
-                ('expiration_date', models.CharField(blank=True, max_length=10)),
-                ('address_line1', models.CharField(max_length=255)),
-                ('city', models.CharField(max_length=100)),
-                ('state', models.CharField(max_length=100)),
-                ('pincode', models.CharField(max_length=20)),
-                ('landmark', models.CharField(blank=True, max_length=150)),
-                ('payment_method', models.CharField(default='cod', max_length=50)),
-                ('created', models.DateTimeField(auto_now_add=True)),
-                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkout_details', to=settings.AUTH_USER_MODEL)),
-            ],
-        ),
-    ]
+# Generated by Django 5.2.6 on 2025-09-18 09:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_product_stock_cart_order_orderitem_cartitem'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCheckoutDetail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_name', models.CharField(max_length=100)),
+                ('last_name', models.CharField(blank=True, max_length=100)),
+                ('email', models.EmailField(max_length=254)),
+                ('phone_number', models.CharField(blank=True, max_length=20)),
+                ('card_holder_name', models.CharField(blank=True, max_length=150)),
+                ('card_number', models.CharField(blank=True, max_length=20)),
+                ('cvv', models.CharField(blank=True, max_length=10)),
+                ('expiration_date', models.CharField(blank=True, max_length=10)),
+                ('address_line1', models.CharField(max_length=255)),
+                ('city', models.CharField(max_length=100)),
+                ('state', models.CharField(max_length=100)),
+                ('pincode', models.CharField(max_length=20)),
+                ('landmark', models.CharField(blank=True, max_length=150)),
+                ('payment_method', models.CharField(default='cod', max_length=50)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkout_details', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
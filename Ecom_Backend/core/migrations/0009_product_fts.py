@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# The SQL is spelled out here rather than taken from core.search, so later
+# changes to that module cannot alter what this migration does.
+CREATE_FTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS core_product_fts USING fts5("
+    "title, subtitle, description, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "INSERT INTO core_product_fts(core_product_fts, rank) VALUES ('rank', 'bm25(10.0, 4.0, 1.0)')",
+    "INSERT INTO core_product_fts(rowid, title, subtitle, description) "
+    "SELECT id, title, subtitle, description FROM core_product",
+]
+DROP_FTS = "DROP TABLE IF EXISTS core_product_fts"
+
+
+def create_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statement in CREATE_FTS:
+            cursor.execute(statement)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(DROP_FTS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_ordertrackingevent'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
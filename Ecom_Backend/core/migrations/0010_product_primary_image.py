@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:40
+
+from django.db import migrations, models
+
+
+def fill_image_summary(apps, schema_editor):
+    Product = apps.get_model("core", "Product")
+    ProductImage = apps.get_model("core", "ProductImage")
+    summary = {}
+    for product_id, image in ProductImage.objects.order_by("product_id", "order", "id").values_list("product_id", "image"):
+        first, count = summary.get(product_id, (image, 0))
+        summary[product_id] = (first, count + 1)
+    for product_id, (first, count) in summary.items():
+        Product.objects.filter(pk=product_id).update(primary_image=first or "", image_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_product_fts'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='productimage',
+            options={'ordering': ('order', 'id')},
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='primary_image',
+            field=models.ImageField(blank=True, editable=False, upload_to='products/'),
+        ),
+        migrations.RunPython(fill_image_summary, migrations.RunPython.noop),
+    ]
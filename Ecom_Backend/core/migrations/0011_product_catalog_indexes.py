@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:00
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_product_primary_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='color',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='color_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='color',
+            index=models.Index(django.db.models.functions.text.Lower('hex'), name='color_hex_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(models.OrderBy(models.F('created'), descending=True), models.OrderBy(models.F('id'), descending=True), condition=models.Q(('is_active', True)), name='product_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.functions.text.Lower('category'), models.OrderBy(models.F('created'), descending=True), models.OrderBy(models.F('id'), descending=True), condition=models.Q(('is_active', True)), name='product_active_cat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.functions.text.Lower('style'), models.OrderBy(models.F('created'), descending=True), models.OrderBy(models.F('id'), descending=True), condition=models.Q(('is_active', True)), name='product_active_style_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(models.F('brand'), models.OrderBy(models.F('created'), descending=True), models.OrderBy(models.F('id'), descending=True), condition=models.Q(('is_active', True)), name='product_active_brand_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['price'], name='product_active_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='size',
+            index=models.Index(django.db.models.functions.text.Lower('label'), name='size_label_lower_idx'),
+        ),
+    ]
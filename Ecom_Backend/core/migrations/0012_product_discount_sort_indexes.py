@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:04
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_product_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_active_price_idx',
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='discount',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Coalesce('mrp', 'price'), '-', models.F('price')), output_field=models.DecimalField(decimal_places=2, max_digits=10)),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(models.F('price'), models.F('id'), condition=models.Q(('is_active', True)), name='product_active_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(models.OrderBy(models.F('rating'), descending=True), models.OrderBy(models.F('id'), descending=True), condition=models.Q(('is_active', True)), name='product_active_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(models.OrderBy(models.F('discount'), descending=True), models.OrderBy(models.F('id'), descending=True), condition=models.Q(('is_active', True)), name='product_active_discount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.functions.text.Lower('category'), models.F('price'), models.F('id'), condition=models.Q(('is_active', True)), name='product_active_cat_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.functions.text.Lower('category'), models.OrderBy(models.F('rating'), descending=True), models.OrderBy(models.F('id'), descending=True), condition=models.Q(('is_active', True)), name='product_active_cat_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.functions.text.Lower('category'), models.OrderBy(models.F('discount'), descending=True), models.OrderBy(models.F('id'), descending=True), condition=models.Q(('is_active', True)), name='product_active_cat_disc_idx'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:16
+
+import django.db.models.deletion
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def create_variants(apps, schema_editor):
+    """One variant per (product, size) with Product.stock split across them."""
+    Product = apps.get_model("core", "Product")
+    ProductVariant = apps.get_model("core", "ProductVariant")
+    CartItem = apps.get_model("core", "CartItem")
+    OrderItem = apps.get_model("core", "OrderItem")
+
+    sizes = defaultdict(list)
+    for pid, sid, label in Product.sizes.through.objects.order_by("size_id").values_list("product_id", "size_id", "size__label"):
+        sizes[pid].append((sid, label))
+    colors = defaultdict(list)
+    for pid, cid in Product.colors.through.objects.values_list("product_id", "color_id"):
+        colors[pid].append(cid)
+
+    variants = []
+    for pid, stock in Product.objects.values_list("id", "stock"):
+        wanted = sizes.get(pid) or [(None, "")]
+        base, extra = divmod(stock, len(wanted))
+        color_id = colors[pid][0] if len(colors.get(pid, ())) == 1 else None
+        for i, (sid, _) in enumerate(wanted):
+            variants.append(ProductVariant(
+                product_id=pid, size_id=sid, color_id=color_id,
+                sku=f"P{pid}-{sid if sid is not None else 'OS'}",
+                stock=base + (1 if i < extra else 0),
+            ))
+    ProductVariant.objects.bulk_create(variants, batch_size=1000)
+
+    # link cart / order lines by size label (or the only variant of a product)
+    lookup, count = {}, defaultdict(int)
+    for vid, pid, label in ProductVariant.objects.values_list("id", "product_id", "size__label"):
+        lookup[(pid, (label or "").strip().lower())] = vid
+        count[pid] += 1
+    for (pid, _), vid in list(lookup.items()):
+        if count[pid] == 1:
+            lookup.setdefault((pid, ""), vid)
+    for model in (CartItem, OrderItem):
+        for item_id, pid, size in model.objects.values_list("id", "product_id", "size"):
+            vid = lookup.get((pid, (size or "").strip().lower()))
+            if vid is not None:
+                model.objects.filter(pk=item_id).update(variant_id=vid)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_similarproduct'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sku', models.CharField(max_length=64, unique=True)),
+                ('stock', models.PositiveIntegerField(default=0)),
+                ('color', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='variants', to='core.color')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='variants', to='core.product')),
+                ('size', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='variants', to='core.size')),
+            ],
+            options={
+                'ordering': ('product', 'size'),
+            },
+        ),
+        migrations.AddField(
+            model_name='cartitem',
+            name='variant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.productvariant'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='variant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.productvariant'),
+        ),
+        migrations.AddConstraint(
+            model_name='productvariant',
+            constraint=models.UniqueConstraint(fields=('product', 'size', 'color'), name='product_variant_uniq'),
+        ),
+        migrations.RunPython(create_variants, migrations.RunPython.noop),
+    ]
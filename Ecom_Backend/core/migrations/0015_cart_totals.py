@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:20
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def fill_cart_totals(apps, schema_editor):
+    Cart = apps.get_model("core", "Cart")
+    CartItem = apps.get_model("core", "CartItem")
+    totals = {}
+    for cart_id, qty, price in CartItem.objects.values_list("cart_id", "quantity", "product__price"):
+        count, subtotal = totals.get(cart_id, (0, Decimal("0.00")))
+        totals[cart_id] = (count + qty, subtotal + (price or Decimal("0.00")) * qty)
+    for cart_id, (count, subtotal) in totals.items():
+        Cart.objects.filter(pk=cart_id).update(item_count=count, subtotal=subtotal)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_productvariant'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=12),
+        ),
+        migrations.RunPython(fill_cart_totals, migrations.RunPython.noop),
+    ]
@@ -1,272 +1,457 @@
-from decimal import Decimal
-from django.conf import settings
-from django.db import models
-from django.utils.translation import gettext_lazy as _
-from django.utils import timezone  
-
-class OrderTrackingEvent(models.Model):
-    """
-    Admin-editable order tracking events for an Order.
-    Use string 'Order' in the FK so ordering of class definitions does not matter.
-    """
-    class Status(models.TextChoices):
-        PLACED = "placed", "Order Placed"
-        DISPATCHED = "dispatched", "Order Dispatched"
-        IN_TRANSIT = "in_transit", "Order in transit"
-        OUT_FOR_DELIVERY = "out_for_delivery", "Out for delivery"
-        DELIVERED = "delivered", "Delivered"
-        CANCELLED = "cancelled", "Cancelled"
-
-    order = models.ForeignKey("Order", related_name="tracking_events", on_delete=models.CASCADE)
-    status = models.CharField(max_length=32, choices=Status.choices)
-    timestamp = models.DateTimeField(default=timezone.now)
-    location = models.CharField(max_length=255, blank=True)   # e.g. "Reached at Tenkasi, Post office"
-    note = models.TextField(blank=True)                       # optional human note
-
-    class Meta:
-        ordering = ("timestamp",)
-
-    def __str__(self):
-        return f"{self.get_status_display()} @ {self.timestamp:%Y-%m-%d %H:%M} ({self.location or 'N/A'})"
-
-
-
-class UserCheckoutDetail(models.Model):
-    """
-    Store non-sensitive checkout metadata for a user.
-    DO NOT store full PAN or CVV in plaintext here in production.
-    Store only last4, brand, expiry and/or a gateway token.
-    """
-    user = models.ForeignKey(
-        settings.AUTH_USER_MODEL,
-        on_delete=models.SET_NULL,
-        related_name="checkout_details",
-        null=True,
-        blank=True,
-    )
-
-    first_name = models.CharField(max_length=100)
-    last_name = models.CharField(max_length=100, blank=True)
-    email = models.EmailField()
-    phone_number = models.CharField(max_length=20, blank=True)
-
-    # Payment info - keep only non-sensitive fields / gateway token
-    card_holder_name = models.CharField(max_length=150, blank=True)
-
-    # Do not store full card number or CVV.
-    # Keep last 4 digits and brand for display only.
-    card_last4 = models.CharField(max_length=4, blank=True)
-    card_brand = models.CharField(max_length=50, blank=True)
-    card_expiry = models.CharField(max_length=7, blank=True)  # e.g. "08/28" or "08/2028"
-
-    # Optional: if you integrate a payment gateway, save the gateway token instead
-    payment_token = models.CharField(max_length=255, blank=True, help_text="Payment gateway token (if used).")
-
-    # Shipping
-    address_line1 = models.CharField(max_length=255)
-    city = models.CharField(max_length=100)
-    state = models.CharField(max_length=100)
-    pincode = models.CharField(max_length=20)
-    landmark = models.CharField(max_length=150, blank=True)
-
-    # Payment method enumerator (cod, card, upi, paypal etc.)
-    payment_method = models.CharField(max_length=50, default="cod")
-
-    created = models.DateTimeField(auto_now_add=True)
-    updated = models.DateTimeField(auto_now=True)
-
-    class Meta:
-        ordering = ("-created",)
-        indexes = [
-            models.Index(fields=["user"]),
-            models.Index(fields=["created"]),
-        ]
-
-    def __str__(self):
-        user_label = self.user.username if self.user else "guest"
-        return f"{user_label} - {self.first_name} {self.last_name} ({self.created:%Y-%m-%d})"
-
-    @property
-    def masked_card(self):
-        """Return a masked card display (e.g. **** **** **** 1234) or empty string."""
-        if self.card_last4:
-            return f"**** **** **** {self.card_last4}"
-        return ""
-
-
-
-class Brand(models.Model):
-    name = models.CharField(max_length=120, unique=True)
-    slug = models.SlugField(max_length=140, unique=True)
-
-    def __str__(self):
-        return self.name
-
-
-class Color(models.Model):
-    name = models.CharField(max_length=50)
-    hex = models.CharField(max_length=7, help_text="#rrggbb or named color")
-
-    def __str__(self):
-        return f"{self.name} ({self.hex})"
-
-
-class Size(models.Model):
-    # store labels like "Junior UK(3)", "UK(4)" or "US 8" etc.
-    label = models.CharField(max_length=40)
-
-    def __str__(self):
-        return self.label
-
-
-class Product(models.Model):
-    CATEGORY_CHOICES = (
-        ("womens", "Womens"),
-        ("mens", "Mens"),
-        ("kids", "Kids"),
-    )
-
-    title = models.CharField(max_length=200)
-    subtitle = models.CharField(max_length=255, blank=True)
-    slug = models.SlugField(max_length=220, unique=True)
-    price = models.DecimalField(max_digits=10, decimal_places=2)
-    stock = models.PositiveIntegerField(default=0)
-    mrp = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
-    description = models.TextField(blank=True)
-    category = models.CharField(max_length=40, choices=CATEGORY_CHOICES, default="womens")
-    style = models.CharField(max_length=80, blank=True, help_text="e.g. Sandals, Trainers")
-    brand = models.ForeignKey(Brand, on_delete=models.SET_NULL, null=True, blank=True, related_name="products")
-    sizes = models.ManyToManyField(Size, blank=True, related_name="products")
-    colors = models.ManyToManyField(Color, blank=True, related_name="products")
-    rating = models.FloatField(default=0.0)
-    is_active = models.BooleanField(default=True)
-    created = models.DateTimeField(auto_now_add=True)
-
-    def __str__(self):
-        return self.title
-
-    def variant_image_urls(self, limit: int = 5):
-        """
-        Return up to `limit` image URLs (ordered by ProductImage.order).
-        Useful for product detail thumbnail variants in the frontend.
-        Returns a list of strings (may contain None for missing images).
-        """
-        urls = []
-        imgs = self.images.all().order_by("order")[:limit]
-        for img in imgs:
-            file_field = getattr(img, "image", None)
-            if file_field and getattr(file_field, "url", None):
-                urls.append(file_field.url)
-            else:
-                urls.append(None)
-        return urls
-
-    @property
-    def main_image_url(self):
-        """
-        Convenience property returning the first image url or None.
-        """
-        first = self.images.all().order_by("order").first()
-        if first and getattr(first, "image", None) and getattr(first.image, "url", None):
-            return first.image.url
-        return None
-
-
-class ProductImage(models.Model):
-    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="images")
-    image = models.ImageField(upload_to="products/")
-    alt_text = models.CharField(max_length=200, blank=True)
-    order = models.PositiveSmallIntegerField(default=0)
-
-    class Meta:
-        ordering = ("order",)
-
-    def __str__(self):
-        return f"{self.product.title} img#{self.order}"
-
-
-class Order(models.Model):
-    class PaymentMethod(models.TextChoices):
-        GPAY = "gpay", _("GPay")
-        PAYPAL = "paypal", _("PayPal")
-        CLEARPAY = "clearpay", _("Clearpay")
-        KLARNA = "klarna", _("Klarna")
-        COD = "cod", _("Cash on Delivery")
-
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
-    fullname = models.CharField(max_length=255)
-    email = models.EmailField()
-    created = models.DateTimeField(auto_now_add=True)
-    payment_method = models.CharField(max_length=20, choices=PaymentMethod.choices)
-    total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal("0.00"))
-    paid = models.BooleanField(default=False)
-    shipping_address = models.TextField(blank=True)
-
-    def __str__(self):
-        return f"Order #{self.id} - {self.fullname} - {self.payment_method}"
-
-
-class OrderItem(models.Model):
-    order = models.ForeignKey(Order, related_name="items", on_delete=models.CASCADE)
-    product = models.ForeignKey(Product, on_delete=models.PROTECT)
-    title = models.CharField(max_length=255)
-    price = models.DecimalField(max_digits=10, decimal_places=2)
-    quantity = models.PositiveIntegerField(default=1)
-    size = models.CharField(max_length=50, blank=True)
-
-    def line_total(self):
-        return (self.price or Decimal("0")) * Decimal(self.quantity)
-
-    def __str__(self):
-        return f"{self.title} x {self.quantity}"
-
-
-class Cart(models.Model):
-    """
-    A simple server-side cart. Optionally tied to a user.
-    """
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.CASCADE)
-    created = models.DateTimeField(auto_now_add=True)
-    updated = models.DateTimeField(auto_now=True)
-
-    def total_amount(self):
-        """
-        Sum line totals using Decimal starting value to avoid mixing types.
-        """
-        start = Decimal("0.00")
-        return sum((item.line_total() for item in self.items.all()), start)
-
-    def __str__(self):
-        if self.user:
-            return f"Cart {self.pk} ({self.user})"
-        return f"Cart {self.pk} (anonymous)"
-
-
-class CartItem(models.Model):
-    cart = models.ForeignKey(Cart, related_name="items", on_delete=models.CASCADE)
-    product = models.ForeignKey("Product", on_delete=models.PROTECT)
-    quantity = models.PositiveIntegerField(default=1)
-    size = models.CharField(max_length=64, blank=True)
-
-    def line_total(self):
-        # product.price is Decimal; multiply returns Decimal
-        price = getattr(self.product, "price", Decimal("0"))
-        return (price or Decimal("0")) * Decimal(self.quantity)
-
-    class Meta:
-        unique_together = ("cart", "product", "size")  # prevent duplicate rows for same product+size
-
-    def __str__(self):
-        return f"{self.product.title} x {self.quantity}"
-
-
-class Navbar(models.Model):
-    site_name = models.CharField(max_length=100, default="StepUp")
-    logo = models.ImageField(upload_to="navbar_logos/", null=True, blank=True)
-
-    class Meta:
-        verbose_name = "Navbar"
-        verbose_name_plural = "Navbar"
-
-    def __str__(self):
-        return self.site_name
+from decimal import Decimal
+from django.conf import settings
+from django.db import models
+from django.db.models.functions import Coalesce, Lower
+from django.utils.translation import gettext_lazy as _
+from django.utils import timezone  
+
+# `field__lower="x"` compiles to LOWER(field) = 'x', which (unlike __iexact's
+# LIKE / UPPER()) can use the Lower(...) functional indexes below
+models.CharField.register_lookup(Lower)
+
+class OrderTrackingEvent(models.Model):
+    """
+    Admin-editable order tracking events for an Order.
+    Use string 'Order' in the FK so ordering of class definitions does not matter.
+    """
+    class Status(models.TextChoices):
+        PLACED = "placed", "Order Placed"
+        DISPATCHED = "dispatched", "Order Dispatched"
+        IN_TRANSIT = "in_transit", "Order in transit"
+        OUT_FOR_DELIVERY = "out_for_delivery", "Out for delivery"
+        DELIVERED = "delivered", "Delivered"
+        CANCELLED = "cancelled", "Cancelled"
+
+    order = models.ForeignKey("Order", related_name="tracking_events", on_delete=models.CASCADE)
+    status = models.CharField(max_length=32, choices=Status.choices)
+    timestamp = models.DateTimeField(default=timezone.now)
+    location = models.CharField(max_length=255, blank=True)   # e.g. "Reached at Tenkasi, Post office"
+    note = models.TextField(blank=True)                       # optional human note
+
+    class Meta:
+        ordering = ("timestamp",)
+
+    def __str__(self):
+        return f"{self.get_status_display()} @ {self.timestamp:%Y-%m-%d %H:%M} ({self.location or 'N/A'})"
+
+
+
+class UserCheckoutDetail(models.Model):
+    """
+    Store non-sensitive checkout metadata for a user.
+    DO NOT store full PAN or CVV in plaintext here in production.
+    Store only last4, brand, expiry and/or a gateway token.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name="checkout_details",
+        null=True,
+        blank=True,
+    )
+
+    first_name = models.CharField(max_length=100)
+    last_name = models.CharField(max_length=100, blank=True)
+    email = models.EmailField()
+    phone_number = models.CharField(max_length=20, blank=True)
+
+    # Payment info - keep only non-sensitive fields / gateway token
+    card_holder_name = models.CharField(max_length=150, blank=True)
+
+    # Do not store full card number or CVV.
+    # Keep last 4 digits and brand for display only.
+    card_last4 = models.CharField(max_length=4, blank=True)
+    card_brand = models.CharField(max_length=50, blank=True)
+    card_expiry = models.CharField(max_length=7, blank=True)  # e.g. "08/28" or "08/2028"
+
+    # Optional: if you integrate a payment gateway, save the gateway token instead
+    payment_token = models.CharField(max_length=255, blank=True, help_text="Payment gateway token (if used).")
+
+    # Shipping
+    address_line1 = models.CharField(max_length=255)
+    city = models.CharField(max_length=100)
+    state = models.CharField(max_length=100)
+    pincode = models.CharField(max_length=20)
+    landmark = models.CharField(max_length=150, blank=True)
+
+    # Payment method enumerator (cod, card, upi, paypal etc.)
+    payment_method = models.CharField(max_length=50, default="cod")
+
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("-created",)
+        indexes = [
+            models.Index(fields=["user"]),
+            models.Index(fields=["created"]),
+        ]
+
+    def __str__(self):
+        user_label = self.user.username if self.user else "guest"
+        return f"{user_label} - {self.first_name} {self.last_name} ({self.created:%Y-%m-%d})"
+
+    @property
+    def masked_card(self):
+        """Return a masked card display (e.g. **** **** **** 1234) or empty string."""
+        if self.card_last4:
+            return f"**** **** **** {self.card_last4}"
+        return ""
+
+
+
+class Brand(models.Model):
+    name = models.CharField(max_length=120, unique=True)
+    slug = models.SlugField(max_length=140, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Color(models.Model):
+    name = models.CharField(max_length=50)
+    hex = models.CharField(max_length=7, help_text="#rrggbb or named color")
+
+    class Meta:
+        indexes = [
+            models.Index(Lower("name"), name="color_name_lower_idx"),
+            models.Index(Lower("hex"), name="color_hex_lower_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.hex})"
+
+
+class Size(models.Model):
+    # store labels like "Junior UK(3)", "UK(4)" or "US 8" etc.
+    label = models.CharField(max_length=40)
+
+    class Meta:
+        indexes = [
+            models.Index(Lower("label"), name="size_label_lower_idx"),
+        ]
+
+    def __str__(self):
+        return self.label
+
+
+class Product(models.Model):
+    CATEGORY_CHOICES = (
+        ("womens", "Womens"),
+        ("mens", "Mens"),
+        ("kids", "Kids"),
+    )
+
+    title = models.CharField(max_length=200)
+    subtitle = models.CharField(max_length=255, blank=True)
+    slug = models.SlugField(max_length=220, unique=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    stock = models.PositiveIntegerField(default=0)
+    mrp = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    description = models.TextField(blank=True)
+    category = models.CharField(max_length=40, choices=CATEGORY_CHOICES, default="womens")
+    style = models.CharField(max_length=80, blank=True, help_text="e.g. Sandals, Trainers")
+    brand = models.ForeignKey(Brand, on_delete=models.SET_NULL, null=True, blank=True, related_name="products")
+    sizes = models.ManyToManyField(Size, blank=True, related_name="products")
+    colors = models.ManyToManyField(Color, blank=True, related_name="products")
+    rating = models.FloatField(default=0.0)
+    is_active = models.BooleanField(default=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    # stored generated column so "biggest discount" can be served by an index
+    discount = models.GeneratedField(
+        expression=Coalesce("mrp", "price") - models.F("price"),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+    )
+
+    # denormalized from ProductImage (kept in sync by core.signals) so cards
+    # can show an image without touching the images table
+    primary_image = models.ImageField(upload_to="products/", blank=True, editable=False)
+    image_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        # every list query is is_active=True ... ORDER BY -created, -id.
+        # Django emits the filter as a bare `WHERE is_active`, which only a
+        # partial index on that same condition can use. category / style
+        # are matched case-insensitively through __lower.
+        indexes = [
+            models.Index(
+                models.F("created").desc(), models.F("id").desc(),
+                name="product_active_created_idx", condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                Lower("category"), models.F("created").desc(), models.F("id").desc(),
+                name="product_active_cat_idx", condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                Lower("style"), models.F("created").desc(), models.F("id").desc(),
+                name="product_active_style_idx", condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                "brand", models.F("created").desc(), models.F("id").desc(),
+                name="product_active_brand_idx", condition=models.Q(is_active=True),
+            ),
+            # one index per ?ordering=, with and without a category
+            models.Index(
+                "price", "id", name="product_active_price_idx", condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                models.F("rating").desc(), models.F("id").desc(),
+                name="product_active_rating_idx", condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                models.F("discount").desc(), models.F("id").desc(),
+                name="product_active_discount_idx", condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                Lower("category"), "price", "id",
+                name="product_active_cat_price_idx", condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                Lower("category"), models.F("rating").desc(), models.F("id").desc(),
+                name="product_active_cat_rating_idx", condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                Lower("category"), models.F("discount").desc(), models.F("id").desc(),
+                name="product_active_cat_disc_idx", condition=models.Q(is_active=True),
+            ),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def ordered_images(self):
+        """
+        Images ordered by (order, id) as a list.
+        Served from the prefetch cache when the queryset used
+        `ordered_images_prefetch()` (or a plain "images" prefetch), so slicing
+        the result never triggers another query.
+        """
+        return list(self.images.all())
+
+    def variant_image_urls(self, limit: int = 5):
+        """
+        Return up to `limit` image URLs (ordered by ProductImage.order).
+        Useful for product detail thumbnail variants in the frontend.
+        Returns a list of strings (may contain None for missing images).
+        """
+        urls = []
+        for img in self.ordered_images()[:limit]:
+            file_field = getattr(img, "image", None)
+            if file_field and getattr(file_field, "url", None):
+                urls.append(file_field.url)
+            else:
+                urls.append(None)
+        return urls
+
+    @property
+    def main_image_url(self):
+        """
+        Convenience property returning the first image url or None.
+        """
+        if self.primary_image:
+            return self.primary_image.url
+        return None
+
+    @classmethod
+    def refresh_image_summary(cls, pk):
+        """Recompute primary_image / image_count for product `pk` from its images."""
+        images = ProductImage.objects.filter(product_id=pk).order_by("order", "id")
+        first = images.values_list("image", flat=True).first()
+        cls.objects.filter(pk=pk).update(primary_image=first or "", image_count=images.count())
+
+
+class ProductImage(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="images")
+    image = models.ImageField(upload_to="products/")
+    alt_text = models.CharField(max_length=200, blank=True)
+    order = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ("order", "id")
+
+    def __str__(self):
+        return f"{self.product.title} img#{self.order}"
+
+
+def ordered_images_prefetch(lookup="images"):
+    """Prefetch for Product.images with a stable (order, id) ordering."""
+    return models.Prefetch(lookup, queryset=ProductImage.objects.order_by("order", "id"))
+
+
+class ContentVersion(models.Model):
+    """
+    Version counter of a cached content namespace ("catalog", "navbar",
+    "pages"), bumped by core.response_cache on every write. It lives in the
+    database so every worker and every management command shares it.
+    """
+    namespace = models.CharField(max_length=32, primary_key=True)
+    version = models.BigIntegerField()
+    modified = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.namespace} v{self.version}"
+
+
+class CatalogChange(models.Model):
+    """
+    Products a catalog version bump was about (core.response_cache). Lets
+    in-memory indexes (core.facets) catch up by re-reading just those
+    products; a version with no rows here was a bump of unknown scope.
+    """
+    version = models.BigIntegerField(db_index=True)
+    product_id = models.IntegerField()
+
+    def __str__(self):
+        return f"v{self.version}: product {self.product_id}"
+
+
+class SimilarProduct(models.Model):
+    """
+    Precomputed "similar products" for a product, best first (rank 0).
+    Written by core.recommendations; never edited by hand.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="similar_links")
+    similar = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ("product", "rank")
+        constraints = [
+            models.UniqueConstraint(fields=["product", "rank"], name="similar_product_rank_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.similar_id} ({self.score:.3f})"
+
+
+class ProductVariant(models.Model):
+    """
+    One sellable unit of a product: a size (and optionally a color) with its
+    own stock. Product.stock is the denormalized total (see core.inventory).
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="variants")
+    size = models.ForeignKey(Size, on_delete=models.PROTECT, null=True, blank=True, related_name="variants")
+    color = models.ForeignKey(Color, on_delete=models.SET_NULL, null=True, blank=True, related_name="variants")
+    sku = models.CharField(max_length=64, unique=True)
+    stock = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ("product", "size")
+        constraints = [
+            models.UniqueConstraint(fields=["product", "size", "color"], name="product_variant_uniq"),
+        ]
+
+    def __str__(self):
+        return self.sku
+
+
+class Order(models.Model):
+    class PaymentMethod(models.TextChoices):
+        GPAY = "gpay", _("GPay")
+        PAYPAL = "paypal", _("PayPal")
+        CLEARPAY = "clearpay", _("Clearpay")
+        KLARNA = "klarna", _("Klarna")
+        COD = "cod", _("Cash on Delivery")
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+    fullname = models.CharField(max_length=255)
+    email = models.EmailField()
+    created = models.DateTimeField(auto_now_add=True)
+    payment_method = models.CharField(max_length=20, choices=PaymentMethod.choices)
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal("0.00"))
+    paid = models.BooleanField(default=False)
+    shipping_address = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"Order #{self.id} - {self.fullname} - {self.payment_method}"
+
+
+class OrderItem(models.Model):
+    order = models.ForeignKey(Order, related_name="items", on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, on_delete=models.PROTECT)
+    title = models.CharField(max_length=255)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.PositiveIntegerField(default=1)
+    size = models.CharField(max_length=50, blank=True)
+    variant = models.ForeignKey(ProductVariant, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+
+    def line_total(self):
+        return (self.price or Decimal("0")) * Decimal(self.quantity)
+
+    def __str__(self):
+        return f"{self.title} x {self.quantity}"
+
+
+class Cart(models.Model):
+    """
+    A simple server-side cart. Optionally tied to a user.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.CASCADE)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+    # running totals kept by core.carts with F() updates in the same
+    # transaction as each item change; `manage.py reconcile_cart_totals`
+    # fixes drift (e.g. after price changes)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"), editable=False)
+    item_count = models.PositiveIntegerField(default=0, editable=False)
+
+    def total_amount(self):
+        """
+        Sum line totals using Decimal starting value to avoid mixing types.
+        """
+        start = Decimal("0.00")
+        return sum((item.line_total() for item in self.items.all()), start)
+
+    def __str__(self):
+        if self.user:
+            return f"Cart {self.pk} ({self.user})"
+        return f"Cart {self.pk} (anonymous)"
+
+
+class CartItem(models.Model):
+    cart = models.ForeignKey(Cart, related_name="items", on_delete=models.CASCADE)
+    product = models.ForeignKey("Product", on_delete=models.PROTECT)
+    quantity = models.PositiveIntegerField(default=1)
+    size = models.CharField(max_length=64, blank=True)
+    variant = models.ForeignKey(ProductVariant, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+
+    def line_total(self):
+        # product.price is Decimal; multiply returns Decimal
+        price = getattr(self.product, "price", Decimal("0"))
+        return (price or Decimal("0")) * Decimal(self.quantity)
+
+    class Meta:
+        unique_together = ("cart", "product", "size")  # prevent duplicate rows for same product+size
+
+    def __str__(self):
+        return f"{self.product.title} x {self.quantity}"
+
+
+def cart_items_prefetch(compact=False):
+    """
+    Prefetch for Cart.items with everything its serializer reads, so a
+    cart renders in a fixed number of queries whatever its size: the
+    product row only for the compact view, plus brand, images, colors and
+    sizes for the full nested ProductSerializer.
+    """
+    items = CartItem.objects.select_related("product").order_by("id")
+    if not compact:
+        items = items.select_related("product__brand").prefetch_related(
+            ordered_images_prefetch("product__images"), "product__colors", "product__sizes",
+        )
+    return models.Prefetch("items", queryset=items)
+
+
+class Navbar(models.Model):
+    site_name = models.CharField(max_length=100, default="StepUp")
+    logo = models.ImageField(upload_to="navbar_logos/", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Navbar"
+        verbose_name_plural = "Navbar"
+
+    def __str__(self):
+        return self.site_name
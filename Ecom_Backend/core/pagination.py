@@ -0,0 +1,128 @@
+# core/pagination.py
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination, newest first by default.
+
+    Unlike LimitOffsetPagination this never runs COUNT(*) and never uses
+    OFFSET: every page is `WHERE (created, id) < (last_created, last_id)
+    ORDER BY created DESC, id DESC LIMIT n`, so page 500 costs the same as
+    page 1. The response only carries a `next` link, which is all an
+    infinite-scroll client needs:
+
+        GET /api/products/?pagination=cursor&limit=24
+        GET /api/products/?pagination=cursor&limit=24&cursor=<opaque>
+
+    A view with `get_ordering()` (e.g. ("price", "id")) is paginated on
+    that ordering instead; it must end in a unique column and its columns
+    must be non-null.
+    """
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    default_limit = 12
+    max_limit = 100
+    ordering = ("-created", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_limit(request)
+        if view is not None and hasattr(view, "get_ordering"):
+            self.ordering = tuple(view.get_ordering())
+        self.fields = [name.lstrip("-") for name in self.ordering]
+
+        position = self.decode_cursor(request, queryset.model)
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position))
+
+        # fetch one extra row to know whether there is a next page
+        results = list(queryset[: self.limit + 1])
+        self.has_next = len(results) > self.limit
+        self.page = results[: self.limit]
+        return self.page
+
+    def seek_filter(self, position):
+        """Rows strictly after `position` in self.ordering (a row-value comparison)."""
+        after = Q()
+        for i, name in enumerate(self.ordering):
+            field = name.lstrip("-")
+            op = "lt" if name.startswith("-") else "gt"
+            equal = {f: v for f, v in zip(self.fields[:i], position)}
+            after |= Q(**equal, **{f"{field}__{op}": position[i]})
+        # the redundant bound on the leading column lets the index seek
+        # instead of filtering the OR row by row
+        first = self.ordering[0]
+        bound = "lte" if first.startswith("-") else "gte"
+        return after & Q(**{f"{self.fields[0]}__{bound}": position[0]})
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        if limit <= 0:
+            return self.default_limit
+        return min(limit, self.max_limit)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = remove_query_param(self.base_url, "offset")
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self._position_of(self.page[-1])))
+
+    def _position_of(self, item):
+        # rows may be model instances or .values() dicts
+        if isinstance(item, dict):
+            return [item[name] for name in self.fields]
+        return [getattr(item, name) for name in self.fields]
+
+    def encode_cursor(self, position):
+        values = [v.isoformat() if hasattr(v, "isoformat") else str(v) for v in position]
+        raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError("cursor does not match the ordering")
+            position = []
+            for name, value in zip(self.fields, values):
+                field = model._meta.get_field(name)
+                field = getattr(field, "output_field", field)  # GeneratedField
+                position.append(field.to_python(value))
+            return position
+        except (TypeError, ValueError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
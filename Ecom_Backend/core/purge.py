@@ -0,0 +1,78 @@
+# core/purge.py
+"""
+Batched deletion of stale rows (manage.py purge_stale_data).
+
+Targets and their default retention in days (PURGE_RETENTION_DAYS in
+settings overrides these, the command's --<target>-days flags override both):
+
+- carts: anonymous carts not updated within the retention, with their items
+- sessions: django_session rows expired more than the retention ago
+- checkout_details: UserCheckoutDetail snapshots older than the retention
+
+Rows go in primary-key ranges of `batch_size`, each range deleted in its own
+short transaction by a DELETE that repeats the stale condition, so a cart
+touched after the range was read is kept. No long write lock is held on a
+live site, and `pause` seconds between batches give other writers a turn.
+"""
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Cart, UserCheckoutDetail
+
+TARGETS = ("carts", "sessions", "checkout_details")
+DEFAULT_RETENTION_DAYS = {"carts": 30, "sessions": 0, "checkout_details": 365}
+BATCH_SIZE = 500
+
+
+def retention_days():
+    return {**DEFAULT_RETENTION_DAYS, **getattr(settings, "PURGE_RETENTION_DAYS", {})}
+
+
+def stale(target, days, now=None):
+    """Queryset of the rows of `target` past a retention of `days`, or None if it does not apply."""
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    if target == "carts":
+        return Cart.objects.filter(user__isnull=True, updated__lt=cutoff)
+    if target == "sessions":
+        if settings.SESSION_ENGINE not in ("django.contrib.sessions.backends.db", "django.contrib.sessions.backends.cached_db"):
+            return None
+        from django.contrib.sessions.models import Session
+
+        return Session.objects.filter(expire_date__lt=cutoff)
+    if target == "checkout_details":
+        return UserCheckoutDetail.objects.filter(created__lt=cutoff)
+    raise ValueError(f"Unknown purge target {target!r}")
+
+
+def purge(queryset, batch_size=BATCH_SIZE, dry_run=False, pause=0, progress=None):
+    """
+    Delete the rows of `queryset` one primary-key range at a time. Returns a
+    Counter {model label: rows deleted}, cascaded rows included (with
+    `dry_run`, only the rows of `queryset` that would go).
+    """
+    removed = Counter()
+    label = queryset.model._meta.label
+    queryset = queryset.order_by("pk")
+    last = None
+    while True:
+        batch = queryset if last is None else queryset.filter(pk__gt=last)
+        pks = list(batch.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            break
+        if dry_run:
+            removed[label] += len(pks)
+        else:
+            with transaction.atomic():
+                _, per_model = batch.filter(pk__lte=pks[-1]).delete()
+            removed.update(per_model)
+        last = pks[-1]
+        if progress:
+            progress(removed)
+        if pause:
+            time.sleep(pause)
+    return removed
@@ -0,0 +1,318 @@
+# core/recommendations.py
+"""
+Precomputed "similar products" (served at /api/products/{id}/similar/).
+
+Every active product is encoded as a feature vector:
+
+- one-hot category, style (case-insensitive) and brand,
+- multi-hot colors and sizes,
+- price, log-scaled to [0, 1] and placed on a quarter circle
+  (cos, sin) so the dot product of two prices depends on their gap.
+
+Each block is scaled to unit length times its weight in WEIGHTS and the
+whole row is L2-normalized, so a matrix product gives cosine similarity.
+The top-K neighbours of a batch of rows come from one `batch @ matrix.T`
+and an argpartition, and are stored in core.SimilarProduct.
+
+`rebuild()` recomputes every product (manage.py rebuild_similar_products).
+`refresh_products(pks)` is the incremental path used by core.signals: it
+recomputes the changed products, the products whose lists contain them,
+and the products they now score high enough to enter. The feature matrix
+is kept in memory between refreshes and only the changed products' rows
+are re-encoded; it is loaded again when a catalog bump of unknown scope
+happened in between, or a product no longer fits the column layout (a
+new style, brand, color or size, or a price outside the range).
+
+NumPy is imported lazily; without it the table is simply left as is.
+"""
+import logging
+import math
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Product, SimilarProduct
+from .response_cache import bump_catalog_version, catalog_changes, catalog_version
+
+logger = logging.getLogger(__name__)
+
+WEIGHTS = {
+    "category": 1.0,
+    "style": 1.0,
+    "brand": 0.8,
+    "colors": 0.6,
+    "sizes": 0.4,
+    "price": 0.8,
+}
+DEFAULT_K = 12
+BATCH_SIZE = 1024
+# cap on one batch's float32 score matrix (batch x catalog size)
+SCORE_BUDGET_BYTES = 64 * 1024 * 1024
+
+
+def top_k():
+    return getattr(settings, "SIMILAR_PRODUCTS_K", DEFAULT_K)
+
+
+def _read_products(products):
+    """(id, category, style, brand id, price) rows of `products` by id, and their color / size ids."""
+    rows = list(products.order_by("id").values_list("id", "category", "style", "brand_id", "price"))
+    colors = defaultdict(list)
+    for pid, cid in Product.colors.through.objects.filter(product__in=products).values_list("product_id", "color_id"):
+        colors[pid].append(cid)
+    sizes = defaultdict(list)
+    for pid, sid in Product.sizes.through.objects.filter(product__in=products).values_list("product_id", "size_id"):
+        sizes[pid].append(sid)
+    return rows, colors, sizes
+
+
+class FeatureSpace:
+    """
+    Feature matrix of all active products; row i belongs to pks[i].
+
+    The column layout (one column per category, style, brand, color and
+    size seen, and the price range) comes from the catalog at `load` time;
+    `update` re-encodes single products within it.
+    """
+
+    def __init__(self, pks, matrix, offsets=None, price_col=0, price_range=(0.0, 0.0)):
+        self.pks = pks
+        self.matrix = matrix
+        self.row_of = {pk: i for i, pk in enumerate(pks)}
+        self.offsets = offsets or {}
+        self.price_col = price_col
+        self.price_range = price_range
+
+    @classmethod
+    def load(cls):
+        import numpy as np
+
+        rows, colors, sizes = _read_products(Product.objects.filter(is_active=True))
+        if not rows:
+            return cls([], np.zeros((0, 0), dtype=np.float32))
+
+        # column layout: one block per feature, vocabularies from the data
+        vocab = {
+            "category": sorted({(r[1] or "").lower() for r in rows}),
+            "style": sorted({(r[2] or "").strip().lower() for r in rows} - {""}),
+            "brand": sorted({r[3] for r in rows if r[3] is not None}),
+            "colors": sorted({c for ids in colors.values() for c in ids}),
+            "sizes": sorted({s for ids in sizes.values() for s in ids}),
+        }
+        offsets, width = {}, 0
+        for name, values in vocab.items():
+            offsets[name] = (width, {v: width + i for i, v in enumerate(values)})
+            width += len(values)
+
+        log_prices = np.log1p(np.array([float(r[4] or 0) for r in rows], dtype=np.float64))
+        space = cls([row[0] for row in rows], None, offsets, width, (log_prices.min(), log_prices.max()))
+        space.matrix = space.encode(rows, colors, sizes)
+        return space
+
+    def encode(self, rows, colors, sizes):
+        """L2-normalized feature rows of `rows` (see _read_products) in this layout."""
+        import numpy as np
+
+        matrix = np.zeros((len(rows), self.price_col + 2), dtype=np.float32)
+        log_prices = np.log1p(np.array([float(r[4] or 0) for r in rows], dtype=np.float64))
+        low, high = self.price_range
+        scaled = (log_prices - low) / (high - low) if high > low else np.zeros_like(log_prices)
+        angle = scaled * (math.pi / 2)
+        matrix[:, self.price_col] = np.cos(angle) * WEIGHTS["price"]
+        matrix[:, self.price_col + 1] = np.sin(angle) * WEIGHTS["price"]
+
+        for i, (pid, category, style, brand_id, _) in enumerate(rows):
+            one_hot = (
+                ("category", (category or "").lower()),
+                ("style", (style or "").strip().lower()),
+                ("brand", brand_id),
+            )
+            for name, value in one_hot:
+                column = self.offsets[name][1].get(value)
+                if column is not None:
+                    matrix[i, column] = WEIGHTS[name]
+            for name, ids in (("colors", colors.get(pid, ())), ("sizes", sizes.get(pid, ()))):
+                if ids:
+                    # multi-hot scaled to unit length: many sizes must not outweigh one brand
+                    value = WEIGHTS[name] / math.sqrt(len(ids))
+                    for key in ids:
+                        matrix[i, self.offsets[name][1][key]] = value
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        matrix /= norms
+        return matrix
+
+    def fits(self, rows, colors, sizes):
+        """Whether `rows` encode within this layout: every value has a column, every price is in range."""
+        if not self.offsets:
+            return not rows
+        columns = {name: table for name, (_, table) in self.offsets.items()}
+        low, high = self.price_range
+        for pid, category, style, brand_id, price in rows:
+            style = (style or "").strip().lower()
+            if (
+                (category or "").lower() not in columns["category"]
+                or (style and style not in columns["style"])
+                or (brand_id is not None and brand_id not in columns["brand"])
+                or not low - 1e-9 <= math.log1p(float(price or 0)) <= high + 1e-9
+                or any(c not in columns["colors"] for c in colors.get(pid, ()))
+                or any(s not in columns["sizes"] for s in sizes.get(pid, ()))
+            ):
+                return False
+        return True
+
+    def update(self, pks):
+        """
+        Re-read products `pks` and replace, add or drop their rows. False
+        (nothing changed) when one no longer fits the layout: load again.
+        """
+        import numpy as np
+
+        rows, colors, sizes = _read_products(Product.objects.filter(pk__in=pks, is_active=True))
+        if not self.fits(rows, colors, sizes):
+            return False
+        live = {row[0] for row in rows}
+        drop = {self.row_of[pk] for pk in pks if pk in self.row_of and pk not in live}
+        matrix = np.delete(self.matrix, sorted(drop), axis=0) if drop else self.matrix
+        order = [pk for i, pk in enumerate(self.pks) if i not in drop]
+        row_of = {pk: i for i, pk in enumerate(order)}
+        added = []
+        if rows:
+            encoded = self.encode(rows, colors, sizes)
+            for i, row in enumerate(rows):
+                if row[0] in row_of:
+                    matrix[row_of[row[0]]] = encoded[i]
+                else:
+                    added.append(i)
+            if added:
+                matrix = np.vstack([matrix, encoded[added]])
+                order.extend(rows[i][0] for i in added)
+        self.pks, self.matrix, self.row_of = order, matrix, {pk: i for i, pk in enumerate(order)}
+        return True
+
+    def neighbours(self, rows, k, batch_size=BATCH_SIZE):
+        """Yield (row, [(neighbour row, score), ...]) best first, for `rows`."""
+        import numpy as np
+
+        n = len(self.pks)
+        k = min(k, n - 1)
+        if k <= 0:
+            for row in rows:
+                yield row, []
+            return
+        rows = np.asarray(rows, dtype=np.int64)
+        batch_size = max(1, min(batch_size, SCORE_BUDGET_BYTES // (4 * n)))
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            scores = self.matrix[batch] @ self.matrix.T
+            scores[np.arange(len(batch)), batch] = -np.inf  # never recommend itself
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            for row, neighbours, values in zip(batch, top, top_scores):
+                yield int(row), list(zip(neighbours.tolist(), values.tolist()))
+
+
+def _store(space, rows, k):
+    """Replace the SimilarProduct rows of the products at `rows`."""
+    links = []
+    product_ids = []
+    for row, neighbours in space.neighbours(rows, k):
+        pid = space.pks[row]
+        product_ids.append(pid)
+        links.extend(
+            SimilarProduct(product_id=pid, similar_id=space.pks[other], rank=rank, score=round(score, 6))
+            for rank, (other, score) in enumerate(neighbours)
+        )
+    with transaction.atomic():
+        SimilarProduct.objects.filter(product_id__in=product_ids).delete()
+        SimilarProduct.objects.bulk_create(links, batch_size=2000)
+    return len(product_ids)
+
+
+def rebuild(k=None, batch_size=BATCH_SIZE):
+    """Recompute similar products for the whole catalog. Returns the product count."""
+    k = k or top_k()
+    space = FeatureSpace.load()
+    with transaction.atomic():
+        SimilarProduct.objects.all().delete()
+        total = 0
+        for start in range(0, len(space.pks), batch_size):
+            total += _store(space, range(start, min(start + batch_size, len(space.pks))), k)
+    transaction.on_commit(bump_catalog_version)
+    return total
+
+
+class _SpaceCache:
+    """The FeatureSpace of the last refresh in this process, with its catalog version."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.space = None
+        self.version = None
+
+    def current(self, pks):
+        """
+        The feature space with products `pks` re-read: the cached one caught
+        up with the products the catalog bumps since touched
+        (core.response_cache.catalog_changes), or a fresh load when there
+        is none, a bump was of unknown scope or a product left the layout.
+        Call with `lock` held.
+        """
+        version = catalog_version()
+        if self.space is not None and version >= self.version:
+            changed = catalog_changes(self.version, version)
+            if changed is not None and self.space.update(changed | set(pks)):
+                self.version = version
+                return self.space
+        self.space, self.version = FeatureSpace.load(), version
+        return self.space
+
+
+_spaces = _SpaceCache()
+
+
+def refresh_products(pks, k=None):
+    """
+    Incremental update after products `pks` changed (saved, deactivated,
+    deleted or had their sizes / colors edited). The feature matrix is kept
+    between calls and only the rows of changed products are re-encoded.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        logger.warning("numpy is not installed; similar products were not refreshed")
+        return 0
+
+    k = k or top_k()
+    pks = set(pks)
+    with _spaces.lock:
+        space = _spaces.current(pks)
+        changed = [space.row_of[pk] for pk in pks if pk in space.row_of]
+        gone = [pk for pk in pks if pk not in space.row_of]
+
+        # lists that currently contain a changed product: its score moved
+        affected = set(pks) | set(
+            SimilarProduct.objects.filter(similar_id__in=pks).values_list("product_id", flat=True)
+        )
+        # lists a changed product may now enter: it beats their current K-th score
+        if changed and len(space.pks) > 1:
+            threshold = np.full(len(space.pks), -np.inf, dtype=np.float32)
+            for pid, score in SimilarProduct.objects.filter(rank=k - 1).values_list("product_id", "score"):
+                row = space.row_of.get(pid)
+                if row is not None:
+                    threshold[row] = score
+            best = (space.matrix @ space.matrix[changed].T).max(axis=1)
+            best[changed] = -np.inf
+            affected.update(space.pks[row] for row in np.nonzero(best > threshold)[0].tolist())
+
+        with transaction.atomic():
+            SimilarProduct.objects.filter(product_id__in=gone).delete()
+            count = _store(space, sorted(space.row_of[pk] for pk in affected if pk in space.row_of), k)
+        transaction.on_commit(lambda: bump_catalog_version(affected | set(gone)))
+        return count
@@ -0,0 +1,224 @@
+# core/response_cache.py
+"""
+Versioned response cache for the read-only catalog endpoints.
+
+Cached payloads are keyed on the action, URL kwargs, host and normalized
+query params *plus* a global catalog version number. Nothing is ever deleted
+on writes: the model signals in core/signals.py bump the version instead, so
+every previously cached entry simply stops being addressed and ages out of
+the backend.
+
+The version counters are core.ContentVersion rows, so a bump made by any
+worker - or by a management command such as import_catalog - reaches every
+process on its next request (one primary-key lookup). Only the payloads
+live in the Django cache alias named by settings.CATALOG_CACHE_ALIAS
+("catalog" by default); a per-process backend such as local memory just
+means each worker warms its own copy.
+
+Catalog bumps made for known products (`bump_catalog_version(product_ids)`)
+also record those ids, so `catalog_changes` can tell an index at an older
+version exactly what to re-read.
+
+A viewset can also name a `volatile_namespace` (products use "stock",
+bumped by every checkout): its bumps leave the cached payloads addressed
+and `refresh_payload` patches the figures it covers into a hit instead,
+once per entry and version.
+
+Hits and misses are counted per action in the same cache alias
+(`cache_stats`; GET /api/cache-stats/ for staff, or manage.py
+catalog_cache_stats). A per-process backend counts per worker, a shared one
+(file, Redis, ...) for the whole site.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import CatalogChange, ContentVersion
+
+# catalog bumps whose product scope is kept (CatalogChange rows)
+CHANGE_LOG_VERSIONS = 1000
+
+
+def get_cache():
+    return caches[getattr(settings, "CATALOG_CACHE_ALIAS", "catalog")]
+
+
+def content_state(namespace="catalog"):
+    """(version, modified unix timestamp) of a content namespace ("catalog", "navbar", "pages")."""
+    row = ContentVersion.objects.filter(pk=namespace).values_list("version", "modified").first()
+    if row is None:
+        # first use: start from a value no entry cached under an earlier
+        # counter uses, and pin "modified" to now - conservative, clients
+        # holding an older copy get a full response once
+        row = ContentVersion.objects.get_or_create(
+            namespace=namespace,
+            defaults={"version": time.time_ns() // 1000, "modified": timezone.now()},
+        )[0]
+        row = (row.version, row.modified)
+    return row[0], row[1].timestamp()
+
+
+def request_state(request, namespace="catalog"):
+    """content_state of `namespace`, read once per request (validators and cache key share it)."""
+    states = getattr(request, "_content_states", None)
+    if states is None:
+        states = request._content_states = {}
+    if namespace not in states:
+        states[namespace] = content_state(namespace)
+    return states[namespace]
+
+
+def content_version(namespace="catalog"):
+    return content_state(namespace)[0]
+
+
+def content_modified(namespace="catalog"):
+    return content_state(namespace)[1]
+
+
+def bump_content_version(namespace="catalog"):
+    bumped = ContentVersion.objects.filter(pk=namespace).update(version=F("version") + 1, modified=timezone.now())
+    if not bumped:
+        content_state(namespace)
+    return content_version(namespace)
+
+
+def catalog_version():
+    return content_version("catalog")
+
+
+def bump_catalog_version(product_ids=None):
+    """
+    Bump the catalog version. With `product_ids` the bump is recorded as
+    touching only those products (core.CatalogChange, same transaction), so
+    in-memory indexes can re-read just them; without, its scope is unknown.
+    """
+    product_ids = set(product_ids or ())
+    if not product_ids:
+        return bump_content_version("catalog")
+    with transaction.atomic():
+        # the row stays locked until commit: `version` is this bump's own
+        version = bump_content_version("catalog")
+        CatalogChange.objects.bulk_create([CatalogChange(version=version, product_id=pk) for pk in product_ids])
+        CatalogChange.objects.filter(version__lte=version - CHANGE_LOG_VERSIONS).delete()
+    return version
+
+
+def catalog_changes(since, until):
+    """
+    Product ids touched by the catalog bumps after version `since` up to
+    `until`, or None when one of them was of unknown scope (or too old).
+    """
+    if not 0 <= until - since <= CHANGE_LOG_VERSIONS:
+        return None
+    versions, product_ids = set(), set()
+    for version, pk in CatalogChange.objects.filter(version__gt=since, version__lte=until).values_list("version", "product_id"):
+        versions.add(version)
+        product_ids.add(pk)
+    return product_ids if len(versions) == until - since else None
+
+
+STATS_KEY = "catalog-stats:{}:{}"
+
+
+def record_lookup(action, hit):
+    """Count a hit or miss of `action` in the cache alias."""
+    cache = get_cache()
+    key = STATS_KEY.format(action, "hits" if hit else "misses")
+    try:
+        cache.incr(key)
+    except ValueError:
+        # first count, or the counter was evicted
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def cache_stats(actions):
+    """{action: {"hits", "misses", "hit_rate"}} of the named actions."""
+    cache = get_cache()
+    counts = cache.get_many([STATS_KEY.format(action, kind) for action in actions for kind in ("hits", "misses")])
+    stats = {}
+    for action in actions:
+        hits = counts.get(STATS_KEY.format(action, "hits"), 0)
+        misses = counts.get(STATS_KEY.format(action, "misses"), 0)
+        stats[action] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+    return stats
+
+
+def reset_cache_stats(actions):
+    get_cache().delete_many([STATS_KEY.format(action, kind) for action in actions for kind in ("hits", "misses")])
+
+
+def response_cache_key(request, action, kwargs, version):
+    params = request.query_params
+    normalized = sorted((key, sorted(params.getlist(key))) for key in params)
+    raw = json.dumps(
+        [action, sorted(kwargs.items()), request.scheme, request.get_host(), normalized],
+        default=str,
+        separators=(",", ":"),
+    )
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return f"catalog:v{version}:{action}:{digest}"
+
+
+class CachedResponseMixin:
+    """
+    Viewset mixin caching `list` / `retrieve` payloads under the catalog version.
+
+    Only successful responses are stored. Lookups are counted (`cache_stats`)
+    and the response carries an `X-Cache: HIT|MISS` header as well.
+
+    With `volatile_namespace` set, an entry remembers that namespace's
+    version; a hit cached under an older one goes through `refresh_payload`
+    (None: render it again) and is stored back.
+    """
+    cached_actions = ("list", "retrieve")
+    volatile_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response("list", super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response("retrieve", super().retrieve, request, *args, **kwargs)
+
+    def refresh_payload(self, data):
+        return data
+
+    def cached_response(self, action, handler, request, *args, **kwargs):
+        if action not in self.cached_actions or not getattr(settings, "CATALOG_CACHE_ENABLED", True):
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = response_cache_key(request, action, kwargs, request_state(request)[0])
+        volatile = request_state(request, self.volatile_namespace)[0] if self.volatile_namespace else None
+        entry = cache.get(key)
+        if entry is not None:
+            cached_at, data = entry
+            if cached_at != volatile:
+                data = self.refresh_payload(data)
+                if data is not None:
+                    cache.set(key, (volatile, data))
+            if data is not None:
+                record_lookup(action, hit=True)
+                response = Response(data, status=status.HTTP_200_OK)
+                response["X-Cache"] = "HIT"
+                return response
+
+        record_lookup(action, hit=False)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, (volatile, response.data))
+        response["X-Cache"] = "MISS"
+        return response
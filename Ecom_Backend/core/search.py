@@ -0,0 +1,174 @@
+# core/search.py
+"""
+Full-text product search backed by an SQLite FTS5 table.
+
+`core_product_fts` mirrors Product.title / subtitle / description with
+rowid == Product.id. It is created by migration 0009, kept in sync from the
+Product post_save / post_delete signals and can be rebuilt from scratch with
+`manage.py rebuild_search_index`.
+
+On databases without FTS5 (or before the migration ran) `filter_products`
+falls back to the old icontains lookups so search keeps working.
+"""
+import logging
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "core_product_fts"
+
+# bm25 column weights: title, subtitle, description
+RANK_WEIGHTS = (10.0, 4.0, 1.0)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_available = None
+
+
+def create_index(cursor):
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "title, subtitle, description, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    weights = ", ".join(str(w) for w in RANK_WEIGHTS)
+    # persistent rank function, so ORDER BY rank uses the weighted bm25
+    cursor.execute(
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', %s)",
+        [f"bm25({weights})"],
+    )
+
+
+def drop_index(cursor):
+    cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def fts_available():
+    """True when the FTS table exists on the default connection (cached)."""
+    global _available
+    if _available is None:
+        if connection.vendor != "sqlite":
+            _available = False
+        else:
+            _available = FTS_TABLE in connection.introspection.table_names()
+    return _available
+
+
+def reset_availability():
+    global _available
+    _available = None
+
+
+def build_match_expression(query):
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term ("boat"* "sho"*), so user input
+    can never inject FTS syntax and partially typed words still match.
+    Returns None when the query holds no searchable word.
+    """
+    tokens = _TOKEN_RE.findall((query or "").lower())
+    if not tokens:
+        return None
+    return " ".join(f'"{tok}"*' for tok in tokens)
+
+
+def filter_products(qs, query, ranked=True):
+    """
+    Restrict a Product queryset to rows matching `query`.
+
+    With `ranked=True` the queryset is ordered by bm25 relevance (best first,
+    newest as tie-break); otherwise the existing ordering is kept.
+    """
+    expression = build_match_expression(query)
+    if expression is None or not fts_available():
+        return qs.filter(
+            Q(title__icontains=query)
+            | Q(subtitle__icontains=query)
+            | Q(description__icontains=query)
+        )
+
+    # the FTS table drives the match; the rank is a correlated lookup that
+    # only runs for the rows left after every other filter
+    match = f"{FTS_TABLE} MATCH %s"
+    qs = qs.filter(pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {match}", (expression,)))
+    if ranked:
+        pk = f"{connection.ops.quote_name(qs.model._meta.db_table)}.{connection.ops.quote_name(qs.model._meta.pk.column)}"
+        rank = RawSQL(f"SELECT rank FROM {FTS_TABLE} WHERE {match} AND rowid = {pk}", (expression,))
+        qs = qs.annotate(search_rank=rank).order_by("search_rank", "-created", "-id")
+    return qs
+
+
+def _row(product):
+    return [product.pk, product.title or "", product.subtitle or "", product.description or ""]
+
+
+def index_product(product):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [product.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, subtitle, description) VALUES (%s, %s, %s, %s)",
+            _row(product),
+        )
+
+
+def index_products(products):
+    """Bulk (re)index an iterable of products, e.g. after bulk_create."""
+    if not fts_available():
+        return
+    rows = [_row(p) for p in products]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [[r[0]] for r in rows])
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, subtitle, description) VALUES (%s, %s, %s, %s)",
+            rows,
+        )
+
+
+def remove_product(pk):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [pk])
+
+
+def rebuild_index(chunk_size=2000):
+    """Drop and repopulate the whole index from the Product table."""
+    from .models import Product
+
+    if connection.vendor != "sqlite":
+        logger.warning("Full-text index requires SQLite FTS5; skipping rebuild on %s", connection.vendor)
+        return 0
+    # one transaction: a crash mid-rebuild leaves the previous index, not a
+    # half-filled one
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                drop_index(cursor)
+                create_index(cursor)
+            reset_availability()
+
+            total = 0
+            batch = []
+            qs = Product.objects.only("id", "title", "subtitle", "description").order_by("id")
+            for product in qs.iterator(chunk_size=chunk_size):
+                batch.append(product)
+                if len(batch) >= chunk_size:
+                    index_products(batch)
+                    total += len(batch)
+                    batch = []
+            index_products(batch)
+            total += len(batch)
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    finally:
+        reset_availability()
+    return total
@@ -1,427 +1,602 @@
-# core/serializers.py
-from decimal import Decimal
-from django.conf import settings
-from django.db import transaction
-from django.shortcuts import get_object_or_404
-
-from rest_framework import serializers
-
-from .models import (
-    Navbar, Product, ProductImage, Brand, Color, Size,
-    Cart, CartItem, Order, OrderItem, UserCheckoutDetail
-)
-
-from .models import OrderTrackingEvent
-
-class OrderTrackingEventSerializer(serializers.ModelSerializer):
-    timestamp_readable = serializers.SerializerMethodField()
-
-    class Meta:
-        model = OrderTrackingEvent
-        fields = ("id", "status", "timestamp", "timestamp_readable", "location", "note")
-
-    def get_timestamp_readable(self, obj):
-        # Example: "May 21,2025 | 03:45 pm"
-        return obj.timestamp.strftime("%b %d,%Y | %I:%M %p")
-
-
-class ProductImageSerializer(serializers.ModelSerializer):
-    url = serializers.SerializerMethodField()
-
-    class Meta:
-        model = ProductImage
-        fields = ("id", "url", "alt_text", "order")
-
-    def get_url(self, obj):
-        if not getattr(obj, "image", None):
-            return None
-        request = self.context.get("request", None)
-
-        if request is not None:
-            try:
-                return request.build_absolute_uri(obj.image.url)
-            except Exception:
-                return obj.image.url
-
-        site_protocol = getattr(settings, "SITE_PROTOCOL", None)
-        site_domain = getattr(settings, "SITE_DOMAIN", None)
-        if site_protocol and site_domain:
-            return f"{site_protocol}://{site_domain}{obj.image.url}"
-
-        return obj.image.url
-
-
-class BrandSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Brand
-        fields = ("id", "name", "slug")
-
-
-class ColorSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Color
-        fields = ("id", "name", "hex")
-
-
-class SizeSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Size
-        fields = ("id", "label")
-
-
-class ProductSerializer(serializers.ModelSerializer):
-    images = ProductImageSerializer(many=True, read_only=True)
-    brand = BrandSerializer(read_only=True)
-    colors = ColorSerializer(many=True, read_only=True)
-    sizes = SizeSerializer(many=True, read_only=True)
-
-    class Meta:
-        model = Product
-        fields = (
-            "id",
-            "title",
-            "subtitle",
-            "slug",
-            "price",
-            "mrp",
-            "description",
-            "category",
-            "style",
-            "brand",
-            "sizes",
-            "colors",
-            "rating",
-            "images",
-            "stock",
-        )
-
-
-class ProductDetailSerializer(ProductSerializer):
-    variant_thumbs = serializers.SerializerMethodField()
-
-    class Meta(ProductSerializer.Meta):
-        fields = ProductSerializer.Meta.fields + ("variant_thumbs",)
-
-    def get_variant_thumbs(self, obj):
-        imgs = obj.images.all().order_by("order")[:5]
-        request = self.context.get("request", None)
-        urls = []
-        for im in imgs:
-            if not getattr(im, "image", None):
-                urls.append(None)
-                continue
-            if request is not None:
-                try:
-                    urls.append(request.build_absolute_uri(im.image.url))
-                except Exception:
-                    urls.append(im.image.url)
-            else:
-                site_protocol = getattr(settings, "SITE_PROTOCOL", None)
-                site_domain = getattr(settings, "SITE_DOMAIN", None)
-                if site_protocol and site_domain:
-                    urls.append(f"{site_protocol}://{site_domain}{im.image.url}")
-                else:
-                    urls.append(im.image.url)
-        return urls
-
-
-class NavbarSerializer(serializers.ModelSerializer):
-    logo_url = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Navbar
-        fields = ("id", "site_name", "logo", "logo_url")
-
-    def get_logo_url(self, obj):
-        if not getattr(obj, "logo", None):
-            return None
-
-        request = self.context.get("request", None)
-        if request is not None:
-            try:
-                return request.build_absolute_uri(obj.logo.url)
-            except Exception:
-                return obj.logo.url
-
-        site_protocol = getattr(settings, "SITE_PROTOCOL", None)
-        site_domain = getattr(settings, "SITE_DOMAIN", None)
-        if site_protocol and site_domain:
-            return f"{site_protocol}://{site_domain}{obj.logo.url}"
-
-        return obj.logo.url
-
-
-# ---------- Cart serializers ----------
-class CartItemSerializer(serializers.ModelSerializer):
-    product = ProductSerializer(read_only=True)
-    product_id = serializers.PrimaryKeyRelatedField(
-        queryset=Product.objects.all(), source="product", write_only=True, required=False
-    )
-    line_total = serializers.SerializerMethodField(read_only=True)
-
-    class Meta:
-        model = CartItem
-        fields = ("id", "product", "product_id", "quantity", "size", "line_total")
-        read_only_fields = ("id", "product", "line_total")
-
-    def get_line_total(self, obj):
-        try:
-            lt = obj.line_total()
-            return str(lt) if isinstance(lt, Decimal) else lt
-        except Exception:
-            return "0.00"
-
-    def validate_quantity(self, value):
-        if value is None:
-            raise serializers.ValidationError("Quantity is required.")
-        if value < 1:
-            raise serializers.ValidationError("Quantity must be at least 1.")
-        return value
-
-
-class CartSerializer(serializers.ModelSerializer):
-    items = CartItemSerializer(many=True)
-
-    class Meta:
-        model = Cart
-        fields = ("id", "user", "created", "updated", "items")
-        read_only_fields = ("created", "updated", "id")
-
-    def _resolve_product_instance(self, val):
-        if hasattr(val, "id"):
-            return val
-        try:
-            pid = int(val)
-        except Exception:
-            pid = None
-        if pid is None:
-            raise serializers.ValidationError({"product": "Invalid product identifier."})
-        return get_object_or_404(Product, pk=pid)
-
-    def create(self, validated_data):
-        items_data = validated_data.pop("items", [])
-        cart = Cart.objects.create(**validated_data)
-        for it in items_data:
-            prod = it.get("product") or it.get("product_id") or it.get("product_id", None)
-            if prod is None:
-                raise serializers.ValidationError({"product": "Product is required for each cart item."})
-            product = self._resolve_product_instance(prod)
-            quantity = int(it.get("quantity", 1) or 1)
-            size = it.get("size", "") or ""
-            CartItem.objects.create(cart=cart, product=product, quantity=quantity, size=size)
-        return cart
-
-    def update(self, instance, validated_data):
-        replace = validated_data.pop("replace", False)
-        incoming_items = validated_data.pop("items", [])
-
-        incoming_map = {}
-        for it in incoming_items:
-            prod = it.get("product") or it.get("product_id")
-            if prod is None:
-                continue
-            if hasattr(prod, "id"):
-                prod_id = prod.id
-            else:
-                try:
-                    prod_id = int(prod)
-                except Exception:
-                    raise serializers.ValidationError({"product": f"Invalid product id: {prod}"})
-            size = it.get("size", "") or ""
-            qty = int(it.get("quantity", 1) or 1)
-            incoming_map[(prod_id, size)] = {"product_id": prod_id, "quantity": qty, "size": size}
-
-        existing_items = {(ci.product.id, ci.size or ""): ci for ci in instance.items.all()}
-
-        if replace:
-            for key, ci in list(existing_items.items()):
-                if key not in incoming_map:
-                    ci.delete()
-            for key, payload in incoming_map.items():
-                if key in existing_items:
-                    ci = existing_items[key]
-                    ci.quantity = payload["quantity"]
-                    ci.save()
-                else:
-                    CartItem.objects.create(cart=instance, product_id=payload["product_id"], quantity=payload["quantity"], size=payload["size"])
-        else:
-            for key, payload in incoming_map.items():
-                if key in existing_items:
-                    ci = existing_items[key]
-                    ci.quantity = payload["quantity"]
-                    ci.save()
-                else:
-                    CartItem.objects.create(cart=instance, product_id=payload["product_id"], quantity=payload["quantity"], size=payload["size"])
-
-        instance.save()
-        return instance
-
-
-# ---------- Order serializers (create) ----------
-class OrderItemSerializer(serializers.ModelSerializer):
-    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all())
-
-    class Meta:
-        model = OrderItem
-        fields = ("product", "quantity", "size")
-        extra_kwargs = {"quantity": {"required": True}}
-
-
-class OrderCreateSerializer(serializers.ModelSerializer):
-    items = OrderItemSerializer(many=True)
-    payment_method = serializers.ChoiceField(choices=Order.PaymentMethod.choices)
-
-    class Meta:
-        model = Order
-        fields = ("fullname", "email", "shipping_address", "payment_method", "items")
-
-    def validate_items(self, value):
-        if not value:
-            raise serializers.ValidationError("Order must contain at least one item.")
-        return value
-
-    def create(self, validated_data):
-        items_data = validated_data.pop("items")
-        with transaction.atomic():
-            total = Decimal("0")
-            locked = {}
-            for it in items_data:
-                prod_obj = it["product"]
-                pid = prod_obj.pk if hasattr(prod_obj, "pk") else int(prod_obj)
-                if pid not in locked:
-                    locked[pid] = Product.objects.select_for_update().get(pk=pid)
-                product = locked[pid]
-                qty = int(it["quantity"])
-                if product.stock < qty:
-                    raise serializers.ValidationError({
-                        "stock": f"Not enough stock for product {product.title}. Requested {qty}, available {product.stock}."
-                    })
-            order = Order.objects.create(**validated_data, total_amount=Decimal("0"))
-            for it in items_data:
-                prod_obj = it["product"]
-                pid = prod_obj.pk if hasattr(prod_obj, "pk") else int(prod_obj)
-                product = locked[pid]
-                qty = int(it["quantity"])
-                OrderItem.objects.create(
-                    order=order,
-                    product=product,
-                    title=product.title,
-                    price=product.price,
-                    quantity=qty,
-                    size=it.get("size", ""),
-                )
-                total += (product.price or Decimal("0")) * Decimal(qty)
-                product.stock = max(product.stock - qty, 0)
-                product.save()
-            order.total_amount = total
-            order.save()
-            return order
-
-
-# ---------- NEW: Order detail serializers (after ProductSerializer) ----------
-class OrderItemDetailSerializer(serializers.ModelSerializer):
-    product = ProductSerializer(read_only=True)
-
-    class Meta:
-        model = OrderItem
-        fields = ("id", "product", "title", "price", "quantity", "size")
-
-
-class OrderDetailSerializer(serializers.ModelSerializer):
-    items = OrderItemDetailSerializer(many=True, read_only=True)
-    tracking_events = OrderTrackingEventSerializer(many=True, read_only=True)
-
-    class Meta:
-        model = Order
-        fields = (
-            "id",
-            "user",
-            "fullname",
-            "email",
-            "payment_method",
-            "total_amount",
-            "shipping_address",
-            "created",
-            "paid",
-            "items",
-            "tracking_events",
-        )
-        read_only_fields = ("id", "created", "paid", "total_amount")
-
-
-# --------- UserCheckoutDetail serializer ----------
-class UserCheckoutDetailSerializer(serializers.ModelSerializer):
-    # Accept raw_card_number only temporarily from the frontend (if you MUST),
-    # but ensure we never save cvv and never persist full card number.
-    raw_card_number = serializers.CharField(write_only=True, required=False, allow_blank=True,
-                                            help_text="Raw PAN (write-only). Will be masked and only last4 kept.")
-    raw_expiration = serializers.CharField(write_only=True, required=False, allow_blank=True,
-                                           help_text="MM/YY or MM/YYYY")
-
-    class Meta:
-        model = UserCheckoutDetail
-        # Do not include payment_token or card_last4 as writable from user directly.
-        fields = (
-            "id", "first_name", "last_name", "email", "phone_number",
-            "card_holder_name", "card_last4", "card_brand", "card_expiry", "raw_card_number", "raw_expiration",
-            "payment_method", "address_line1", "city", "state", "pincode", "landmark", "created",
-        )
-        read_only_fields = ("id", "card_last4", "card_brand", "card_expiry", "created")
-
-    def validate(self, data):
-        # Basic validation: if payment_method is 'card', ensure we have raw_card_number or token
-        pm = data.get("payment_method") or self.instance and self.instance.payment_method
-        raw = data.get("raw_card_number")
-        token = data.get("payment_token") if "payment_token" in data else None
-        if pm == "card" and not (raw or token):
-            raise serializers.ValidationError({"payment_method": "Card payments require card number or gateway token."})
-        return data
-
-    def create(self, validated_data):
-        # Extract any raw card info and fill card_last4/card_brand/card_expiry from it
-        raw_pan = validated_data.pop("raw_card_number", None)
-        raw_exp = validated_data.pop("raw_expiration", None)
-        # naive brand detection
-        card_brand = ""
-        card_last4 = ""
-        card_expiry = ""
-        if raw_pan:
-            digits = "".join(ch for ch in raw_pan if ch.isdigit())
-            if len(digits) >= 4:
-                card_last4 = digits[-4:]
-            # simple BIN checks (very basic)
-            if digits.startswith("4"):
-                card_brand = "VISA"
-            elif digits.startswith(("51", "52", "53", "54", "55")):
-                card_brand = "MASTERCARD"
-            # else leave blank
-        if raw_exp:
-            card_expiry = raw_exp
-
-        validated_data["card_last4"] = card_last4
-        validated_data["card_brand"] = card_brand
-        validated_data["card_expiry"] = card_expiry
-
-        # user will be set in the view (do not rely on serializer to set request.user)
-        return UserCheckoutDetail.objects.create(**validated_data)
-
-    def update(self, instance, validated_data):
-        # Avoid updating card_last4/card_brand directly in update unless raw_pan provided
-        raw_pan = validated_data.pop("raw_card_number", None)
-        raw_exp = validated_data.pop("raw_expiration", None)
-        if raw_pan:
-            digits = "".join(ch for ch in raw_pan if ch.isdigit())
-            if len(digits) >= 4:
-                instance.card_last4 = digits[-4:]
-            if digits.startswith("4"):
-                instance.card_brand = "VISA"
-            elif digits.startswith(("51","52","53","54","55")):
-                instance.card_brand = "MASTERCARD"
-        if raw_exp:
-            instance.card_expiry = raw_exp
-
-        # update other simple fields
-        for attr, val in validated_data.items():
-            setattr(instance, attr, val)
-        instance.save()
+# core/serializers.py
+from collections import Counter
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.shortcuts import get_object_or_404
+
+from rest_framework import serializers
+
+from .models import (
+    Navbar, Product, ProductImage, ProductVariant, Brand, Color, Size,
+    Cart, CartItem, Order, OrderItem, UserCheckoutDetail
+)
+from . import carts, inventory
+
+from .models import OrderTrackingEvent
+from .images import build_srcset
+
+class OrderTrackingEventSerializer(serializers.ModelSerializer):
+    timestamp_readable = serializers.SerializerMethodField()
+
+    class Meta:
+        model = OrderTrackingEvent
+        fields = ("id", "status", "timestamp", "timestamp_readable", "location", "note")
+
+    def get_timestamp_readable(self, obj):
+        # Example: "May 21,2025 | 03:45 pm"
+        return obj.timestamp.strftime("%b %d,%Y | %I:%M %p")
+
+
+def absolute_media_url(request, url):
+    """Absolute URL for a media path, same rules as ProductImageSerializer.get_url."""
+    if request is not None:
+        try:
+            return request.build_absolute_uri(url)
+        except Exception:
+            return url
+
+    site_protocol = getattr(settings, "SITE_PROTOCOL", None)
+    site_domain = getattr(settings, "SITE_DOMAIN", None)
+    if site_protocol and site_domain:
+        return f"{site_protocol}://{site_domain}{url}"
+
+    return url
+
+
+class ProductImageSerializer(serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ProductImage
+        fields = ("id", "url", "alt_text", "order", "srcset")
+
+    def get_srcset(self, obj):
+        # resized variants served by /media/r/<w>x0/..., one per IMAGE_RESIZE_WIDTHS
+        if not getattr(obj, "image", None):
+            return None
+        request = self.context.get("request", None)
+        return build_srcset(obj.image.name, lambda url: absolute_media_url(request, url))
+
+    def get_url(self, obj):
+        if not getattr(obj, "image", None):
+            return None
+        request = self.context.get("request", None)
+
+        if request is not None:
+            try:
+                return request.build_absolute_uri(obj.image.url)
+            except Exception:
+                return obj.image.url
+
+        site_protocol = getattr(settings, "SITE_PROTOCOL", None)
+        site_domain = getattr(settings, "SITE_DOMAIN", None)
+        if site_protocol and site_domain:
+            return f"{site_protocol}://{site_domain}{obj.image.url}"
+
+        return obj.image.url
+
+
+class BrandSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Brand
+        fields = ("id", "name", "slug")
+
+
+class ColorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Color
+        fields = ("id", "name", "hex")
+
+
+class SizeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Size
+        fields = ("id", "label")
+
+
+class SparseFieldsMixin:
+    """
+    Trim the output to a requested subset of fields.
+
+    The view puts `fields` (allow-list, or None for all) and `omit` (deny-list)
+    into the serializer context; serializers nested elsewhere (cart, orders)
+    never receive those keys and keep their full shape.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        only = self.context.get("fields")
+        omit = self.context.get("omit") or ()
+        if only is None and not omit:
+            return fields
+        for name in list(fields):
+            if (only is not None and name not in only) or name in omit:
+                fields.pop(name)
+        return fields
+
+
+class ProductSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    images = ProductImageSerializer(many=True, read_only=True)
+    brand = BrandSerializer(read_only=True)
+    colors = ColorSerializer(many=True, read_only=True)
+    sizes = SizeSerializer(many=True, read_only=True)
+    main_image = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Product
+        fields = (
+            "id",
+            "title",
+            "subtitle",
+            "slug",
+            "price",
+            "mrp",
+            "description",
+            "category",
+            "style",
+            "brand",
+            "sizes",
+            "colors",
+            "rating",
+            "images",
+            "stock",
+            "main_image",
+            "image_count",
+        )
+
+    def get_main_image(self, obj):
+        # denormalized first image: no images query needed
+        if not obj.primary_image:
+            return None
+        return absolute_media_url(self.context.get("request", None), obj.primary_image.url)
+
+
+class ProductVariantSerializer(serializers.ModelSerializer):
+    size = serializers.CharField(source="size.label", default="", read_only=True)
+
+    class Meta:
+        model = ProductVariant
+        fields = ("id", "sku", "size", "color", "stock")
+
+
+class ProductDetailSerializer(ProductSerializer):
+    variant_thumbs = serializers.SerializerMethodField()
+    # per-size stock (core.inventory); variant_thumbs above are just images
+    variants = ProductVariantSerializer(many=True, read_only=True)
+
+    class Meta(ProductSerializer.Meta):
+        fields = ProductSerializer.Meta.fields + ("variant_thumbs", "variants")
+
+    def get_variant_thumbs(self, obj):
+        # slice in Python so the prefetched images are reused
+        imgs = obj.ordered_images()[:5]
+        request = self.context.get("request", None)
+        urls = []
+        for im in imgs:
+            if not getattr(im, "image", None):
+                urls.append(None)
+                continue
+            if request is not None:
+                try:
+                    urls.append(request.build_absolute_uri(im.image.url))
+                except Exception:
+                    urls.append(im.image.url)
+            else:
+                site_protocol = getattr(settings, "SITE_PROTOCOL", None)
+                site_domain = getattr(settings, "SITE_DOMAIN", None)
+                if site_protocol and site_domain:
+                    urls.append(f"{site_protocol}://{site_domain}{im.image.url}")
+                else:
+                    urls.append(im.image.url)
+        return urls
+
+
+class NavbarSerializer(serializers.ModelSerializer):
+    logo_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Navbar
+        fields = ("id", "site_name", "logo", "logo_url")
+
+    def get_logo_url(self, obj):
+        if not getattr(obj, "logo", None):
+            return None
+
+        request = self.context.get("request", None)
+        if request is not None:
+            try:
+                return request.build_absolute_uri(obj.logo.url)
+            except Exception:
+                return obj.logo.url
+
+        site_protocol = getattr(settings, "SITE_PROTOCOL", None)
+        site_domain = getattr(settings, "SITE_DOMAIN", None)
+        if site_protocol and site_domain:
+            return f"{site_protocol}://{site_domain}{obj.logo.url}"
+
+        return obj.logo.url
+
+
+# ---------- Cart serializers ----------
+class CartItemSerializer(serializers.ModelSerializer):
+    product = ProductSerializer(read_only=True)
+    product_id = serializers.PrimaryKeyRelatedField(
+        queryset=Product.objects.all(), source="product", write_only=True, required=False
+    )
+    line_total = serializers.SerializerMethodField(read_only=True)
+
+    class Meta:
+        model = CartItem
+        fields = ("id", "product", "product_id", "quantity", "size", "variant", "line_total")
+        read_only_fields = ("id", "product", "variant", "line_total")
+
+    def get_line_total(self, obj):
+        try:
+            lt = obj.line_total()
+            return str(lt) if isinstance(lt, Decimal) else lt
+        except Exception:
+            return "0.00"
+
+    def validate_quantity(self, value):
+        if value is None:
+            raise serializers.ValidationError("Quantity is required.")
+        if value < 1:
+            raise serializers.ValidationError("Quantity must be at least 1.")
+        return value
+
+
+class CartSerializer(serializers.ModelSerializer):
+    items = CartItemSerializer(many=True)
+
+    class Meta:
+        model = Cart
+        fields = ("id", "user", "created", "updated", "items", "item_count", "subtotal")
+        read_only_fields = ("created", "updated", "id", "item_count", "subtotal")
+
+    def _resolve_product_instance(self, val):
+        if hasattr(val, "id"):
+            return val
+        try:
+            pid = int(val)
+        except Exception:
+            pid = None
+        if pid is None:
+            raise serializers.ValidationError({"product": "Invalid product identifier."})
+        return get_object_or_404(Product, pk=pid)
+
+    @staticmethod
+    def _variant_for(product_id, size):
+        variant = inventory.find_variant(product_id, size)
+        if variant is None:
+            raise serializers.ValidationError({"size": inventory.size_error(f"Product {product_id}", size)})
+        return variant
+
+    @transaction.atomic
+    def create(self, validated_data):
+        items_data = validated_data.pop("items", [])
+        cart = Cart.objects.create(**validated_data)
+        count, amount = 0, Decimal("0")
+        for it in items_data:
+            prod = it.get("product") or it.get("product_id") or it.get("product_id", None)
+            if prod is None:
+                raise serializers.ValidationError({"product": "Product is required for each cart item."})
+            product = self._resolve_product_instance(prod)
+            quantity = int(it.get("quantity", 1) or 1)
+            size = it.get("size", "") or ""
+            variant = self._variant_for(product.pk, size)
+            CartItem.objects.create(cart=cart, product=product, quantity=quantity, size=size, variant=variant)
+            count += quantity
+            amount += carts.line_amount(product.price, quantity)
+        carts.apply_delta(cart, count, amount)
+        return cart
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        replace = validated_data.pop("replace", False)
+        incoming_items = validated_data.pop("items", [])
+
+        incoming_map = {}
+        for it in incoming_items:
+            prod = it.get("product") or it.get("product_id")
+            if prod is None:
+                continue
+            if hasattr(prod, "id"):
+                prod_id = prod.id
+            else:
+                try:
+                    prod_id = int(prod)
+                except Exception:
+                    raise serializers.ValidationError({"product": f"Invalid product id: {prod}"})
+            size = it.get("size", "") or ""
+            qty = int(it.get("quantity", 1) or 1)
+            incoming_map[(prod_id, size)] = {"product_id": prod_id, "quantity": qty, "size": size}
+
+        existing_items = {
+            (ci.product_id, ci.size or ""): ci
+            for ci in instance.items.select_related("product")
+        }
+        prices = dict(
+            Product.objects.filter(pk__in={key[0] for key in incoming_map}).values_list("id", "price")
+        )
+        # net change of the stored totals, applied once at the end
+        count, amount = 0, Decimal("0")
+
+        if replace:
+            for key, ci in list(existing_items.items()):
+                if key not in incoming_map:
+                    ci.delete()
+                    count -= ci.quantity
+                    amount -= carts.line_amount(ci.product.price, ci.quantity)
+        for key, payload in incoming_map.items():
+            if key in existing_items:
+                ci = existing_items[key]
+                count += payload["quantity"] - ci.quantity
+                amount += carts.line_amount(ci.product.price, payload["quantity"] - ci.quantity)
+                ci.quantity = payload["quantity"]
+                ci.save()
+            else:
+                CartItem.objects.create(
+                    cart=instance, product_id=payload["product_id"], quantity=payload["quantity"],
+                    size=payload["size"], variant=self._variant_for(payload["product_id"], payload["size"]),
+                )
+                count += payload["quantity"]
+                amount += carts.line_amount(prices.get(payload["product_id"]), payload["quantity"])
+
+        carts.apply_delta(instance, count, amount)
+        # only the timestamp: the totals were just updated in SQL
+        instance.save(update_fields=["updated"])
+        return instance
+
+
+class CompactCartItemSerializer(serializers.ModelSerializer):
+    """Flat cart line: reads only the item row and its product row."""
+    product_id = serializers.IntegerField(read_only=True)
+    title = serializers.CharField(source="product.title", read_only=True)
+    price = serializers.DecimalField(source="product.price", max_digits=10, decimal_places=2, read_only=True)
+    main_image = serializers.SerializerMethodField()
+    line_total = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CartItem
+        fields = ("id", "product_id", "title", "price", "main_image", "size", "quantity", "line_total")
+
+    def get_main_image(self, obj):
+        if not obj.product.primary_image:
+            return None
+        return absolute_media_url(self.context.get("request", None), obj.product.primary_image.url)
+
+    def get_line_total(self, obj):
+        return str(obj.line_total())
+
+
+class CompactCartSerializer(serializers.ModelSerializer):
+    """`?view=compact` cart payload: no nested product serializer."""
+    items = CompactCartItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Cart
+        fields = ("id", "user", "updated", "items", "item_count", "subtotal")
+
+
+class CartAddItemSerializer(serializers.Serializer):
+    """Body of POST /api/cart/{id}/add_item/."""
+    product_id = serializers.IntegerField()
+    size = serializers.CharField(max_length=64, required=False, allow_blank=True, allow_null=True, default="")
+    quantity = serializers.IntegerField(min_value=1, required=False, default=1)
+
+
+class CartOpSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=carts.OPS)
+    product_id = serializers.IntegerField()
+    size = serializers.CharField(max_length=64, required=False, allow_blank=True, default="")
+    quantity = serializers.IntegerField(min_value=0, required=False, default=1)
+
+    def validate(self, attrs):
+        if attrs["op"] == "add" and attrs["quantity"] < 1:
+            raise serializers.ValidationError({"quantity": "Quantity must be at least 1."})
+        return attrs
+
+
+class CartOpsSerializer(serializers.Serializer):
+    """Body of POST /api/cart/{id}/ops/: {"ops": [{"op", "product_id", "size", "quantity"}, ...]}."""
+    ops = CartOpSerializer(many=True, allow_empty=False, max_length=carts.MAX_OPS)
+
+
+# ---------- Order serializers (create) ----------
+class OrderItemSerializer(serializers.ModelSerializer):
+    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all())
+    # only variants of a size the product still offers can be ordered
+    variant = serializers.PrimaryKeyRelatedField(queryset=inventory.current_variants(), required=False, allow_null=True)
+
+    class Meta:
+        model = OrderItem
+        fields = ("product", "quantity", "size", "variant")
+        extra_kwargs = {"quantity": {"required": True}}
+
+
+class OrderCreateSerializer(serializers.ModelSerializer):
+    items = OrderItemSerializer(many=True)
+    payment_method = serializers.ChoiceField(choices=Order.PaymentMethod.choices)
+
+    class Meta:
+        model = Order
+        fields = ("fullname", "email", "shipping_address", "payment_method", "items")
+
+    def validate_items(self, value):
+        if not value:
+            raise serializers.ValidationError("Order must contain at least one item.")
+        return value
+
+    def create(self, validated_data):
+        items_data = validated_data.pop("items")
+        with transaction.atomic():
+            # stock is per size: resolve each line to its variant (explicit, or
+            # by size label) and lock only those rows, in id order
+            lookup = inventory.variant_lookup({it["product"].pk for it in items_data})
+            current = {variant.pk: variant for variant in lookup.values()}
+            lines = []
+            for it in items_data:
+                product, size = it["product"], (it.get("size") or "").strip()
+                if it.get("variant") is not None:
+                    # an explicit variant must be this product's, in the size the
+                    # line records (a blank size takes the variant's)
+                    variant = current.get(it["variant"].pk)
+                    label = variant.size.label.strip() if variant is not None and variant.size_id else ""
+                    if variant is None or variant.product_id != product.pk or (size and size.lower() != label.lower()):
+                        wanted = f" in size {size!r}" if size else ""
+                        raise serializers.ValidationError({
+                            "variant": f"Variant {it['variant'].pk} is not {product.title}{wanted}."
+                        })
+                    size = size or label
+                else:
+                    variant = lookup.get((product.pk, size.lower()))
+                    if variant is None:
+                        raise serializers.ValidationError({"size": inventory.size_error(product.title, size)})
+                lines.append((product, variant, size, int(it["quantity"])))
+
+            needed = Counter()
+            for _, variant, _, qty in lines:
+                needed[variant.pk] += qty
+            locked = {
+                v.pk: v
+                for v in ProductVariant.objects.select_for_update().filter(pk__in=sorted(needed)).order_by("pk")
+            }
+            for product, variant, size, _ in lines:
+                available = locked[variant.pk].stock
+                if available < needed[variant.pk]:
+                    raise serializers.ValidationError({
+                        "stock": f"Not enough stock for product {product.title} ({size or 'one size'}). "
+                                 f"Requested {needed[variant.pk]}, available {available}."
+                    })
+
+            total = sum(((product.price or Decimal("0")) * Decimal(qty) for product, _, _, qty in lines), Decimal("0"))
+            order = Order.objects.create(**validated_data, total_amount=total)
+            OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order,
+                    product=product,
+                    variant_id=variant.pk,
+                    title=product.title,
+                    price=product.price,
+                    quantity=qty,
+                    size=size,
+                )
+                for product, variant, size, qty in lines
+            ])
+            for variant_id, qty in needed.items():
+                ProductVariant.objects.filter(pk=variant_id).update(stock=F("stock") - qty)
+            # Product.stock totals and cached cards catch up after commit
+            inventory.stock_changed(product.pk for product, _, _, _ in lines)
+            return order
+
+
+# ---------- NEW: Order detail serializers (after ProductSerializer) ----------
+class OrderItemDetailSerializer(serializers.ModelSerializer):
+    product = ProductSerializer(read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = ("id", "product", "title", "price", "quantity", "size")
+
+
+class OrderDetailSerializer(serializers.ModelSerializer):
+    items = OrderItemDetailSerializer(many=True, read_only=True)
+    tracking_events = OrderTrackingEventSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = (
+            "id",
+            "user",
+            "fullname",
+            "email",
+            "payment_method",
+            "total_amount",
+            "shipping_address",
+            "created",
+            "paid",
+            "items",
+            "tracking_events",
+        )
+        read_only_fields = ("id", "created", "paid", "total_amount")
+
+
+# --------- UserCheckoutDetail serializer ----------
+class UserCheckoutDetailSerializer(serializers.ModelSerializer):
+    # Accept raw_card_number only temporarily from the frontend (if you MUST),
+    # but ensure we never save cvv and never persist full card number.
+    raw_card_number = serializers.CharField(write_only=True, required=False, allow_blank=True,
+                                            help_text="Raw PAN (write-only). Will be masked and only last4 kept.")
+    raw_expiration = serializers.CharField(write_only=True, required=False, allow_blank=True,
+                                           help_text="MM/YY or MM/YYYY")
+
+    class Meta:
+        model = UserCheckoutDetail
+        # Do not include payment_token or card_last4 as writable from user directly.
+        fields = (
+            "id", "first_name", "last_name", "email", "phone_number",
+            "card_holder_name", "card_last4", "card_brand", "card_expiry", "raw_card_number", "raw_expiration",
+            "payment_method", "address_line1", "city", "state", "pincode", "landmark", "created",
+        )
+        read_only_fields = ("id", "card_last4", "card_brand", "card_expiry", "created")
+
+    def validate(self, data):
+        # Basic validation: if payment_method is 'card', ensure we have raw_card_number or token
+        pm = data.get("payment_method") or self.instance and self.instance.payment_method
+        raw = data.get("raw_card_number")
+        token = data.get("payment_token") if "payment_token" in data else None
+        if pm == "card" and not (raw or token):
+            raise serializers.ValidationError({"payment_method": "Card payments require card number or gateway token."})
+        return data
+
+    def create(self, validated_data):
+        # Extract any raw card info and fill card_last4/card_brand/card_expiry from it
+        raw_pan = validated_data.pop("raw_card_number", None)
+        raw_exp = validated_data.pop("raw_expiration", None)
+        # naive brand detection
+        card_brand = ""
+        card_last4 = ""
+        card_expiry = ""
+        if raw_pan:
+            digits = "".join(ch for ch in raw_pan if ch.isdigit())
+            if len(digits) >= 4:
+                card_last4 = digits[-4:]
+            # simple BIN checks (very basic)
+            if digits.startswith("4"):
+                card_brand = "VISA"
+            elif digits.startswith(("51", "52", "53", "54", "55")):
+                card_brand = "MASTERCARD"
+            # else leave blank
+        if raw_exp:
+            card_expiry = raw_exp
+
+        validated_data["card_last4"] = card_last4
+        validated_data["card_brand"] = card_brand
+        validated_data["card_expiry"] = card_expiry
+
+        # user will be set in the view (do not rely on serializer to set request.user)
+        return UserCheckoutDetail.objects.create(**validated_data)
+
+    def update(self, instance, validated_data):
+        # Avoid updating card_last4/card_brand directly in update unless raw_pan provided
+        raw_pan = validated_data.pop("raw_card_number", None)
+        raw_exp = validated_data.pop("raw_expiration", None)
+        if raw_pan:
+            digits = "".join(ch for ch in raw_pan if ch.isdigit())
+            if len(digits) >= 4:
+                instance.card_last4 = digits[-4:]
+            if digits.startswith("4"):
+                instance.card_brand = "VISA"
+            elif digits.startswith(("51","52","53","54","55")):
+                instance.card_brand = "MASTERCARD"
+        if raw_exp:
+            instance.card_expiry = raw_exp
+
+        # update other simple fields
+        for attr, val in validated_data.items():
+            setattr(instance, attr, val)
+        instance.save()
         return instance
\ No newline at end of file
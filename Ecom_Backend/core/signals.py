@@ -1,21 +1,181 @@
-# core/signals.py
-from django.dispatch import receiver
-from django.db.models.signals import post_save
-from django.conf import settings
-from django.core.mail import send_mail
-from django.core.signing import TimestampSigner
-from django.urls import reverse
-from django.contrib.auth import get_user_model
-
-User = get_user_model()
-signer = TimestampSigner()
-
-@receiver(post_save, sender=User)
-def send_registration_email(sender, instance, created, **kwargs):
-    if created:
-        token = signer.sign(instance.pk)
-        verify_path = reverse("auth-verify-email")
-        verify_url = f"{settings.SITE_PROTOCOL}://{settings.SITE_DOMAIN}{verify_path}?token={token}" if getattr(settings, "SITE_DOMAIN", None) else verify_path
-        subject = "Verify your account"
-        message = f"Thanks for registering. Verify: {verify_url}"
-        send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [instance.email], fail_silently=True)
+# core/signals.py
+import threading
+import weakref
+
+from django.dispatch import receiver
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save, m2m_changed
+from django.conf import settings
+from django.core.mail import send_mail
+from django.core.signing import TimestampSigner
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from . import inventory, recommendations, search
+from .models import Product, ProductImage, ProductVariant, Brand, Color, Size, Navbar, SimilarProduct
+from .response_cache import bump_catalog_version, bump_content_version
+
+User = get_user_model()
+signer = TimestampSigner()
+
+@receiver(post_save, sender=User)
+def send_registration_email(sender, instance, created, **kwargs):
+    if created:
+        token = signer.sign(instance.pk)
+        verify_path = reverse("auth-verify-email")
+        verify_url = f"{settings.SITE_PROTOCOL}://{settings.SITE_DOMAIN}{verify_path}?token={token}" if getattr(settings, "SITE_DOMAIN", None) else verify_path
+        subject = "Verify your account"
+        message = f"Thanks for registering. Verify: {verify_url}"
+        send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [instance.email], fail_silently=True)
+
+
+@receiver(post_save, sender=Product)
+def index_product_for_search(sender, instance, **kwargs):
+    search.index_product(instance)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product_for_search(sender, instance, **kwargs):
+    search.remove_product(instance.pk)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_delete, sender=ProductVariant)
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+@receiver(post_save, sender=Color)
+@receiver(post_delete, sender=Color)
+@receiver(post_save, sender=Size)
+@receiver(post_delete, sender=Size)
+@receiver(m2m_changed, sender=Product.sizes.through)
+@receiver(m2m_changed, sender=Product.colors.through)
+def bump_catalog_cache_version(sender, instance=None, action=None, reverse=False, pk_set=None, **kwargs):
+    if action is not None and not action.startswith("post_"):
+        return
+    if sender in (Brand, Color, Size) or (reverse and pk_set is None):
+        # labels every product may show: scope unknown
+        product_ids = None
+    elif action is not None:
+        product_ids = set(pk_set) if reverse else {instance.pk}
+    else:
+        product_ids = {instance.pk if sender is Product else instance.product_id}
+    # after commit, so a request racing the write cannot re-cache old rows
+    transaction.on_commit(lambda: bump_catalog_version(product_ids))
+
+
+@receiver(pre_save, sender=ProductVariant)
+def note_variant_stock_only(sender, instance, raw=False, update_fields=None, **kwargs):
+    # a save that only moves stock (admin, inline edits) bumps the "stock"
+    # version; anything else about a variant is catalog content
+    if update_fields is not None:
+        instance._stock_only = set(update_fields) <= {"stock"}
+    elif instance.pk is None or raw:
+        instance._stock_only = False
+    else:
+        before = ProductVariant.objects.filter(pk=instance.pk).values_list("product_id", "size_id", "color_id", "sku").first()
+        instance._stock_only = before == (instance.product_id, instance.size_id, instance.color_id, instance.sku)
+
+
+@receiver(post_save, sender=ProductVariant)
+def bump_variant_version(sender, instance, **kwargs):
+    if getattr(instance, "_stock_only", False):
+        transaction.on_commit(lambda: bump_content_version("stock"))
+    else:
+        product_id = instance.product_id
+        transaction.on_commit(lambda: bump_catalog_version([product_id]))
+
+
+@receiver(post_save, sender=Navbar)
+@receiver(post_delete, sender=Navbar)
+def bump_navbar_version(sender, **kwargs):
+    transaction.on_commit(lambda: bump_content_version("navbar"))
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def refresh_product_image_summary(sender, instance, **kwargs):
+    Product.refresh_image_summary(instance.product_id)
+
+
+@receiver(post_save, sender=Product)
+def create_product_variants(sender, instance, created, raw=False, **kwargs):
+    # a new product starts as one size-less variant holding its stock;
+    # adding sizes (below) splits it
+    if created and not raw:
+        inventory.sync_variants([instance.pk])
+
+
+@receiver(m2m_changed, sender=Product.sizes.through)
+def sync_product_variants(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        inventory.sync_variants([instance.pk])
+    elif pk_set:
+        inventory.sync_variants(pk_set)
+
+
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def refresh_product_stock(sender, instance, **kwargs):
+    inventory.refresh_product_stock([instance.product_id])
+
+
+class _SimilarRefresh:
+    """One on_commit callback per transaction collecting the products to refresh."""
+
+    def __init__(self):
+        self.pks = set()
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        recommendations.refresh_products(self.pks)
+
+
+# per thread (so per connection): a weak reference to the pending
+# _SimilarRefresh. Django holds the only strong reference until it runs
+# the callback or discards it on rollback, so a dead reference means the
+# next change needs a new callback.
+_pending_refresh = threading.local()
+
+
+def schedule_similar_refresh(pks):
+    if not getattr(settings, "SIMILAR_PRODUCTS_AUTO_REFRESH", True):
+        return
+    ref = getattr(_pending_refresh, "ref", None)
+    refresh = ref() if ref is not None else None
+    if refresh is None or refresh.done or not transaction.get_connection().in_atomic_block:
+        refresh = _SimilarRefresh()
+        refresh.pks.update(pks)
+        _pending_refresh.ref = weakref.ref(refresh)
+        transaction.on_commit(refresh)
+        return
+    refresh.pks.update(pks)
+
+
+@receiver(post_save, sender=Product)
+def refresh_similar_products(sender, instance, **kwargs):
+    schedule_similar_refresh([instance.pk])
+
+
+@receiver(pre_delete, sender=Product)
+def refresh_similar_products_on_delete(sender, instance, **kwargs):
+    # the links pointing at this product cascade away with it, so collect
+    # the lists it appeared in now
+    referrers = SimilarProduct.objects.filter(similar_id=instance.pk).values_list("product_id", flat=True)
+    schedule_similar_refresh([instance.pk, *referrers])
+
+
+@receiver(m2m_changed, sender=Product.sizes.through)
+@receiver(m2m_changed, sender=Product.colors.through)
+def refresh_similar_products_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        schedule_similar_refresh([instance.pk])
+    elif pk_set:
+        schedule_similar_refresh(pk_set)
@@ -0,0 +1,190 @@
+# core/suggest.py
+"""
+In-memory prefix index for search-box typeahead (/api/products/suggest/).
+
+Every active product, brand and style is tokenized (lower-cased, accents
+stripped, split on non-alphanumerics). Tokens are kept in one sorted list
+with a parallel list of postings; a prefix is the `bisect` range
+[prefix, prefix + U+FFFF) of that list, so a lookup never touches the
+database and costs two binary searches plus a short merge.
+
+Postings hold *ranks* rather than ids: products (and terms) are numbered by
+popularity - units sold, then rating, then newest - so merging the postings
+of all tokens in a prefix range in ascending order yields the most popular
+matches first and the merge stops after `limit` hits.
+
+Multi-word queries match when every word is a prefix of some word of the
+entry ("marco bla" finds "Marco / Black Loafer").
+
+The index is rebuilt when the catalog version (core.response_cache) moves.
+Only one thread rebuilds; others keep answering from the previous snapshot
+meanwhile. Popularity is read at build time, so new orders are picked up
+with the next catalog change. The index lives per process.
+"""
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.db.models import Sum
+
+from .models import OrderItem, Product
+from .response_cache import catalog_version
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Lower-cased, accent-free words of `text`."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _WORD.findall(text.lower())
+
+
+class _PrefixMap:
+    """Sorted tokens -> postings (ascending ranks) of the entries using them."""
+
+    __slots__ = ("keys", "postings", "words")
+
+    def __init__(self, entry_words):
+        # entry_words[rank] -> tuple of the entry's tokens
+        postings = defaultdict(list)
+        for rank, words in enumerate(entry_words):
+            for word in set(words):
+                postings[word].append(rank)
+        self.keys = sorted(postings)
+        self.postings = [tuple(postings[key]) for key in self.keys]
+        self.words = entry_words
+
+    def _ranks(self, prefix):
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\uffff", lo)
+        if hi - lo == 1:
+            return iter(self.postings[lo])
+        return heapq.merge(*self.postings[lo:hi])
+
+    def search(self, words, limit):
+        """Ranks of the entries matching every word of `words` as a prefix, best first."""
+        if not words or limit <= 0:
+            return []
+        # drive the merge with the longest word: usually the narrowest range
+        driver = max(words, key=len)
+        others = list(words)
+        others.remove(driver)
+        found, last = [], None
+        for rank in self._ranks(driver):
+            if rank == last:
+                continue
+            last = rank
+            entry = self.words[rank]
+            if all(any(w.startswith(word) for w in entry) for word in others):
+                found.append(rank)
+                if len(found) == limit:
+                    break
+        return found
+
+
+class _Snapshot:
+    __slots__ = ("version", "products", "product_map", "terms", "term_map")
+
+    def __init__(self, version, products, terms):
+        self.version = version
+        # products[rank] = (id, slug, title, subtitle, price, primary_image)
+        self.products = [p[:-1] for p in products]
+        self.product_map = _PrefixMap([p[-1] for p in products])
+        # terms[rank] = (type, label, value, product count)
+        self.terms = [t[:-1] for t in terms]
+        self.term_map = _PrefixMap([t[-1] for t in terms])
+
+
+class SuggestIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def build(self, version=None):
+        version = catalog_version() if version is None else version
+        sold = dict(
+            OrderItem.objects.values("product_id")
+            .annotate(units=Sum("quantity"))
+            .values_list("product_id", "units")
+        )
+        rows = Product.objects.filter(is_active=True).values_list(
+            "id", "slug", "title", "subtitle", "price", "primary_image",
+            "rating", "style", "brand__name", "brand__slug",
+        )
+        products, brands, styles = [], {}, {}
+        for pid, slug, title, subtitle, price, image, rating, style, brand, brand_slug in rows:
+            units = sold.get(pid) or 0
+            popularity = (units, rating or 0.0, pid)
+            words = tuple(tokenize(f"{title} {subtitle} {brand or ''} {style or ''}"))
+            products.append((popularity, (pid, slug, title, subtitle, price, image, words)))
+            if brand:
+                _count(brands, brand_slug, brand, units)
+            if style and style.strip():
+                _count(styles, style.strip().lower(), style.strip(), units)
+
+        products.sort(key=lambda item: item[0], reverse=True)
+        terms = [
+            (units, count, kind, label, value)
+            for kind, table in (("brand", brands), ("style", styles))
+            for value, (label, units, count) in table.items()
+        ]
+        terms.sort(key=lambda t: (-t[0], -t[1], t[3].lower()))
+        snapshot = _Snapshot(
+            version,
+            [product for _, product in products],
+            [(kind, label, value, count, tuple(tokenize(label))) for _, count, kind, label, value in terms],
+        )
+        self._snapshot = snapshot
+        return snapshot
+
+    def snapshot(self, version=None):
+        """
+        Current snapshot, rebuilt first if the catalog version moved.
+        `version` is the current catalog version when the caller already has it.
+        """
+        version = catalog_version() if version is None else version
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    return self.build(version)
+                return self._snapshot
+        # stale: one thread rebuilds, the rest answer from the old snapshot
+        if self._lock.acquire(blocking=False):
+            try:
+                return self.build(version)
+            finally:
+                self._lock.release()
+        return snapshot
+
+    def suggest(self, query, limit=8, term_limit=5, version=None):
+        """
+        Return (terms, products) for the typeahead query `query`:
+        terms are (type, label, value, product count) tuples, products
+        (id, slug, title, subtitle, price, primary_image), most popular first.
+        `version` is passed on to `snapshot`.
+        """
+        words = tokenize(query)
+        if not words:
+            return [], []
+        snapshot = self.snapshot(version)
+        terms = [snapshot.terms[r] for r in snapshot.term_map.search(words, term_limit)]
+        products = [snapshot.products[r] for r in snapshot.product_map.search(words, limit)]
+        return terms, products
+
+
+def _count(table, key, label, units):
+    entry = table.get(key)
+    if entry is None:
+        table[key] = (label, units, 1)
+    else:
+        table[key] = (entry[0], entry[1] + units, entry[2] + 1)
+
+
+suggest_index = SuggestIndex()
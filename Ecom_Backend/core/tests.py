@@ -1,3 +1,1341 @@
-from django.test import TestCase
-
-# Create your tests here.
+import gzip
+import io
+import itertools
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import F
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from .catalog_import import PK_TABLE, CatalogImporter, iter_csv, iter_json_array
+from .fast_render import render_products
+from .facets import facet_index
+from .pagination import KeysetPagination
+from .images import get_resize_cache
+from .storage import HashedMediaStorage
+from . import carts, inventory, recommendations, search, signals
+from .models import (
+    Brand, Cart, CartItem, Color, ContentVersion, Order, OrderItem, Product, ProductImage, ProductVariant, SimilarProduct, Size, UserCheckoutDetail,
+    ordered_images_prefetch,
+)
+from .response_cache import bump_catalog_version, catalog_version, content_version
+from .serializers import ProductSerializer
+
+
+def make_catalog():
+    brand = Brand.objects.create(name="Marco", slug="marco")
+    black = Color.objects.create(name="Black", hex="#000000")
+    tan = Color.objects.create(name="Tan", hex="#d2b48c")
+    uk6 = Size.objects.create(label="UK(6)")
+    uk7 = Size.objects.create(label="UK(7)")
+    loafer = Product.objects.create(
+        title="Marco", subtitle="Tan Loafer", slug="marco-tan-loafer", price=Decimal("2499"),
+        mrp=Decimal("2999.5"), category="mens", style="Loafers", brand=brand, rating=4.5, stock=3,
+    )
+    loafer.colors.add(tan, black)
+    loafer.sizes.add(uk6, uk7)
+    ProductImage.objects.create(product=loafer, image="products/b.png", order=1)
+    ProductImage.objects.create(product=loafer, image="products/a.png", alt_text="side", order=0)
+    sandal = Product.objects.create(
+        title="Beach", subtitle="Kids Sandal", slug="beach-sandal", price=Decimal("799.00"),
+        category="kids", style="Sandals",
+    )
+    sandal.sizes.add(uk6)
+    return loafer, sandal
+
+
+class FastRenderTests(TestCase):
+    def setUp(self):
+        self.products = make_catalog()
+        self.request = Request(APIRequestFactory().get("/api/products/"))
+
+    def test_matches_product_serializer_bytes(self):
+        ids = [p.pk for p in self.products]
+        page = sorted(
+            Product.objects.filter(pk__in=ids).select_related("brand").prefetch_related(ordered_images_prefetch(), "colors", "sizes"),
+            key=lambda p: ids.index(p.pk),
+        )
+        expected = ProductSerializer(page, many=True, context={"request": self.request}).data
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(render_products(ids, self.request)), renderer.render(expected))
+
+    def test_sparse_fields_skip_relations(self):
+        ids = [p.pk for p in self.products]
+        with self.assertNumQueries(1):
+            data = render_products(ids, self.request, fields={"id", "title", "price"})
+        self.assertEqual(data[0], {"id": ids[0], "title": "Marco", "price": "2499.00"})
+
+
+@override_settings(ALLOWED_HOSTS=["testserver", "shop.example.com"])
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        self.loafer, self.sandal = make_catalog()
+        bump_catalog_version()
+
+    def cache_status(self, params=None, **extra):
+        response = self.client.get("/api/products/", params or {}, **extra)
+        self.assertEqual(response.status_code, 200)
+        return response["X-Cache"]
+
+    def test_hit_after_miss_and_key_variation(self):
+        self.assertEqual(self.cache_status(), "MISS")
+        self.assertEqual(self.cache_status(), "HIT")
+        self.assertEqual(self.cache_status({"category": "mens"}), "MISS")
+        self.assertEqual(self.cache_status({"category": "mens"}), "HIT")
+        self.assertEqual(self.cache_status(HTTP_HOST="shop.example.com"), "MISS")
+        # parameter order does not matter
+        self.assertEqual(self.cache_status({"category": "mens", "ordering": "price"}), "MISS")
+        self.assertEqual(self.client.get("/api/products/?ordering=price&category=mens")["X-Cache"], "HIT")
+
+    def test_product_save_invalidates(self):
+        self.cache_status()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.loafer.price = Decimal("1999")
+            self.loafer.save()
+        response = self.client.get("/api/products/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        prices = {p["slug"]: p["price"] for p in response.json()["results"]}
+        self.assertEqual(prices["marco-tan-loafer"], "1999.00")
+
+    def test_version_bumped_by_another_process(self):
+        self.cache_status()
+        # e.g. import_catalog run from the command line: only the shared row changes
+        ContentVersion.objects.filter(pk="catalog").update(version=F("version") + 1)
+        self.assertEqual(self.cache_status(), "MISS")
+
+
+    def test_hit_and_miss_counters(self):
+        staff = get_user_model().objects.create_user("staff", "staff@example.com", "pw", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.delete("/api/cache-stats/").status_code, 204)
+        self.cache_status()
+        self.cache_status()
+        self.cache_status()
+        self.client.get(f"/api/products/{self.loafer.pk}/")
+        stats = self.client.get("/api/cache-stats/").json()
+        self.assertEqual(stats["list"], {"hits": 2, "misses": 1, "hit_rate": 0.6667})
+        self.assertEqual(stats["retrieve"], {"hits": 0, "misses": 1, "hit_rate": 0.0})
+        self.assertEqual(stats["batch"]["hit_rate"], None)
+
+        out = io.StringIO()
+        call_command("catalog_cache_stats", "--reset", stdout=out)
+        self.assertIn("list: 2 hits, 1 misses, hit rate 66.7%", out.getvalue())
+        self.assertEqual(self.client.get("/api/cache-stats/").json()["list"]["hits"], 0)
+        self.client.logout()
+        self.assertIn(self.client.get("/api/cache-stats/").status_code, (401, 403))
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        self.loafer, self.sandal = make_catalog()
+        bump_catalog_version()
+
+    def list_and_detail(self, **params):
+        listed = self.client.get("/api/products/", params).json()["results"]
+        detail = self.client.get(f"/api/products/{self.loafer.pk}/", params).json()
+        return next(p for p in listed if p.get("id", self.loafer.pk) == self.loafer.pk), detail
+
+    def test_fields_and_omit(self):
+        card, detail = self.list_and_detail(fields="id,slug,price,brand,sizes,main_image")
+        self.assertEqual(set(card), {"id", "slug", "price", "brand", "sizes", "main_image"})
+        # the list is built by core.fast_render, the detail by the serializer: same output
+        self.assertEqual(card, detail)
+
+        card, detail = self.list_and_detail(omit="description,images,variants,variant_thumbs")
+        self.assertEqual(set(card), set(ProductSerializer.Meta.fields) - {"description", "images"})
+        self.assertEqual(card, detail)
+
+    def test_unknown_names_are_ignored(self):
+        card, detail = self.list_and_detail(fields="id,slug,nope")
+        self.assertEqual(card, {"id": self.loafer.pk, "slug": "marco-tan-loafer"})
+        self.assertEqual(detail, card)
+        card, _ = self.list_and_detail(omit="nope")
+        self.assertEqual(set(card), set(ProductSerializer.Meta.fields))
+        self.assertEqual(self.client.get("/api/products/", {"fields": "nope"}).json()["results"], [{}, {}])
+
+    def test_fields_are_part_of_the_cache_key(self):
+        response = self.client.get("/api/products/", {"fields": "slug"})
+        self.assertEqual(response["X-Cache"], "MISS")
+        response = self.client.get("/api/products/", {"fields": "title"})
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(set(response.json()["results"][0]), {"title"})
+        response = self.client.get("/api/products/", {"fields": "slug"})
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(set(response.json()["results"][0]), {"slug"})
+        self.assertEqual(self.client.get("/api/products/", {"omit": "slug"})["X-Cache"], "MISS")
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.loafer, self.sandal = make_catalog()
+        bump_catalog_version()
+
+    def test_if_none_match_and_if_modified_since(self):
+        response = self.client.get("/api/products/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get("/api/products/", HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        self.assertEqual(
+            self.client.get("/api/products/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]).status_code, 304,
+        )
+        detail = f"/api/products/{self.loafer.pk}/"
+        self.assertNotEqual(self.client.get(detail)["ETag"], response["ETag"])
+
+    def test_etag_changes_after_product_save(self):
+        etag = self.client.get("/api/products/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.loafer.title = "Marco II"
+            self.loafer.save()
+        response = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(self.client.get("/api/products/", HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+
+class ImageSummaryTests(TestCase):
+    def setUp(self):
+        self.loafer, self.sandal = make_catalog()
+        catalog_version()
+        content_version("stock")
+
+    def test_primary_image_follows_image_changes(self):
+        self.loafer.refresh_from_db()
+        self.assertEqual(self.loafer.primary_image.name, "products/a.png")
+        self.assertEqual(self.loafer.image_count, 2)
+
+        self.loafer.images.get(image="products/a.png").delete()
+        self.loafer.refresh_from_db()
+        self.assertEqual(self.loafer.primary_image.name, "products/b.png")
+        self.assertEqual(self.loafer.image_count, 1)
+
+    def test_card_fields_need_no_image_queries(self):
+        with self.assertNumQueries(5):  # catalog and stock versions, count, id page, product rows - no images
+            response = self.client.get("/api/products/", {"fields": "id,title,price,main_image", "limit": 10})
+        cards = response.json()["results"]
+        self.assertTrue(cards[-1]["main_image"].endswith("/media/products/a.png"))
+        self.assertIsNone(cards[0]["main_image"])
+
+    def test_variant_thumbs_reuse_prefetch(self):
+        product = Product.objects.prefetch_related(ordered_images_prefetch()).get(pk=self.loafer.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(product.variant_image_urls(), ["/media/products/a.png", "/media/products/b.png"])
+            self.assertEqual(product.main_image_url, "/media/products/a.png")
+
+
+class ResizedMediaTests(TestCase):
+    def setUp(self):
+        from PIL import Image
+
+        self.media = tempfile.mkdtemp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        os.makedirs(os.path.join(self.media, "products"))
+        for name in ("big.png", "other.png"):
+            Image.new("RGBA", (1200, 800), (200, 10, 10, 255)).save(os.path.join(self.media, "products", name))
+
+    def settings_for(self, **extra):
+        return override_settings(MEDIA_ROOT=self.media, IMAGE_RESIZE_CACHE_DIR=self.cache_dir, **extra)
+
+    def test_serves_webp_variant_with_caching(self):
+        from PIL import Image
+
+        shutil.copy(os.path.join(self.media, "products", "big.png"), os.path.join(self.media, "products", "big.0123456789ab.png"))
+        with self.settings_for(MEDIA_CACHE_MAX_AGE=600):
+            response = self.client.get("/media/r/320x0/products/big.png", HTTP_ACCEPT="image/webp,*/*")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Type"], "image/webp")
+            # a plain name may be replaced: only hashed names are immutable
+            self.assertEqual(response["Cache-Control"], "public, max-age=600")
+            hashed = self.client.get("/media/r/320x0/products/big.0123456789ab.png", HTTP_ACCEPT="image/webp")
+            self.assertIn("immutable", hashed["Cache-Control"])
+            with Image.open(io.BytesIO(b"".join(response.streaming_content))) as img:
+                self.assertEqual(img.size, (320, 213))
+
+            again = self.client.get("/media/r/320x0/products/big.png", HTTP_ACCEPT="image/webp", HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(again.status_code, 304)
+
+    def test_rejects_unlisted_sizes_and_traversal(self):
+        with self.settings_for():
+            self.assertEqual(self.client.get("/media/r/333x0/products/big.png").status_code, 404)
+            self.assertEqual(self.client.get("/media/r/320x0/../settings.py").status_code, 404)
+
+    def test_decompression_bomb_is_404(self):
+        with self.settings_for(), mock.patch("PIL.Image.MAX_IMAGE_PIXELS", 1000):
+            self.assertEqual(self.client.get("/media/r/160x0/products/big.png").status_code, 404)
+        self.assertEqual([name for _, _, files in os.walk(self.cache_dir) for name in files], [])
+
+    def test_lru_eviction_keeps_cache_bounded(self):
+        with self.settings_for(IMAGE_RESIZE_CACHE_MAX_BYTES=1):
+            self.client.get("/media/r/160x0/products/big.png")
+            self.client.get("/media/r/160x0/products/other.png")
+            cache = get_resize_cache()
+            self.assertLessEqual(len(cache._scan()), 1)
+
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        self.override = override_settings(MEDIA_ROOT=self.media)
+        self.override.enable()
+        self.addCleanup(self.override.disable)
+        self.storage = HashedMediaStorage(location=self.media)
+
+    def test_hashed_uploads_are_immutable(self):
+        name = self.storage.save("products/shoe.png", ContentFile(b"0123456789" * 10))
+        self.assertRegex(name, r"^products/shoe\.[0-9a-f]{12}\.png$")
+        self.assertEqual(self.storage.save("products/shoe.png", ContentFile(b"0123456789" * 10)), name)
+
+        response = self.client.get(f"/media/{name}")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(self.client.get(f"/media/{name}", HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+    def test_unhashed_prefixes_keep_their_name(self):
+        name = self.storage.save("contact/page.png", ContentFile(b"x"))
+        self.assertEqual(name, "contact/page.png")
+        self.assertNotIn("immutable", self.client.get(f"/media/{name}")["Cache-Control"])
+
+    def test_range_requests(self):
+        name = self.storage.save("contact/clip.bin", ContentFile(bytes(range(100))))
+        response = self.client.get(f"/media/{name}", HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 10-19/100")
+        self.assertEqual(b"".join(response.streaming_content), bytes(range(10, 20)))
+        self.assertEqual(self.client.get(f"/media/{name}", HTTP_RANGE="bytes=500-").status_code, 416)
+
+    @override_settings(MEDIA_SENDFILE="nginx", MEDIA_ACCEL_REDIRECT_PREFIX="/protected/")
+    def test_sendfile_offload(self):
+        name = self.storage.save("contact/page.png", ContentFile(b"x" * 50))
+        response = self.client.get(f"/media/{name}")
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected/{name}")
+        self.assertEqual(response.content, b"")
+
+
+class CatalogImportTests(TestCase):
+    def test_streams_fixture_array_in_small_reads(self):
+        records = [{"model": "core.size", "pk": i, "fields": {"label": f"UK({i})"}} for i in range(1, 40)]
+        parsed = list(iter_json_array(io.StringIO(json.dumps(records, indent=2)), buffer_size=16))
+        self.assertEqual(parsed, records)
+
+    def test_fixture_import_is_idempotent(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with open(os.path.join(os.path.dirname(__file__), "fixtures", "womens_products.json")) as fh:
+                stats = CatalogImporter(chunk_size=5).run(iter_json_array(fh))
+        self.assertEqual((stats.products_created, stats.products_updated, stats.skipped), (12, 0, 0))
+        product = Product.objects.get(slug="lunar-tancy-lilac-sandal")
+        self.assertEqual(sorted(product.sizes.values_list("pk", flat=True)), [2, 3, 4])
+        self.assertEqual(product.image_count, 1)
+        self.assertEqual(product.created.year, 2025)
+
+        with open(os.path.join(os.path.dirname(__file__), "fixtures", "womens_products.json")) as fh:
+            stats = CatalogImporter().run(iter_json_array(fh))
+        self.assertEqual((stats.products_created, stats.products_updated, stats.images), (0, 12, 0))
+        self.assertEqual(Product.objects.count(), 12)
+
+    def fixture(self):
+        products = [
+            {"model": "core.product", "pk": 900 + n, "fields": {"slug": f"shoe-{n}", "title": f"Shoe {n}", "price": "10"}}
+            for n in range(4)
+        ]
+        images = [
+            {"model": "core.productimage", "pk": n, "fields": {"product": 900 + n, "image": f"products/shoe-{n}.png"}}
+            for n in range(4)
+        ]
+        return products + images
+
+    @override_settings(SIMILAR_PRODUCTS_AUTO_REFRESH=False)
+    def test_images_resolve_across_chunks(self):
+        # the images arrive chunks after their products, which got other pks
+        stats = CatalogImporter(chunk_size=2).run(self.fixture())
+        self.assertEqual((stats.products_created, stats.images, stats.skipped), (4, 4, 0))
+        for product in Product.objects.filter(slug__startswith="shoe-"):
+            self.assertNotEqual(product.pk, 900 + int(product.slug[-1]))
+            self.assertEqual(product.primary_image, f"products/{product.slug}.png")
+        self.assertNotIn(PK_TABLE, connection.introspection.table_names())
+        self.assertFalse(SimilarProduct.objects.exists())
+
+    def test_refreshes_similar_products(self):
+        CatalogImporter().run(self.fixture())
+        self.assertTrue(SimilarProduct.objects.filter(product__slug="shoe-0").exists())
+
+    def test_csv_rows_resolve_lookups_by_name(self):
+        Brand.objects.create(name="Marco", slug="marco")
+        csv_text = (
+            "slug,title,price,brand,sizes,colors,is_active\n"
+            "a,A,10.5,Marco,UK(6)|UK(7),Red:#ff0000,false\n"
+            "b,B,oops,Marco,,,\n"
+            "c,C,12,Marco,,Navy Blue,\n"
+        )
+        stats = CatalogImporter().run(iter_csv(io.StringIO(csv_text)))
+        self.assertEqual((stats.products, stats.skipped), (2, 1))
+        self.assertEqual(Color.objects.get(name="Navy Blue").hex, "")
+        product = Product.objects.get(slug="a")
+        self.assertFalse(product.is_active)
+        self.assertEqual(product.brand.slug, "marco")
+        self.assertEqual(sorted(product.sizes.values_list("label", flat=True)), ["UK(6)", "UK(7)"])
+        self.assertEqual(list(product.colors.values_list("hex", flat=True)), ["#ff0000"])
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        make_catalog()
+        self.staff = get_user_model().objects.create_user("ops", "ops@example.com", "pw", is_staff=True)
+
+    def test_export_is_staff_only(self):
+        self.assertIn(self.client.get("/api/export/products.ndjson").status_code, (401, 403))
+
+    def test_products_ndjson_round_trips_into_importer(self):
+        self.client.force_login(self.staff)
+        response = self.client.get("/api/export/products.ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([r["slug"] for r in records], ["marco-tan-loafer", "beach-sandal"])
+        self.assertEqual(records[0]["images"], ["products/a.png", "products/b.png"])
+
+        stats = CatalogImporter().run(records)
+        self.assertEqual((stats.products_updated, stats.images, stats.skipped), (2, 0, 0))
+
+    def test_invalid_order_dates_are_400(self):
+        self.client.force_login(self.staff)
+        for value in ("2024-13-40", "2024-02-30T10:00", "soon"):
+            with self.subTest(since=value):
+                response = self.client.get("/api/export/orders.ndjson", {"since": value})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"since": "Expected an ISO date or datetime."})
+
+    def test_csv_gzip(self):
+        self.client.force_login(self.staff)
+        response = self.client.get("/api/export/products.csv", {"gzip": "1"})
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="products.csv.gz"')
+        rows = gzip.decompress(b"".join(response.streaming_content)).decode().splitlines()
+        self.assertTrue(rows[0].startswith("id,slug,title"))
+        self.assertIn("UK(6)|UK(7)", rows[1])
+        self.assertEqual(len(rows), 3)
+
+
+@override_settings(CATALOG_CACHE_ENABLED=False)
+class MultiValueFilterTests(TestCase):
+    def setUp(self):
+        self.loafer, self.sandal = make_catalog()
+
+    def slugs(self, **params):
+        response = self.client.get("/api/products/", {"fields": "slug", **params})
+        return [p["slug"] for p in response.json()["results"]]
+
+    def test_any_value_matches_without_duplicates(self):
+        self.assertEqual(self.slugs(color="black,tan"), ["marco-tan-loafer"])
+        self.assertEqual(self.slugs(size="UK(6),uk(7)"), ["beach-sandal", "marco-tan-loafer"])
+        self.assertEqual(self.slugs(size="uk(7),uk(6)", color="#000000"), ["marco-tan-loafer"])
+        self.assertEqual(self.slugs(color="red,green"), [])
+
+    def test_facets_accept_the_same_syntax(self):
+        facets = self.client.get("/api/filters/", {"category": "mens", "color": "black,red"}).json()
+        self.assertEqual(facets["total"], 1)
+
+
+@override_settings(CATALOG_CACHE_ENABLED=False)
+class SearchTests(TestCase):
+    def setUp(self):
+        self.body = Product.objects.create(
+            title="House Shoe", slug="house-shoe", price=Decimal("800"), description="Lined in soft velvet.",
+        )
+        self.title = Product.objects.create(title="Velvet Slipper", slug="velvet-slipper", price=Decimal("900"))
+        self.other = Product.objects.create(title="Trail Boot", slug="trail-boot", price=Decimal("700"))
+
+    def slugs(self, query, ranked=True):
+        return [p.slug for p in search.filter_products(Product.objects.order_by("pk"), query, ranked=ranked)]
+
+    def test_title_outranks_description(self):
+        self.assertTrue(search.fts_available())
+        self.assertEqual(self.slugs("velvet"), ["velvet-slipper", "house-shoe"])
+        # unranked keeps the queryset's own ordering
+        self.assertEqual(self.slugs("velvet", ranked=False), ["house-shoe", "velvet-slipper"])
+        self.assertEqual(self.slugs("lined"), ["house-shoe"])
+
+    def test_prefix_matching(self):
+        self.assertEqual(self.slugs("velv"), ["velvet-slipper", "house-shoe"])
+        self.assertEqual(self.slugs("tra bo"), ["trail-boot"])
+        # not a word prefix: no match (icontains would have found it)
+        self.assertEqual(self.slugs("elvet"), [])
+
+    def test_match_expression_quotes_fts_syntax(self):
+        self.assertEqual(search.build_match_expression('Boot" OR title:* NEAR(x'), '"boot"* "or"* "title"* "near"* "x"*')
+        self.assertIsNone(search.build_match_expression('"*:()'))
+        response = self.client.get("/api/products/", {"search": 'velvet" OR (boot*', "fields": "slug"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"], [])
+
+    def test_falls_back_to_icontains_without_fts(self):
+        with mock.patch.object(search, "_available", False):
+            self.assertEqual(self.slugs("elvet"), ["house-shoe", "velvet-slipper"])
+
+    def test_index_follows_save_and_delete(self):
+        self.other.title = "Trail Runner"
+        self.other.save()
+        self.assertEqual(self.slugs("runner"), ["trail-boot"])
+        self.assertEqual(self.slugs("boot"), [])
+        self.other.delete()
+        self.assertEqual(self.slugs("runner"), [])
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {search.FTS_TABLE}")
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+    def test_failed_rebuild_keeps_the_index(self):
+        with mock.patch.object(search, "index_products", side_effect=RuntimeError("disk full")):
+            with self.assertRaises(RuntimeError):
+                search.rebuild_index()
+        self.assertEqual(self.slugs("velvet"), ["velvet-slipper", "house-shoe"])
+        self.assertEqual(search.rebuild_index(), 3)
+        self.assertEqual(self.slugs("trail"), ["trail-boot"])
+
+
+class FacetIndexTests(TestCase):
+    def setUp(self):
+        self.loafer, self.sandal = make_catalog()
+        facet_index.invalidate()
+
+    def total(self):
+        return facet_index.facets(category=None)["total"]
+
+    def test_rebuilds_when_another_process_bumps_the_version(self):
+        self.assertEqual(self.total(), 2)
+        # a write made elsewhere: no signals fire here, only the shared version moves
+        Product.objects.filter(pk=self.sandal.pk).update(is_active=False)
+        self.assertEqual(self.total(), 2)
+        ContentVersion.objects.filter(pk="catalog").update(version=F("version") + 1)
+        self.assertEqual(self.total(), 1)
+
+    def test_local_save_is_seen_after_commit(self):
+        self.assertEqual(facet_index.facets(category="kids")["total"], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sandal.category = "mens"
+            self.sandal.save()
+        self.assertEqual(facet_index.facets(category="kids")["total"], 0)
+        self.assertEqual(facet_index.facets(category="mens")["total"], 2)
+
+
+    def test_product_changes_update_only_those_products(self):
+        self.assertEqual(facet_index.facets(category="mens")["total"], 1)
+        with mock.patch.object(facet_index, "build", wraps=facet_index.build) as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.sandal.category = "mens"
+                self.sandal.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.loafer.sizes.clear()
+            data = facet_index.facets(category="mens")
+            build.assert_not_called()
+            self.assertEqual(data["total"], 2)
+            self.assertEqual([entry["count"] for entry in data["size"]], [1])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                Brand.objects.create(name="Hill", slug="hill")
+            facet_index.facets(category="mens")
+            build.assert_called_once()
+
+
+@override_settings(CATALOG_CACHE_ENABLED=False)
+class QueryPlanTests(TestCase):
+    """
+    EXPLAIN QUERY PLAN every SELECT the product list runs, for every
+    combination of its filters, and fail on a full table scan. Index scans
+    (SCAN .. USING INDEX) and the FTS virtual table are fine.
+    """
+    FILTERS = {
+        "category": ["mens"],
+        "style": ["loafers"],
+        "brand": ["marco", "BRAND_ID"],
+        "color": ["black,#000000", "COLOR_ID"],
+        "size": ["uk(6),uk(7)", "SIZE_ID"],
+        "search": ["loafer"],
+    }
+    FULL_SCAN = re.compile(r"\bSCAN (\w+)\b(?! USING| VIRTUAL TABLE)")
+
+    def setUp(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN QUERY PLAN is SQLite syntax")
+        self.loafer, _ = make_catalog()
+        self.ids = {
+            "BRAND_ID": str(self.loafer.brand_id),
+            "COLOR_ID": str(self.loafer.colors.get(name="Black").pk),
+            "SIZE_ID": str(self.loafer.sizes.get(label="UK(6)").pk),
+        }
+        cursor = KeysetPagination().encode_cursor([self.loafer.created, self.loafer.pk + 1])
+        # offset mode (COUNT + page) and a cursor page past the first one
+        self.modes = [{}, {"pagination": "cursor", "cursor": cursor}]
+
+    def combinations(self):
+        names = list(self.FILTERS)
+        for r in range(len(names) + 1):
+            for subset in itertools.combinations(names, r):
+                for values in itertools.product(*(self.FILTERS[n] for n in subset)):
+                    yield {n: self.ids.get(v, v) for n, v in zip(subset, values)}
+
+    def plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_product_list_filters_never_full_scan(self):
+        # subqueries / co-routines show up as "SCAN subquery": only real tables count
+        tables = set(connection.introspection.table_names())
+        checked = 0
+        for params in self.combinations():
+            for mode in self.modes:
+                query = {**params, **mode}
+                with CaptureQueriesContext(connection) as ctx:
+                    response = self.client.get("/api/products/", query)
+                self.assertEqual(response.status_code, 200, query)
+                for captured in ctx.captured_queries:
+                    sql = captured["sql"]
+                    if not sql.lstrip().upper().startswith("SELECT"):
+                        continue
+                    steps = self.plan(sql)
+                    scans = [s for s in steps if (m := self.FULL_SCAN.search(s)) and m.group(1) in tables]
+                    self.assertFalse(scans, f"{query}: full scan in\n{sql}\n{steps}")
+                    checked += 1
+        self.assertGreater(checked, 700)
+
+    def page_query(self, ctx):
+        # the first catalog query, after the catalog version lookup
+        return next(q["sql"] for q in ctx.captured_queries if 'FROM "core_product"' in q["sql"])
+
+    def test_every_ordering_reads_an_index_in_order(self):
+        for ordering in ("newest", "price", "-price", "rating", "discount"):
+            for params in ({}, {"category": "mens"}):
+                query = {"ordering": ordering, "pagination": "cursor", **params}
+                with CaptureQueriesContext(connection) as ctx:
+                    self.client.get("/api/products/", query)
+                steps = self.plan(self.page_query(ctx))
+                self.assertFalse([s for s in steps if "TEMP B-TREE" in s], f"{query}: {steps}")
+
+    def test_category_page_reads_index_in_order(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get("/api/products/", {"category": "mens", "pagination": "cursor"})
+        steps = self.plan(self.page_query(ctx))
+        self.assertEqual(steps, ["SEARCH core_product USING INDEX product_active_cat_idx (<expr>=?)"])
+
+
+@override_settings(CATALOG_CACHE_ENABLED=False)
+class PriceAndOrderingTests(TestCase):
+    def setUp(self):
+        self.loafer, self.sandal = make_catalog()  # 2499 (mrp 2999.5), 799
+        self.boot = Product.objects.create(
+            title="Hill", subtitle="Boot", slug="hill-boot", price=Decimal("1500"), mrp=Decimal("1600"),
+            category="mens", rating=4.9,
+        )
+
+    def slugs(self, **params):
+        response = self.client.get("/api/products/", {"fields": "slug", **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [p["slug"] for p in response.json()["results"]]
+
+    def test_discount_is_generated(self):
+        self.loafer.refresh_from_db()
+        self.sandal.refresh_from_db()
+        self.assertEqual((self.loafer.discount, self.sandal.discount), (Decimal("500.50"), Decimal("0")))
+
+    def test_orderings_and_filters(self):
+        self.assertEqual(self.slugs(ordering="price"), ["beach-sandal", "hill-boot", "marco-tan-loafer"])
+        self.assertEqual(self.slugs(ordering="-price"), ["marco-tan-loafer", "hill-boot", "beach-sandal"])
+        self.assertEqual(self.slugs(ordering="-rating"), ["hill-boot", "marco-tan-loafer", "beach-sandal"])
+        self.assertEqual(self.slugs(ordering="discount", on_sale="1"), ["marco-tan-loafer", "hill-boot"])
+        self.assertEqual(self.slugs(min_price="800", max_price="2000"), ["hill-boot"])
+        self.assertEqual(self.client.get("/api/products/", {"min_price": "cheap"}).status_code, 400)
+
+    def test_cursor_pages_follow_the_ordering(self):
+        for ordering in ("price", "-price", "rating", "discount", "newest"):
+            expected = self.slugs(ordering=ordering)
+            seen, url, params = [], "/api/products/", {"ordering": ordering, "pagination": "cursor", "limit": 1, "fields": "slug"}
+            while url:
+                page = self.client.get(url, params).json()
+                seen += [p["slug"] for p in page["results"]]
+                url, params = page["next"], None
+            self.assertEqual(seen, expected, ordering)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        created = timezone.now()
+        for n in range(7):
+            Product.objects.create(title=f"Shoe {n}", slug=f"shoe-{n}", price=Decimal("10"))
+        # ties on `created`: only the id tie-break orders them
+        Product.objects.filter(slug__in=["shoe-1", "shoe-2", "shoe-3", "shoe-4"]).update(created=created)
+
+    def paginate(self, **params):
+        paginator = KeysetPagination()
+        request = Request(APIRequestFactory().get("/api/products/", params))
+        return paginator, paginator.paginate_queryset(Product.objects.all(), request)
+
+    def test_cursor_round_trip(self):
+        product = Product.objects.get(slug="shoe-2")
+        paginator, _ = self.paginate()
+        cursor = paginator.encode_cursor([product.created, product.pk])
+        request = Request(APIRequestFactory().get("/api/products/", {"cursor": cursor}))
+        self.assertEqual(paginator.decode_cursor(request, Product), [product.created, product.pk])
+
+    def test_pages_have_no_duplicates_or_gaps(self):
+        expected = list(Product.objects.order_by("-created", "-id").values_list("slug", flat=True))
+        seen, url, params = [], "/api/products/", {"pagination": "cursor", "limit": 2, "fields": "slug"}
+        while url:
+            page = self.client.get(url, params).json()
+            self.assertLessEqual(len(page["results"]), 2)
+            seen += [p["slug"] for p in page["results"]]
+            url, params = page["next"], None
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_404(self):
+        encode = KeysetPagination().encode_cursor
+        for cursor in ("not-a-cursor", encode(["2024-01-01T00:00:00"]), encode(["yesterday", "1"]), encode(["2024-01-01", "x"])):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get("/api/products/", {"cursor": cursor}).status_code, 404)
+
+    def test_limit_is_clamped(self):
+        for value, limit in (("1000", 100), ("0", 12), ("-3", 12), ("many", 12), ("5", 5)):
+            with self.subTest(limit=value):
+                self.assertEqual(self.paginate(limit=value)[0].limit, limit)
+        paginator, page = self.paginate(limit="5")
+        self.assertEqual(len(page), 5)
+        self.assertTrue(paginator.has_next)
+
+
+@override_settings(CATALOG_CACHE_ENABLED=False, SIMILAR_PRODUCTS_AUTO_REFRESH=False, SIMILAR_PRODUCTS_K=2)
+class SimilarProductsTests(TestCase):
+    def setUp(self):
+        self.loafer, self.sandal = make_catalog()
+        self.twin = Product.objects.create(
+            title="Marco", subtitle="Black Loafer", slug="marco-black-loafer", price=Decimal("2599"),
+            category="mens", style="Loafers", brand=self.loafer.brand,
+        )
+        self.twin.colors.add(*self.loafer.colors.all())
+        self.twin.sizes.add(*self.loafer.sizes.all())
+        self.boot = Product.objects.create(
+            title="Hill", subtitle="Boot", slug="hill-boot", price=Decimal("9999"), category="mens", style="Boots",
+        )
+        recommendations.rebuild()
+
+    def neighbours(self, product):
+        return list(SimilarProduct.objects.filter(product=product).values_list("similar_id", flat=True))
+
+    def test_closest_product_first(self):
+        self.assertEqual(self.neighbours(self.loafer), [self.twin.pk, self.boot.pk])
+        response = self.client.get(f"/api/products/{self.loafer.pk}/similar/", {"fields": "slug", "limit": 1})
+        self.assertEqual(response.json()["results"][0]["slug"], "marco-black-loafer")
+        self.assertGreater(response.json()["results"][0]["score"], 0.9)
+
+    @override_settings(SIMILAR_PRODUCTS_AUTO_REFRESH=True)
+    def test_edits_refresh_incrementally(self):
+        self.assertEqual(self.neighbours(self.loafer), [self.twin.pk, self.boot.pk])
+        self.assertNotEqual(self.neighbours(self.sandal)[0], self.boot.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            for field in ("category", "style", "brand", "price"):
+                setattr(self.boot, field, getattr(self.sandal, field))
+            self.boot.save()
+            self.boot.colors.set(self.sandal.colors.all())
+            self.boot.sizes.set(self.sandal.sizes.all())
+        # the edited product entered the sandal's list without a rebuild
+        self.assertEqual(self.neighbours(self.sandal)[0], self.boot.pk)
+        self.assertEqual(self.neighbours(self.boot)[0], self.sandal.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.twin.delete()
+        self.assertEqual(len(self.neighbours(self.loafer)), 2)
+        self.assertNotIn(self.twin.pk, self.neighbours(self.loafer))
+
+
+    @override_settings(SIMILAR_PRODUCTS_AUTO_REFRESH=True)
+    def test_refresh_reuses_the_feature_matrix(self):
+        load = mock.patch.object(recommendations.FeatureSpace, "load", wraps=recommendations.FeatureSpace.load)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.boot.save()
+        with load as loaded:
+            with self.captureOnCommitCallbacks(execute=True):
+                for field in ("category", "style", "brand", "price"):
+                    setattr(self.boot, field, getattr(self.sandal, field))
+                self.boot.save()
+                self.boot.colors.set(self.sandal.colors.all())
+                self.boot.sizes.set(self.sandal.sizes.all())
+            loaded.assert_not_called()
+        self.assertEqual(self.neighbours(self.sandal)[0], self.boot.pk)
+        self.assertEqual(self.neighbours(self.boot)[0], self.sandal.pk)
+
+        # a style the layout has no column for: load again
+        with load as loaded:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.boot.style = "Wellies"
+                self.boot.save()
+            loaded.assert_called_once()
+
+    @override_settings(SIMILAR_PRODUCTS_AUTO_REFRESH=True)
+    def test_one_refresh_per_transaction(self):
+        def refreshes(callbacks):
+            return [callback.pks for callback in callbacks if isinstance(callback, signals._SimilarRefresh)]
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.boot.save()
+            self.twin.save()
+            self.boot.sizes.add(*self.loafer.sizes.all())
+        self.assertEqual(refreshes(callbacks), [{self.boot.pk, self.twin.pk}])
+
+        # a rolled back savepoint takes its callback along; later changes get a new one
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                self.boot.save()
+                transaction.set_rollback(True)
+            self.twin.save()
+        self.assertEqual(refreshes(callbacks), [{self.twin.pk}])
+
+
+class SuggestTests(TestCase):
+    def setUp(self):
+        self.loafer, self.sandal = make_catalog()
+        self.slipper = Product.objects.create(
+            title="Marco", subtitle="Home Slipper", slug="marco-slipper", price=Decimal("599"),
+            category="mens", style="Slippers", brand=self.loafer.brand,
+        )
+        bump_catalog_version()
+
+    def suggest(self, q, **params):
+        return self.client.get("/api/products/suggest/", {"q": q, **params}).json()
+
+    def test_prefix_matches_titles_brands_and_styles(self):
+        data = self.suggest("mar")
+        self.assertEqual(data["terms"], [{"type": "brand", "label": "Marco", "value": "marco", "count": 2}])
+        self.assertEqual({p["slug"] for p in data["products"]}, {"marco-tan-loafer", "marco-slipper"})
+        self.assertEqual([p["slug"] for p in self.suggest("marco lo")["products"]], ["marco-tan-loafer"])
+        self.assertEqual(self.suggest("sand")["terms"][0]["label"], "Sandals")
+        self.assertEqual(self.suggest("  ")["products"], [])
+
+    def test_ranked_by_units_sold(self):
+        order = Order.objects.create(fullname="A", email="a@example.com", payment_method=Order.PaymentMethod.GPAY)
+        OrderItem.objects.create(order=order, product=self.slipper, title="Slipper", price=Decimal("599"), quantity=3)
+        bump_catalog_version()
+        self.assertEqual([p["slug"] for p in self.suggest("marco")["products"]], ["marco-slipper", "marco-tan-loafer"])
+
+    def test_served_from_memory_until_catalog_changes(self):
+        self.suggest("mar")
+        # only the shared catalog version is read, once for ETag and index
+        with self.assertNumQueries(1):
+            self.suggest("marco")
+        Product.objects.create(title="Marble", subtitle="Mule", slug="marble-mule", price=Decimal("999"))
+        self.assertNotIn("marble-mule", [p["slug"] for p in self.suggest("marb")["products"]])
+        bump_catalog_version()
+        self.assertEqual([p["slug"] for p in self.suggest("marb")["products"]], ["marble-mule"])
+
+
+@override_settings(CATALOG_CACHE_ENABLED=False)
+class BatchLookupTests(TestCase):
+    def setUp(self):
+        self.loafer, self.sandal = make_catalog()
+        self.sandal.is_active = False
+        self.sandal.save()
+        catalog_version()
+        content_version("stock")
+
+    def test_keyed_by_id_with_missing_ids_reported(self):
+        with self.assertNumQueries(6):  # catalog and stock versions, products, images, colors, sizes
+            response = self.client.get("/api/products/batch/", {"ids": f"999,{self.loafer.pk},{self.sandal.pk}"})
+        data = response.json()
+        self.assertEqual(list(data["results"]), [str(self.loafer.pk)])
+        self.assertEqual(data["results"][str(self.loafer.pk)]["slug"], "marco-tan-loafer")
+        self.assertEqual(data["missing"], [999, self.sandal.pk])
+
+    def test_post_and_sparse_fields(self):
+        response = self.client.post(
+            "/api/products/batch/?fields=title", {"ids": [self.loafer.pk, self.loafer.pk]}, content_type="application/json",
+        )
+        self.assertEqual(response.json(), {"results": {str(self.loafer.pk): {"id": self.loafer.pk, "title": "Marco"}}, "missing": []})
+
+    def test_invalid_ids(self):
+        self.assertEqual(self.client.get("/api/products/batch/", {"ids": "1,x"}).status_code, 400)
+        ids = ",".join(str(i) for i in range(1, 102))
+        self.assertEqual(self.client.get("/api/products/batch/", {"ids": ids}).status_code, 400)
+
+
+class VariantStockTests(TestCase):
+    def setUp(self):
+        self.loafer, self.sandal = make_catalog()
+        self.uk6, self.uk7 = (self.loafer.variants.get(size__label=label) for label in ("UK(6)", "UK(7)"))
+
+    def order(self, *items):
+        return self.client.post("/api/orders/", {
+            "fullname": "A", "email": "a@example.com", "payment_method": "cod",
+            "items": [{"product": self.loafer.pk, "size": size, "quantity": qty} for size, qty in items],
+        }, content_type="application/json")
+
+    def test_stock_split_across_sizes(self):
+        self.assertEqual((self.uk6.sku, self.uk6.stock, self.uk7.stock), (f"P{self.loafer.pk}-{self.uk6.size_id}", 2, 1))
+        self.assertEqual(self.sandal.variants.get().stock, 0)
+        self.assertEqual(Product.objects.get(pk=self.loafer.pk).stock, 3)
+
+    def test_checkout_decrements_only_the_variant_row(self):
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            response = self.order(("UK(6)", 1), ("uk(6)", 1))
+        self.assertEqual(response.status_code, 201)
+        writes = [
+            q["sql"] for q in queries.captured_queries
+            if q["sql"].startswith("UPDATE") and "core_contentversion" not in q["sql"]
+        ]
+        self.assertTrue(writes[0].startswith('UPDATE "core_productvariant"'))
+        # the product total is only refreshed after commit
+        self.assertEqual([w for w in writes if w.startswith('UPDATE "core_product" ')], writes[-1:])
+        self.uk6.refresh_from_db()
+        self.assertEqual(self.uk6.stock, 0)
+        self.assertEqual(Product.objects.get(pk=self.loafer.pk).stock, 1)
+        self.assertEqual(OrderItem.objects.filter(variant=self.uk6).count(), 2)
+
+    def test_orders_leave_the_catalog_version(self):
+        detail = f"/api/products/{self.loafer.pk}/"
+        self.client.get(detail)
+        etag = self.client.get("/api/products/")["ETag"]
+        version = catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.order(("UK(6)", 1)).status_code, 201)
+        self.assertEqual(catalog_version(), version)
+        response = self.client.get(detail)
+        self.assertEqual(response["X-Cache"], "HIT")
+        data = response.json()
+        self.assertEqual(data["stock"], 2)
+        self.assertEqual({v["size"]: v["stock"] for v in data["variants"]}, {"UK(6)": 1, "UK(7)": 1})
+        response = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][-1]["stock"], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.uk7.stock = 4
+            self.uk7.save()
+        self.assertEqual(catalog_version(), version)
+        self.assertEqual(self.client.get(detail).json()["stock"], 5)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.uk7.sku = "LOAFER-7"
+            self.uk7.save()
+        self.assertNotEqual(catalog_version(), version)
+
+    def test_out_of_stock_and_unknown_size(self):
+        response = self.order(("UK(7)", 2))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("available 1", response.json()["stock"])
+        self.assertEqual(self.order(("UK(9)", 1)).status_code, 400)
+        self.uk7.refresh_from_db()
+        self.assertEqual(self.uk7.stock, 1)
+
+    def test_explicit_variant_must_match(self):
+        def order(variant, size):
+            return self.client.post("/api/orders/", {
+                "fullname": "A", "email": "a@example.com", "payment_method": "cod",
+                "items": [{"product": self.loafer.pk, "size": size, "variant": variant.pk, "quantity": 1}],
+            }, content_type="application/json")
+
+        self.assertIn("variant", order(self.uk7, "UK(6)").json())
+        self.assertIn("variant", order(self.sandal.variants.get(), "").json())
+        response = order(self.uk7, "")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(OrderItem.objects.get(order_id=response.json()["order_id"]).size, "UK(7)")
+        self.loafer.sizes.remove(self.uk6.size)
+        # a retired variant is not a valid choice at all
+        self.assertIn("variant", order(self.uk6, "UK(6)").json()["items"][0])
+        self.uk6.refresh_from_db()
+        self.assertEqual(self.uk6.stock, 2)
+
+    def test_adding_sizes_moves_one_size_stock(self):
+        boot = Product.objects.create(title="Hill", slug="hill-boot", price=Decimal("9999"), stock=5)
+        self.assertEqual(list(boot.variants.values_list("size", "stock")), [(None, 5)])
+        boot.sizes.add(self.uk6.size, self.uk7.size)
+        self.assertEqual(sorted(boot.variants.values_list("size", "stock")), [(self.uk6.size_id, 3), (self.uk7.size_id, 2)])
+
+    def test_cart_items_link_variants(self):
+        cart = self.client.post("/api/cart/", {"items": []}, content_type="application/json").json()
+        response = self.client.post(
+            f"/api/cart/{cart['id']}/add_item/", {"product_id": self.loafer.pk, "size": "UK(7)"}, content_type="application/json",
+        )
+        self.assertEqual(response.json()["items"][0]["variant"], self.uk7.pk)
+        response = self.client.post(
+            f"/api/cart/{cart['id']}/add_item/", {"product_id": self.loafer.pk, "size": "UK(12)"}, content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+    def test_removed_sizes_no_longer_resolve(self):
+        self.loafer.sizes.remove(self.uk7.size)
+        self.assertTrue(ProductVariant.objects.filter(pk=self.uk7.pk).exists())
+        self.assertIsNone(inventory.find_variant(self.loafer.pk, "UK(7)"))
+        # the one size left is also what a blank size means now
+        self.assertEqual(inventory.find_variant(self.loafer.pk, ""), self.uk6)
+        self.assertEqual(Product.objects.get(pk=self.loafer.pk).stock, 2)
+        self.assertIn("size", self.order(("UK(7)", 1)).json())
+        variants = self.client.get(f"/api/products/{self.loafer.pk}/").json()["variants"]
+        self.assertEqual([v["id"] for v in variants], [self.uk6.pk])
+
+    def test_blank_size_needs_a_choice(self):
+        cart = self.client.post("/api/cart/", {"items": []}, content_type="application/json").json()
+        response = self.client.post(
+            f"/api/cart/{cart['id']}/add_item/", {"product_id": self.loafer.pk, "size": ""}, content_type="application/json",
+        )
+        self.assertEqual(response.json(), {"size": "Choose a size for Marco."})
+
+    def test_legacy_blank_size_line(self):
+        cart = Cart.objects.create()
+        CartItem.objects.create(cart=cart, product=self.loafer, size="", quantity=3)
+        carts.refresh_totals([cart.pk])
+
+        def op(name, quantity=1):
+            return self.client.post(
+                f"/api/cart/{cart.pk}/ops/",
+                {"ops": [{"op": name, "product_id": self.loafer.pk, "size": "", "quantity": quantity}]},
+                content_type="application/json",
+            )
+
+        # it can still shrink or go, but not grow
+        self.assertEqual(op("add").status_code, 400)
+        self.assertEqual(op("set").json()["items"][0]["quantity"], 1)
+        # checkout asks for a size rather than picking one
+        self.assertEqual(self.order(("", 1)).json(), {"size": "Choose a size for Marco."})
+        self.assertEqual(op("remove").json()["items"], [])
+
+
+class CartRenderTests(TestCase):
+    def setUp(self):
+        self.products = list(make_catalog())
+        for n in range(3):
+            product = Product.objects.create(title=f"Extra {n}", slug=f"extra-{n}", price=Decimal("100"), stock=5)
+            ProductImage.objects.create(product=product, image=f"products/extra-{n}.png")
+            self.products.append(product)
+        self.user = get_user_model().objects.create_user("shopper", "s@example.com", "pw")
+        self.client.force_login(self.user)
+        self.cart = Cart.objects.create(user=self.user)
+
+    def fill(self, count):
+        CartItem.objects.filter(cart=self.cart).delete()
+        for product in self.products[:count]:
+            size = "UK(6)" if product.sizes.exists() else ""
+            CartItem.objects.create(cart=self.cart, product=product, size=size, quantity=2)
+        carts.refresh_totals([self.cart.pk])
+
+    def queries_for(self, count, url):
+        self.fill(count)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()["items"]), count)
+        return len(queries)
+
+    def test_query_count_independent_of_item_count(self):
+        for url in ("/api/cart/my/", "/api/cart/my/?view=compact", f"/api/cart/{self.cart.pk}/?view=compact"):
+            with self.subTest(url=url):
+                self.assertEqual(self.queries_for(1, url), self.queries_for(5, url))
+
+    def test_compact_shape(self):
+        self.fill(1)
+        data = self.client.get("/api/cart/my/", {"view": "compact"}).json()
+        self.assertEqual(data["items"], [{
+            "id": self.cart.items.get().pk, "product_id": self.products[0].pk, "title": "Marco", "price": "2499.00",
+            "main_image": "http://testserver/media/products/a.png", "size": "UK(6)", "quantity": 2, "line_total": "4998.00",
+        }])
+        self.assertEqual((data["item_count"], data["subtotal"]), (2, "4998.00"))
+
+
+class CartTotalsTests(TestCase):
+    def setUp(self):
+        self.loafer, self.sandal = make_catalog()
+        self.user = get_user_model().objects.create_user("shopper", "s@example.com", "pw")
+        self.client.force_login(self.user)
+        self.cart_id = self.client.get("/api/cart/my/").json()["id"]
+
+    def post(self, action, payload):
+        return self.client.post(f"/api/cart/{self.cart_id}/{action}/", payload, content_type="application/json")
+
+    def summary(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get("/api/cart/my/summary/").json()
+        self.assertFalse([q for q in queries.captured_queries if "core_cartitem" in q["sql"]])
+        return data["item_count"], data["subtotal"]
+
+    def test_totals_follow_every_write_path(self):
+        self.post("add_item", {"product_id": self.loafer.pk, "size": "UK(6)", "quantity": 2})
+        response = self.post("add_item", {"product_id": self.sandal.pk, "size": "UK(6)"})
+        self.assertEqual((response.json()["item_count"], response.json()["subtotal"]), (3, "5797.00"))
+        self.assertEqual(self.summary(), (3, "5797.00"))
+
+        self.client.put(f"/api/cart/{self.cart_id}/", {"items": [
+            {"product_id": self.loafer.pk, "size": "UK(6)", "quantity": 1},
+            {"product_id": self.loafer.pk, "size": "UK(7)", "quantity": 1},
+        ]}, content_type="application/json")
+        self.assertEqual(self.summary(), (3, "5797.00"))
+
+        self.post("remove_item", {"product_id": self.loafer.pk})
+        self.assertEqual(self.summary(), (1, "799.00"))
+        item = CartItem.objects.get(cart_id=self.cart_id)
+        self.client.delete(f"/api/cart-items/{item.pk}/")
+        self.assertEqual(self.summary(), (0, "0.00"))
+
+    def test_reconcile_fixes_drift(self):
+        self.post("add_item", {"product_id": self.loafer.pk, "size": "UK(6)", "quantity": 2})
+        Product.objects.filter(pk=self.loafer.pk).update(price=Decimal("2000"))
+        self.assertEqual(carts.reconcile(dry_run=True), (1, 1))
+        out = io.StringIO()
+        call_command("reconcile_cart_totals", stdout=out)
+        self.assertIn("Checked 1 carts, fixed 1", out.getvalue())
+        self.assertEqual(self.summary(), (2, "4000.00"))
+        self.assertEqual(carts.reconcile(), (1, 0))
+
+
+class CartOpsTests(TestCase):
+    def setUp(self):
+        self.loafer, self.sandal = make_catalog()
+        self.user = get_user_model().objects.create_user("shopper", "s@example.com", "pw")
+        self.client.force_login(self.user)
+        self.cart_id = self.client.get("/api/cart/my/").json()["id"]
+        self.client.post(f"/api/cart/{self.cart_id}/add_item/", {"product_id": self.loafer.pk, "size": "UK(6)", "quantity": 2})
+
+    def ops(self, ops, query=""):
+        return self.client.post(f"/api/cart/{self.cart_id}/ops/{query}", {"ops": ops}, content_type="application/json")
+
+    def lines(self):
+        return sorted(CartItem.objects.filter(cart_id=self.cart_id).values_list("product_id", "size", "quantity"))
+
+    def test_ops_apply_in_order(self):
+        response = self.ops([
+            {"op": "add", "product_id": self.loafer.pk, "size": "UK(6)", "quantity": 1},
+            {"op": "add", "product_id": self.loafer.pk, "size": "UK(7)"},
+            {"op": "set", "product_id": self.loafer.pk, "size": "UK(7)", "quantity": 4},
+            {"op": "add", "product_id": self.sandal.pk, "size": "UK(6)"},
+            {"op": "remove", "product_id": self.sandal.pk, "size": "UK(6)"},
+        ], query="?view=compact")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.lines(), [(self.loafer.pk, "UK(6)", 3), (self.loafer.pk, "UK(7)", 4)])
+        self.assertEqual((response.json()["item_count"], response.json()["subtotal"]), (7, "17493.00"))
+        self.assertEqual(len(response.json()["items"]), 2)
+        variant = CartItem.objects.get(cart_id=self.cart_id, size="UK(7)").variant
+        self.assertEqual(variant.size.label, "UK(7)")
+
+        self.ops([{"op": "set", "product_id": self.loafer.pk, "size": "UK(6)", "quantity": 0}])
+        self.assertEqual(self.lines(), [(self.loafer.pk, "UK(7)", 4)])
+        self.assertEqual(carts.computed_totals([self.cart_id])[self.cart_id], (4, Decimal("9996.00")))
+
+    def test_write_queries_do_not_grow_with_ops(self):
+        def writes(ops):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.ops(ops, query="?view=compact").status_code, 200)
+            return [q["sql"] for q in queries.captured_queries if q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))]
+
+        few = writes([
+            {"op": "add", "product_id": self.loafer.pk, "size": "UK(7)"},
+            {"op": "remove", "product_id": self.loafer.pk, "size": "UK(6)"},
+        ])
+        many = writes([
+            {"op": "add", "product_id": self.loafer.pk, "size": "UK(6)", "quantity": 2},
+            {"op": "set", "product_id": self.loafer.pk, "size": "UK(7)", "quantity": 5},
+            {"op": "add", "product_id": self.sandal.pk, "size": "UK(6)", "quantity": 3},
+            {"op": "remove", "product_id": self.loafer.pk, "size": "UK(7)"},
+            {"op": "add", "product_id": self.sandal.pk, "size": "UK(6)"},
+        ])
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(len([sql for sql in many if sql.startswith("INSERT")]), 1)
+
+    def test_invalid_op_changes_nothing(self):
+        response = self.ops([
+            {"op": "add", "product_id": self.sandal.pk, "size": "UK(6)"},
+            {"op": "add", "product_id": self.sandal.pk, "size": "UK(9)"},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("1", response.json()["ops"])
+        self.assertEqual(self.ops([{"op": "shuffle", "product_id": self.sandal.pk}]).status_code, 400)
+        self.assertEqual(self.lines(), [(self.loafer.pk, "UK(6)", 2)])
+        self.assertEqual(self.client.get("/api/cart/my/summary/").json()["item_count"], 2)
+
+
+
+class AnonymousCartTests(TestCase):
+    def setUp(self):
+        self.loafer, self.sandal = make_catalog()
+
+    def add(self, product, size, quantity=1):
+        return self.client.post("/api/cart/my/ops/", {"ops": [
+            {"op": "add", "product_id": product.pk, "size": size, "quantity": quantity},
+        ]}, content_type="application/json")
+
+    def test_reading_creates_nothing(self):
+        data = self.client.get("/api/cart/my/").json()
+        self.assertEqual((data["id"], data["items"], data["item_count"]), (None, [], 0))
+        self.assertEqual(self.client.get("/api/cart/my/summary/").json()["item_count"], 0)
+        self.assertFalse(Cart.objects.exists())
+        self.assertFalse(Session.objects.exists())
+
+    def test_first_add_creates_session_cart(self):
+        data = self.add(self.loafer, "UK(6)", 2).json()
+        cart = Cart.objects.get()
+        self.assertEqual((data["id"], data["item_count"]), (cart.pk, 2))
+        self.add(self.loafer, "UK(6)")
+        self.assertEqual(self.client.get("/api/cart/my/").json()["item_count"], 3)
+        self.assertEqual(Cart.objects.count(), 1)
+
+    @override_settings(ANONYMOUS_CART_STORE="cookie")
+    def test_cookie_cart_promoted_at_login(self):
+        self.add(self.loafer, "UK(6)", 2)
+        data = self.add(self.sandal, "UK(6)").json()
+        self.assertEqual((data["id"], data["item_count"], data["subtotal"]), (None, 3, "5797.00"))
+        self.assertEqual(self.client.get("/api/cart/my/?view=compact").json()["items"][1]["title"], "Beach")
+        self.assertEqual(self.client.get("/api/cart/my/summary/").json()["item_count"], 3)
+        self.assertEqual(self.add(self.sandal, "UK(9)").status_code, 400)
+        self.assertFalse(Cart.objects.exists())
+
+        user = get_user_model().objects.create_user("shopper", "s@example.com", "pw")
+        Cart.objects.create(user=user)
+        self.client.force_login(user)
+        response = self.client.get("/api/cart/my/summary/")
+        self.assertEqual((response.json()["item_count"], response.json()["subtotal"]), (3, "5797.00"))
+        self.assertEqual(response.cookies["cart"].value, "")
+        self.assertEqual(self.client.get("/api/cart/my/").json()["item_count"], 3)
+
+    @override_settings(ANONYMOUS_CART_STORE="cache")
+    def test_cache_cart_checkout(self):
+        self.add(self.loafer, "UK(6)")
+        self.assertTrue(self.client.cookies["cart_token"].value)
+        response = self.client.post("/api/orders/", {
+            "fullname": "A", "email": "a@example.com", "payment_method": "cod",
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get(pk=response.json()["order_id"])
+        self.assertEqual(list(order.items.values_list("product_id", "size", "quantity")), [(self.loafer.pk, "UK(6)", 1)])
+        self.assertEqual(response.cookies["cart_token"].value, "")
+        self.assertFalse(Cart.objects.exists())
+
+
+
+class PurgeStaleDataTests(TestCase):
+    def setUp(self):
+        self.loafer, _ = make_catalog()
+        old = timezone.now() - timedelta(days=400)
+        user = get_user_model().objects.create_user("shopper", "s@example.com", "pw")
+        self.kept_carts = [Cart.objects.create(), Cart.objects.create(user=user)]
+        stale = [Cart.objects.create() for _ in range(3)]
+        for cart in stale:
+            CartItem.objects.create(cart=cart, product=self.loafer, size="UK(6)")
+        Cart.objects.filter(pk__in=[c.pk for c in stale] + [self.kept_carts[1].pk]).update(updated=old)
+        Session.objects.create(session_key="a" * 32, session_data="", expire_date=old)
+        Session.objects.create(session_key="b" * 32, session_data="", expire_date=timezone.now() + timedelta(days=1))
+        details = [
+            UserCheckoutDetail.objects.create(first_name="A", email="a@example.com", address_line1="1", city="C", state="S", pincode="1")
+            for _ in range(2)
+        ]
+        UserCheckoutDetail.objects.filter(pk=details[0].pk).update(created=old)
+
+    def test_purges_in_batches_and_reports(self):
+        out = io.StringIO()
+        call_command("purge_stale_data", "--dry-run", stdout=out)
+        self.assertIn("carts: would remove 3 rows", out.getvalue())
+        self.assertEqual(Cart.objects.count(), 5)
+
+        out = io.StringIO()
+        call_command("purge_stale_data", "--batch-size", "2", stdout=out)
+        report = out.getvalue()
+        self.assertIn("carts: removed 6 rows (core.Cart: 3, core.CartItem: 3)", report)
+        self.assertIn("sessions: removed 1 rows", report)
+        self.assertIn("checkout_details: removed 1 rows", report)
+        self.assertIn("Total: removed 8 rows in", report)
+        self.assertEqual(sorted(Cart.objects.values_list("pk", flat=True)), [c.pk for c in self.kept_carts])
+        self.assertEqual(list(Session.objects.values_list("session_key", flat=True)), ["b" * 32])
+        self.assertEqual(UserCheckoutDetail.objects.count(), 1)
+
+    def test_edited_cart_survives(self):
+        self.client.post("/api/cart/my/ops/", {"ops": [
+            {"op": "add", "product_id": self.loafer.pk, "size": "UK(6)", "quantity": 1},
+        ]}, content_type="application/json")
+        cart = Cart.objects.get(user__isnull=True, items__isnull=False, updated__gt=timezone.now() - timedelta(days=1))
+        Cart.objects.filter(pk=cart.pk).update(updated=timezone.now() - timedelta(days=40))
+        self.client.post(f"/api/cart/{cart.pk}/ops/", {"ops": [
+            {"op": "add", "product_id": self.loafer.pk, "size": "UK(6)", "quantity": 3},
+        ]}, content_type="application/json")
+        call_command("purge_stale_data", "--only", "carts", stdout=io.StringIO())
+        self.assertEqual(Cart.objects.get(pk=cart.pk).item_count, 4)
+
+    def test_retention_flags(self):
+        out = io.StringIO()
+        call_command("purge_stale_data", "--only", "checkout_details", "--checkout-details-days", "0", stdout=out)
+        self.assertIn("checkout_details: removed 2 rows", out.getvalue())
+        self.assertNotIn("carts:", out.getvalue())
+        self.assertEqual(Cart.objects.count(), 5)
+
+
+@override_settings(SIMILAR_PRODUCTS_AUTO_REFRESH=False)
+class AddItemTests(TestCase):
+    def setUp(self):
+        self.loafer, _ = make_catalog()
+        self.cart = Cart.objects.create()
+
+    def add(self, **data):
+        return self.client.post(f"/api/cart/{self.cart.pk}/add_item/", data, content_type="application/json")
+
+    def test_quantity_is_validated(self):
+        for quantity in (0, -2, "two"):
+            with self.subTest(quantity=quantity):
+                response = self.add(product_id=self.loafer.pk, size="UK(6)", quantity=quantity)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("quantity", response.json())
+        self.assertIn("product_id", self.add(size="UK(6)").json())
+        self.assertEqual(self.add(product_id=self.loafer.pk, size="UK(6)", quantity=2).json()["items"][0]["quantity"], 2)
+        self.assertFalse(CartItem.objects.filter(cart=self.cart, quantity__lt=1).exists())
+
+    def test_only_a_duplicate_line_is_retried(self):
+        # a NOT NULL failure on the INSERT is not a parallel add: it propagates
+        with self.assertRaises(IntegrityError):
+            carts.add_line(self.cart, self.loafer, "UK(6)", None)
+        self.assertFalse(CartItem.objects.filter(cart=self.cart).exists())
+
+
+class ConcurrentAddItemTests(TransactionTestCase):
+    THREADS = 8
+    ADDS = 5
+
+    def test_parallel_adds_lose_no_quantity(self):
+        loafer, _ = make_catalog()
+        user = get_user_model().objects.create_user("shopper", "s@example.com", "pw")
+        cart = Cart.objects.create(user=user)
+        clients = []
+        for _ in range(self.THREADS):
+            client = Client()
+            client.force_login(user)
+            clients.append(client)
+        barrier = threading.Barrier(self.THREADS)
+        statuses, errors = [], []
+
+        def shop(client):
+            try:
+                barrier.wait()
+                for _ in range(self.ADDS):
+                    response = client.post(f"/api/cart/{cart.pk}/add_item/", {"product_id": loafer.pk, "size": "UK(6)"})
+                    statuses.append(response.status_code)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=shop, args=(client,)) for client in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        total = self.THREADS * self.ADDS
+        self.assertEqual(errors, [])
+        self.assertEqual(statuses, [200] * total)
+        self.assertEqual(list(CartItem.objects.filter(cart=cart).values_list("quantity", flat=True)), [total])
+        cart.refresh_from_db()
+        self.assertEqual((cart.item_count, cart.subtotal), (total, Decimal("2499") * total))
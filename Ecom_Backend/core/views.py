@@ -1,437 +1,832 @@
-import logging
-from django.db import transaction
-from django.shortcuts import get_object_or_404
-from rest_framework import generics, viewsets, permissions, mixins, status
-from rest_framework.response import Response
-from rest_framework.decorators import action
-from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveAPIView
-from rest_framework.views import APIView
-from rest_framework.pagination import LimitOffsetPagination
-from rest_framework.exceptions import NotFound, PermissionDenied
-from django.db.models import Q
-from rest_framework import serializers
-
-
-from .models import (
-    Navbar, Product, Brand, Color, Size,
-    Cart, CartItem, Order
-)
-from .serializers import (
-    NavbarSerializer, ProductSerializer, ProductDetailSerializer,
-    CartSerializer, CartItemSerializer,
-    OrderCreateSerializer
-)
-from .models import UserCheckoutDetail
-from .serializers import UserCheckoutDetailSerializer
-
-from .serializers import OrderDetailSerializer
-from .models import Order
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from .models import OrderTrackingEvent
-from .serializers import OrderTrackingEventSerializer
-from rest_framework.permissions import AllowAny
-
-
-logger = logging.getLogger(__name__)
-
-# in your views.py (update these two classes)
-
-from rest_framework.exceptions import PermissionDenied
-from django.shortcuts import get_object_or_404
-
-from rest_framework.permissions import AllowAny
-
-class OrderTrackingAPIView(RetrieveAPIView):
-    # permission_classes = [IsAuthenticatedOrReadOnly]
-    permission_classes = [AllowAny]  
-    serializer_class = OrderTrackingEventSerializer
-    lookup_url_kwarg = "pk"
-
-    def get(self, request, pk, *args, **kwargs):
-        order = get_object_or_404(Order, pk=pk)
-        # ownership check with email fallback
-        user = request.user
-        email_param = (request.query_params.get("email") or "").strip().lower()
-
-        if order.user_id:
-            if user.is_authenticated:
-                if not (user.is_staff or order.user_id == user.id):
-                    raise PermissionDenied("You do not have permission to view this order's tracking.")
-            else:
-                # allow anonymous if they supply matching order email
-                if not email_param or email_param != (order.email or "").strip().lower():
-                    raise PermissionDenied("Provide the order email to view tracking or sign in.")
-        # else if order.user is None, allow (public order) or proceed
-        events = order.tracking_events.all()
-        ser = self.get_serializer(events, many=True)
-        return Response(ser.data)
-
-
-class OrderDetailAPIView(RetrieveAPIView):
-    """
-    Public order detail endpoint.
-    WARNING: This will expose full order details (items, shipping address, email) to anyone
-    who knows the order id. Use with care.
-    """
-    queryset = Order.objects.all().prefetch_related("items__product")
-    serializer_class = OrderDetailSerializer
-    permission_classes = [AllowAny]
-
-class UserCheckoutDetailCreateAPIView(generics.CreateAPIView):
-    queryset = UserCheckoutDetail.objects.all()
-    serializer_class = UserCheckoutDetailSerializer
-    permission_classes = [AllowAny]
-
-    def perform_create(self, serializer):
-        user = self.request.user if self.request.user.is_authenticated else None
-        serializer.save(user=user)
-
-
-
-
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
-    """
-    Provides:
-      - GET /api/products/         -> list
-      - GET /api/products/{pk}/    -> retrieve (detail serializer with variant_thumbs)
-    """
-    queryset = Product.objects.filter(is_active=True).select_related("brand").prefetch_related("images", "colors", "sizes")
-    permission_classes = [permissions.AllowAny]
-    pagination_class = LimitOffsetPagination
-
-    # default serializer for list (lighter) and detail (richer)
-    def get_serializer_class(self):
-        if self.action == "retrieve":
-            return ProductDetailSerializer
-        return ProductSerializer
-
-    def get_queryset(self):
-        # reuse filters from your previous ProductList.get_queryset
-        qs = (
-            Product.objects.filter(is_active=True)
-            .select_related("brand")
-            .prefetch_related("images", "colors", "sizes")
-            .order_by("-created")
-        )
-
-        category = self.request.query_params.get("category")
-        if category:
-            qs = qs.filter(category__iexact=category)
-
-        q = self.request.query_params.get("search")
-        if q:
-            qs = qs.filter(
-                Q(title__icontains=q)
-                | Q(subtitle__icontains=q)
-                | Q(description__icontains=q)
-            )
-
-        style = self.request.query_params.get("style")
-        if style:
-            qs = qs.filter(style__iexact=style)
-
-        brand = self.request.query_params.get("brands") or self.request.query_params.get("brand")
-        if brand:
-            if brand.isdigit():
-                qs = qs.filter(brand__id=int(brand))
-            else:
-                qs = qs.filter(brand__slug=brand)
-
-        color = self.request.query_params.get("color")
-        if color:
-            color = color.strip()
-            if color.startswith("#"):
-                qs = qs.filter(colors__hex__iexact=color)
-            elif color.isdigit():
-                qs = qs.filter(colors__id=int(color))
-            else:
-                qs = qs.filter(colors__name__iexact=color)
-
-        size = self.request.query_params.get("size")
-        if size:
-            if size.isdigit():
-                qs = qs.filter(sizes__id=int(size))
-            else:
-                qs = qs.filter(sizes__label__iexact=size)
-
-        return qs.distinct()
-
-
-class FiltersForCategory(APIView):
-    def get(self, request, *args, **kwargs):
-        category = request.query_params.get("category", "womens")
-        base_qs = Product.objects.filter(is_active=True)
-        if category:
-            base_qs = base_qs.filter(category__iexact=category)
-
-        styles = list(base_qs.order_by().values_list("style", flat=True).distinct())
-        styles = [s for s in styles if s]
-        size_qs = Size.objects.filter(products__in=base_qs).distinct()
-        sizes = [{"id": s.id, "label": s.label} for s in size_qs]
-        brand_qs = Brand.objects.filter(products__in=base_qs).distinct()
-        brands = [{"id": b.id, "name": b.name, "slug": b.slug} for b in brand_qs]
-        color_qs = Color.objects.filter(products__in=base_qs).distinct()
-        colors = [{"id": c.id, "name": c.name, "hex": c.hex} for c in color_qs]
-
-        return Response({
-            "style": [{"id": s, "label": s, "value": s} for s in styles],
-            "size": sizes,
-            "brands": brands,
-            "color": [{"id": c["id"], "name": c["name"], "value": c["hex"]} for c in colors],
-        }, status=status.HTTP_200_OK)
-
-
-class NavbarDetail(generics.RetrieveAPIView):
-    queryset = Navbar.objects.all().order_by("-id")
-    serializer_class = NavbarSerializer
-
-    def get_object(self):
-        return self.queryset.first()
-
-
-# ---- Cart & CartItem viewsets (unchanged behaviour, only small improvements) ----
-class CartViewSet(viewsets.GenericViewSet,
-                  mixins.RetrieveModelMixin,
-                  mixins.CreateModelMixin,
-                  mixins.UpdateModelMixin,
-                  mixins.DestroyModelMixin,
-                  mixins.ListModelMixin):
-    """
-    Exposes:
-      - GET /api/cart/my/
-      - POST /api/cart/
-      - GET/PUT/PATCH /api/cart/{id}/
-      - POST /api/cart/{id}/add_item/
-      - POST /api/cart/{id}/remove_item/
-    """
-    serializer_class = CartSerializer
-    permission_classes = [permissions.AllowAny]
-
-    def get_queryset(self):
-        user = self.request.user
-        if user.is_authenticated:
-            return Cart.objects.filter(user=user)
-        return Cart.objects.none()
-
-    def perform_create(self, serializer):
-        if self.request.user.is_authenticated:
-            cart = serializer.save(user=self.request.user)
-        else:
-            cart = serializer.save()
-            try:
-                self.request.session['cart_id'] = cart.id
-            except Exception:
-                pass
-        return cart
-
-    def get_object(self):
-        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
-        pk = self.kwargs.get(lookup_url_kwarg or 'pk')
-        try:
-            cart = Cart.objects.get(pk=pk)
-        except Cart.DoesNotExist:
-            raise NotFound("Cart not found.")
-
-        user = self.request.user
-        if user.is_authenticated:
-            if cart.user_id != user.id:
-                raise PermissionDenied("You do not have permission to access this cart.")
-            return cart
-
-        session_cart_id = None
-        try:
-            session_cart_id = self.request.session.get('cart_id')
-        except Exception:
-            session_cart_id = None
-
-        if cart.user is None and (session_cart_id is None or str(session_cart_id) == str(cart.id)):
-            if session_cart_id is None:
-                try:
-                    self.request.session['cart_id'] = cart.id
-                except Exception:
-                    pass
-            return cart
-
-        raise PermissionDenied("You do not have permission to access this cart.")
-
-    @action(detail=False, methods=["get"], url_path="my")
-    def my(self, request):
-        user = request.user
-        if user.is_authenticated:
-            cart, _ = Cart.objects.get_or_create(user=user)
-            serializer = self.get_serializer(cart)
-            return Response(serializer.data)
-
-        session_cart_id = request.session.get('cart_id')
-        if session_cart_id:
-            try:
-                cart = Cart.objects.get(pk=session_cart_id)
-                serializer = self.get_serializer(cart)
-                return Response(serializer.data)
-            except Cart.DoesNotExist:
-                pass
-
-        cart = Cart.objects.create()
-        try:
-            request.session['cart_id'] = cart.id
-        except Exception:
-            pass
-        serializer = self.get_serializer(cart)
-        return Response(serializer.data)
-
-    @action(detail=True, methods=["post"])
-    def add_item(self, request, pk=None):
-        cart = self.get_object()
-        product_id = request.data.get("product_id")
-        quantity = int(request.data.get("quantity", 1))
-        size = request.data.get("size", "") or ""
-
-        if not product_id:
-            return Response({"product_id": "Required"}, status=status.HTTP_400_BAD_REQUEST)
-
-        product = get_object_or_404(Product, pk=product_id)
-
-        with transaction.atomic():
-            ci, created = CartItem.objects.get_or_create(
-                cart=cart,
-                product=product,
-                size=size,
-                defaults={"quantity": quantity}
-            )
-            if not created:
-                ci.quantity = ci.quantity + quantity
-                ci.save()
-
-        try:
-            if request.user.is_anonymous:
-                request.session.setdefault('cart_id', cart.id)
-        except Exception:
-            pass
-
-        serializer = self.get_serializer(cart)
-        return Response(serializer.data)
-        
-    def update(self, request, *args, **kwargs):
-        cart = self.get_object()
-        data = request.data.copy() if isinstance(request.data, dict) else request.data
-
-        logger.debug("[CartViewSet.update] data for update: %s", data)
-
-        # Ensure `items` is present and properly formatted (list of dicts with product_id or product keys)
-        items = data.get("items", None)
-        if items is None:
-            return Response({"detail": "No items provided"}, status=status.HTTP_400_BAD_REQUEST)
-        if not isinstance(items, list):
-            return Response({"detail": "items must be a list"}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Use the CartSerializer.update explicitly (so nested logic runs exactly as defined)
-        serializer = self.get_serializer(cart, data=data, partial=False)
-        try:
-            serializer.is_valid(raise_exception=True)
-            updated = serializer.save()
-            out = self.get_serializer(updated).data
-            return Response(out, status=status.HTTP_200_OK)
-        except serializers.ValidationError as ve:
-            logger.debug("[CartViewSet.update] validation errors: %s", ve.detail)
-            return Response({"detail": "validation_error", "errors": ve.detail}, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as exc:
-            logger.exception("Cart update save failed")
-            return Response({"detail": "update_failed", "error": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-
-    @action(detail=True, methods=["post"], url_path="remove_item")
-    def remove_item(self, request, pk=None):
-        cart = self.get_object()
-        payload = request.data or {}
-
-        cart_item_id = payload.get("cartItemId") or payload.get("cart_item_id") or payload.get("id")
-        product_id = payload.get("productId") or payload.get("product_id")
-        size = (payload.get("size") or "").strip()
-
-        if cart_item_id:
-            try:
-                ci = CartItem.objects.get(pk=cart_item_id, cart=cart)
-                ci.delete()
-            except CartItem.DoesNotExist:
-                return Response({"detail": "Cart item not found"}, status=status.HTTP_404_NOT_FOUND)
-        elif product_id:
-            qs = CartItem.objects.filter(cart=cart, product_id=product_id)
-            if size != "":
-                qs = qs.filter(size=size)
-            deleted_count, _ = qs.delete()
-            if deleted_count == 0:
-                return Response({"detail": "No matching cart item(s) found"}, status=status.HTTP_404_NOT_FOUND)
-        else:
-            return Response({"detail": "Provide cartItemId or productId"}, status=status.HTTP_400_BAD_REQUEST)
-
-        serializer = self.get_serializer(cart)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
-
-class CartItemViewSet(viewsets.GenericViewSet,
-                      mixins.DestroyModelMixin,
-                      mixins.RetrieveModelMixin,
-                      mixins.ListModelMixin):
-    """
-    DELETE /api/cart-items/<id>/  -> deletes a single CartItem and returns the updated cart
-    GET /api/cart-items/          -> list items for current user/session (optional)
-    """
-    serializer_class = CartItemSerializer
-    permission_classes = [permissions.AllowAny]
-
-    def get_queryset(self):
-        user = self.request.user
-        if user.is_authenticated:
-            return CartItem.objects.filter(cart__user=user).select_related("cart", "product")
-        session_cart_id = None
-        try:
-            session_cart_id = self.request.session.get('cart_id')
-        except Exception:
-            session_cart_id = None
-        if session_cart_id:
-            return CartItem.objects.filter(cart_id=session_cart_id).select_related("cart", "product")
-        return CartItem.objects.none()
-
-    def destroy(self, request, *args, **kwargs):
-        instance = self.get_object()  # will ensure permissions/404
-        cart = instance.cart
-        instance.delete()
-        # return updated cart (include request in context so image URLs are absolute)
-        serializer = CartSerializer(cart, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
-
-class OrderCreateAPIView(CreateAPIView):
-    serializer_class = OrderCreateSerializer
-    permission_classes = [permissions.AllowAny]
-
-    def create(self, request, *args, **kwargs):
-        try:
-            data = request.data.copy()
-            cart_id = data.get("cart_id")
-            if cart_id and not data.get("items"):
-                try:
-                    cart = Cart.objects.get(pk=cart_id)
-                except Cart.DoesNotExist:
-                    return Response({"cart_id": "Invalid cart_id"}, status=status.HTTP_400_BAD_REQUEST)
-                data["items"] = []
-                for ci in cart.items.all():
-                    data["items"].append({
-                        "product": ci.product.id,
-                        "quantity": ci.quantity,
-                        "size": ci.size
-                    })
-            serializer = self.get_serializer(data=data)
-            serializer.is_valid(raise_exception=True)
-            order = serializer.save()
-            if cart_id:
-                try:
-                    cart = Cart.objects.get(pk=cart_id)
-                    cart.items.all().delete()
-                except Cart.DoesNotExist:
-                    pass
-            return Response({"order_id": order.id, "message": "Order created"}, status=status.HTTP_201_CREATED)
-        except Exception as exc:
-            logger.exception("Error creating order")
-            return Response({"detail": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
+import logging
+from decimal import Decimal, InvalidOperation
+from django.conf import settings
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, viewsets, permissions, mixins, status
+from rest_framework.response import Response
+from rest_framework.decorators import action
+from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveAPIView
+from rest_framework.views import APIView
+from rest_framework.pagination import LimitOffsetPagination
+from .pagination import KeysetPagination
+from . import cart_store, carts, inventory, recommendations, search
+from .facets import facet_index
+from .images import resize_widths, resized_url
+from .suggest import suggest_index
+from .response_cache import CachedResponseMixin, cache_stats, request_state, reset_cache_stats
+from .conditional import conditional_get
+from .fast_render import render_products
+from rest_framework.exceptions import NotFound, PermissionDenied
+from django.db.models import Exists, OuterRef, Prefetch, Q, prefetch_related_objects
+from rest_framework import serializers
+
+
+from .models import (
+    Navbar, Product,
+    Cart, CartItem, Order, SimilarProduct, cart_items_prefetch, ordered_images_prefetch
+)
+from .serializers import (
+    NavbarSerializer, ProductSerializer, ProductDetailSerializer,
+    CartSerializer, CartAddItemSerializer, CartItemSerializer, CartOpsSerializer, CompactCartSerializer,
+    OrderCreateSerializer
+)
+from .models import UserCheckoutDetail
+from .serializers import UserCheckoutDetailSerializer
+
+from .serializers import OrderDetailSerializer
+from .models import Order
+from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from .models import OrderTrackingEvent
+from .serializers import OrderTrackingEventSerializer
+from rest_framework.permissions import AllowAny
+
+
+logger = logging.getLogger(__name__)
+
+# in your views.py (update these two classes)
+
+from rest_framework.exceptions import PermissionDenied
+from django.shortcuts import get_object_or_404
+
+from rest_framework.permissions import AllowAny
+
+class OrderTrackingAPIView(RetrieveAPIView):
+    # permission_classes = [IsAuthenticatedOrReadOnly]
+    permission_classes = [AllowAny]  
+    serializer_class = OrderTrackingEventSerializer
+    lookup_url_kwarg = "pk"
+
+    def get(self, request, pk, *args, **kwargs):
+        order = get_object_or_404(Order, pk=pk)
+        # ownership check with email fallback
+        user = request.user
+        email_param = (request.query_params.get("email") or "").strip().lower()
+
+        if order.user_id:
+            if user.is_authenticated:
+                if not (user.is_staff or order.user_id == user.id):
+                    raise PermissionDenied("You do not have permission to view this order's tracking.")
+            else:
+                # allow anonymous if they supply matching order email
+                if not email_param or email_param != (order.email or "").strip().lower():
+                    raise PermissionDenied("Provide the order email to view tracking or sign in.")
+        # else if order.user is None, allow (public order) or proceed
+        events = order.tracking_events.all()
+        ser = self.get_serializer(events, many=True)
+        return Response(ser.data)
+
+
+class OrderDetailAPIView(RetrieveAPIView):
+    """
+    Public order detail endpoint.
+    WARNING: This will expose full order details (items, shipping address, email) to anyone
+    who knows the order id. Use with care.
+    """
+    queryset = Order.objects.all().prefetch_related("items__product")
+    serializer_class = OrderDetailSerializer
+    permission_classes = [AllowAny]
+
+class UserCheckoutDetailCreateAPIView(generics.CreateAPIView):
+    queryset = UserCheckoutDetail.objects.all()
+    serializer_class = UserCheckoutDetailSerializer
+    permission_classes = [AllowAny]
+
+    def perform_create(self, serializer):
+        user = self.request.user if self.request.user.is_authenticated else None
+        serializer.save(user=user)
+
+
+
+
+def split_values(raw):
+    """"red, blue" -> ["red", "blue"] (multi-value query params)."""
+    return [v.strip() for v in (raw or "").split(",") if v.strip()]
+
+
+def color_exists(values):
+    """
+    EXISTS(product has any of `values`); each value is a color id, a
+    "#hex" or a name (case-insensitive).
+    """
+    match = Q()
+    for value in values:
+        if value.startswith("#"):
+            match |= Q(color__hex__lower=value.lower())
+        elif value.isdigit():
+            match |= Q(color_id=int(value))
+        else:
+            match |= Q(color__name__lower=value.lower())
+    return Exists(Product.colors.through.objects.filter(match, product_id=OuterRef("pk")))
+
+
+def size_exists(values):
+    """EXISTS(product has any of `values`); each value is a size id or label."""
+    match = Q()
+    for value in values:
+        if value.isdigit():
+            match |= Q(size_id=int(value))
+        else:
+            match |= Q(size__label__lower=value.lower())
+    return Exists(Product.sizes.through.objects.filter(match, product_id=OuterRef("pk")))
+
+
+@conditional_get(("catalog", "stock"), "list", "retrieve", "similar", "batch")
+@conditional_get("catalog", "suggest")
+class ProductViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Provides:
+      - GET /api/products/         -> list
+      - GET /api/products/{pk}/    -> retrieve (detail serializer with variant_thumbs)
+      - GET /api/products/{pk}/similar/ -> precomputed similar products
+      - GET /api/products/suggest/?q= -> typeahead from the in-memory prefix index
+      - GET|POST /api/products/batch/?ids=1,2,3 -> list cards keyed by id
+
+    List pagination is limit/offset by default. Pass `?pagination=cursor`
+    (or any `cursor=`) for keyset pagination on the current ordering, which skips
+    COUNT(*) and OFFSET so deep pages stay cheap for infinite scroll.
+
+    Filters: category, style, brand(s), search, min_price / max_price,
+    on_sale=1 (mrp above price). `ordering` is one of newest (default),
+    price, -price, rating, discount; each is served by an index.
+
+    `color` and `size` take comma-separated values (`?color=red,#000000&size=6,UK(7)`):
+    any value within a parameter matches, parameters combine with AND.
+
+    list/retrieve payloads are cached under the catalog version
+    (core.response_cache), which catalog signals bump on every edit; the
+    same version drives ETag / Last-Modified, so revalidations get a 304.
+    Orders only bump the "stock" version: cached payloads get the current
+    stock patched in, and the validators of the stock-bearing actions change.
+    """
+    queryset = Product.objects.filter(is_active=True).select_related("brand").prefetch_related("images", "colors", "sizes")
+    permission_classes = [permissions.AllowAny]
+    pagination_class = LimitOffsetPagination
+    cursor_pagination_class = KeysetPagination
+    cached_actions = ("list", "retrieve", "similar", "batch")
+    volatile_namespace = "stock"
+    batch_max_ids = 100
+
+    # ?ordering= -> ORDER BY. Each ends in id (unique, for keyset cursors)
+    # and has a matching partial index on Product.
+    orderings = {
+        "newest": ("-created", "-id"),
+        "price": ("price", "id"),
+        "-price": ("-price", "-id"),
+        "rating": ("-rating", "-id"),
+        "discount": ("-discount", "-id"),
+    }
+    # spellings the storefront already sends
+    ordering_aliases = {"-created": "newest", "-rating": "rating", "-discount": "discount"}
+
+    def refresh_payload(self, data):
+        return inventory.fresh_stock(data)
+
+    def uses_cursor_pagination(self):
+        params = self.request.query_params
+        return params.get("pagination") == "cursor" or "cursor" in params
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if self.uses_cursor_pagination():
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    # default serializer for list (lighter) and detail (richer)
+    def get_serializer_class(self):
+        if self.action == "retrieve":
+            return ProductDetailSerializer
+        return ProductSerializer
+
+    def list(self, request, *args, **kwargs):
+        if not getattr(settings, "PRODUCT_LIST_FAST_RENDER", True):
+            return super().list(request, *args, **kwargs)
+        return self.cached_response("list", self.fast_list, request, *args, **kwargs)
+
+    def fast_list(self, request, *args, **kwargs):
+        """
+        List action without model instances or nested serializers: paginate
+        over (id, sort columns) only, then build the page with core.fast_render.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        sort_columns = [name.lstrip("-") for name in self.get_ordering()]
+        rows = queryset.select_related(None).prefetch_related(None).values("id", *sort_columns)
+        page = self.paginate_queryset(rows)
+        ids = [row["id"] for row in (page if page is not None else rows)]
+        data = render_products(ids, request, fields=self.get_requested_fields())
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    @action(detail=True, methods=["get"])
+    def similar(self, request, pk=None):
+        """
+        GET /api/products/{id}/similar/?limit=8 -> precomputed neighbours
+        (core.recommendations), best first, as list cards with a `score`.
+        """
+        return self.cached_response("similar", self.similar_list, request, pk=pk)
+
+    def similar_list(self, request, pk=None):
+        product = get_object_or_404(Product, pk=pk, is_active=True)
+        try:
+            limit = int(request.query_params.get("limit", 8))
+        except ValueError:
+            limit = 8
+        limit = max(1, min(limit, recommendations.top_k()))
+        links = list(
+            SimilarProduct.objects.filter(product=product, similar__is_active=True)
+            .order_by("rank")
+            .values_list("similar_id", "score")[:limit]
+        )
+        cards = render_products([pid for pid, _ in links], request, fields=self.get_requested_fields())
+        for card, (_, score) in zip(cards, links):
+            card["score"] = score
+        return Response({"product": product.pk, "results": cards})
+
+    @action(detail=False, methods=["get", "post"])
+    def batch(self, request):
+        """
+        GET /api/products/batch/?ids=1,2,3 (or POST {"ids": [...]} for long
+        lists) -> {"results": {id: card}, "missing": [ids]} in request order.
+        One product query plus the fixed relation queries of render_products;
+        unknown or inactive ids are listed in `missing` instead of a 404.
+        Only GET is cached (the cache key is built from the query string).
+        """
+        if request.method == "GET":
+            return self.cached_response("batch", self.batch_lookup, request)
+        return self.batch_lookup(request)
+
+    def batch_lookup(self, request):
+        if request.method == "GET":
+            raw = split_values(",".join(request.query_params.getlist("ids")))
+        else:
+            raw = request.data.get("ids", []) if hasattr(request.data, "get") else []
+            if isinstance(raw, str):
+                raw = split_values(raw)
+            elif not isinstance(raw, list):
+                raise serializers.ValidationError({"ids": ["Expected a list of product ids."]})
+        try:
+            ids = list(dict.fromkeys(int(value) for value in raw))
+        except (TypeError, ValueError):
+            raise serializers.ValidationError({"ids": ["Product ids must be integers."]})
+        if len(ids) > self.batch_max_ids:
+            raise serializers.ValidationError({"ids": [f"At most {self.batch_max_ids} ids per request."]})
+
+        # the cards are keyed by id, so it is always rendered
+        fields = self.get_requested_fields() | {"id"}
+        cards = render_products(ids, request, fields=fields, active_only=True)
+        results = {card["id"]: card for card in cards}
+        return Response({
+            "results": results,
+            "missing": [pk for pk in ids if pk not in results],
+        })
+
+    @action(detail=False, methods=["get"])
+    def suggest(self, request):
+        """
+        GET /api/products/suggest/?q=bla&limit=8 -> matching brands / styles
+        and product cards, most popular first (core.suggest). The only query
+        is the catalog version lookup the ETag already needs, unless the
+        catalog changed since the index was built.
+        """
+        try:
+            limit = int(request.query_params.get("limit", 8))
+        except ValueError:
+            limit = 8
+        limit = max(1, min(limit, 20))
+        query = request.query_params.get("q", "")
+        terms, products = suggest_index.suggest(
+            query, limit=limit, term_limit=min(limit, 5), version=request_state(request)[0],
+        )
+        thumb_width = min(resize_widths())
+        return Response({
+            "query": query,
+            "terms": [
+                {"type": kind, "label": label, "value": value, "count": count}
+                for kind, label, value, count in terms
+            ],
+            "products": [
+                {
+                    "id": pk,
+                    "slug": slug,
+                    "title": title,
+                    "subtitle": subtitle,
+                    "price": str(price),
+                    "image": request.build_absolute_uri(resized_url(image, thumb_width)) if image else None,
+                }
+                for pk, slug, title, subtitle, price, image in products
+            ],
+        })
+
+    def get_ordering(self):
+        """ORDER BY for `?ordering=`; unknown values fall back to newest first."""
+        key = self.request.query_params.get("ordering") or "newest"
+        key = self.ordering_aliases.get(key, key)
+        return self.orderings.get(key, self.orderings["newest"])
+
+    def get_decimal_param(self, name):
+        raw = self.request.query_params.get(name)
+        if raw in (None, ""):
+            return None
+        try:
+            value = Decimal(raw)
+        except InvalidOperation:
+            value = None
+        if value is None or not value.is_finite():
+            raise serializers.ValidationError({name: ["A valid number is required."]})
+        return value
+
+    def get_sparse_fields(self):
+        """
+        Parse `?fields=id,title,price` / `?omit=description` into
+        (allow-list or None, deny-list).
+        """
+        def parse(name):
+            raw = self.request.query_params.get(name)
+            if raw is None:
+                return None
+            return {f.strip() for f in raw.split(",") if f.strip()}
+
+        return parse("fields"), parse("omit") or set()
+
+    def get_requested_fields(self):
+        """Names of the serializer fields this request will actually emit."""
+        only, omit = self.get_sparse_fields()
+        names = set(self.get_serializer_class().Meta.fields)
+        if only is not None:
+            names &= only
+        return names - omit
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"], context["omit"] = self.get_sparse_fields()
+        return context
+
+    def get_queryset(self):
+        # reuse filters from your previous ProductList.get_queryset
+        qs = Product.objects.filter(is_active=True).order_by(*self.get_ordering())
+
+        # only join / prefetch / load what the (possibly sparse) payload needs
+        wanted = self.get_requested_fields()
+        if "brand" in wanted:
+            qs = qs.select_related("brand")
+        prefetches = [name for name in ("colors", "sizes") if name in wanted]
+        if wanted & {"images", "variant_thumbs"}:
+            prefetches.append(ordered_images_prefetch())
+        if "variants" in wanted:
+            # retired sizes' variants stay for old orders but are not on sale
+            prefetches.append(Prefetch("variants", queryset=inventory.current_variants().select_related("size")))
+        if prefetches:
+            qs = qs.prefetch_related(*prefetches)
+        only, omit = self.get_sparse_fields()
+        if only is not None or omit:
+            columns = {f.name for f in Product._meta.concrete_fields} & wanted
+            if "main_image" in wanted:
+                columns.add("primary_image")
+            sort_columns = [name.lstrip("-") for name in self.get_ordering()]
+            qs = qs.only("id", *sort_columns, *sorted(columns))
+
+        category = self.request.query_params.get("category")
+        if category:
+            qs = qs.filter(category__lower=category.lower())
+
+        q = self.request.query_params.get("search")
+        if q:
+            # ranked by relevance unless an explicit ?ordering= is asked for,
+            # or in cursor mode, which seeks on the ordering columns
+            ranked = not self.uses_cursor_pagination() and "ordering" not in self.request.query_params
+            qs = search.filter_products(qs, q, ranked=ranked)
+
+        min_price = self.get_decimal_param("min_price")
+        if min_price is not None:
+            qs = qs.filter(price__gte=min_price)
+        max_price = self.get_decimal_param("max_price")
+        if max_price is not None:
+            qs = qs.filter(price__lte=max_price)
+        if self.request.query_params.get("on_sale", "").lower() in ("1", "true", "yes"):
+            qs = qs.filter(discount__gt=0)
+
+        style = self.request.query_params.get("style")
+        if style:
+            qs = qs.filter(style__lower=style.lower())
+
+        brand = self.request.query_params.get("brands") or self.request.query_params.get("brand")
+        if brand:
+            if brand.isdigit():
+                qs = qs.filter(brand__id=int(brand))
+            else:
+                qs = qs.filter(brand__slug=brand)
+
+        # sizes / colors are EXISTS subqueries rather than joins: no row
+        # fan-out, so no DISTINCT, and the ordered index walk is kept
+        colors = split_values(self.request.query_params.get("color"))
+        if colors:
+            qs = qs.filter(color_exists(colors))
+
+        sizes = split_values(self.request.query_params.get("size"))
+        if sizes:
+            qs = qs.filter(size_exists(sizes))
+
+        return qs
+
+
+@conditional_get("catalog", "get")
+class FiltersForCategory(APIView):
+    """
+    GET /api/filters/?category=mens[&style=..&brand=..&color=..&size=..]
+
+    Served from the in-memory facet index (core.facets); every entry carries
+    a `count` for the current filter combination.
+    """
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        category = params.get("category", "womens")
+        data = facet_index.facets(
+            category=category,
+            version=request_state(request)[0],
+            style=params.get("style"),
+            size=params.get("size"),
+            brand=params.get("brands") or params.get("brand"),
+            color=params.get("color"),
+        )
+        return Response(data, status=status.HTTP_200_OK)
+
+
+@conditional_get("navbar", "get")
+class NavbarDetail(generics.RetrieveAPIView):
+    queryset = Navbar.objects.all().order_by("-id")
+    serializer_class = NavbarSerializer
+
+    def get_object(self):
+        return self.queryset.first()
+
+
+class CatalogCacheStats(APIView):
+    """
+    GET /api/cache-stats/ (staff) -> hit / miss counters of the product
+    response cache per action (core.response_cache); DELETE resets them.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(cache_stats(ProductViewSet.cached_actions))
+
+    def delete(self, request, *args, **kwargs):
+        reset_cache_stats(ProductViewSet.cached_actions)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# ---- Cart & CartItem viewsets (unchanged behaviour, only small improvements) ----
+def serialize_cart(cart, request):
+    """
+    Cart payload for `request`: the compact line list with `?view=compact`,
+    else the full CartSerializer shape. Items and everything they render are
+    prefetched, so the query count does not grow with the number of lines.
+    `cart` may also be the visitor's ephemeral cart (core.cart_store).
+    """
+    compact = request.query_params.get("view") == "compact"
+    if cart is None:
+        cart = cart_store.EphemeralCart(cart_store.load(request), compact=compact)
+    else:
+        prefetch_related_objects([cart], cart_items_prefetch(compact=compact))
+    serializer_class = CompactCartSerializer if compact else CartSerializer
+    return serializer_class(cart, context={"request": request}).data
+
+
+def ops_error(exc):
+    return Response({"ops": {str(exc.index): [str(exc)]}}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class CartViewSet(viewsets.GenericViewSet,
+                  mixins.RetrieveModelMixin,
+                  mixins.CreateModelMixin,
+                  mixins.UpdateModelMixin,
+                  mixins.DestroyModelMixin,
+                  mixins.ListModelMixin):
+    """
+    Exposes:
+      - GET /api/cart/my/
+      - GET /api/cart/my/summary/ (stored item_count / subtotal only)
+      - POST /api/cart/my/ops/ (batched add / set / remove on the visitor's cart)
+      - POST /api/cart/
+      - GET/PUT/PATCH /api/cart/{id}/
+      - POST /api/cart/{id}/add_item/
+      - POST /api/cart/{id}/remove_item/
+      - POST /api/cart/{id}/ops/ (batched add / set / remove)
+
+    Every cart response accepts `?view=compact` (see serialize_cart).
+
+    The "my" routes never create a cart on read. An anonymous visitor gets a
+    Cart row with the first my/ops/ write, or none at all with an ephemeral
+    store (core.cart_store), whose lines are merged into the user's cart by
+    the first "my" request after login.
+    """
+    serializer_class = CartSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.is_authenticated:
+            return Cart.objects.filter(user=user)
+        return Cart.objects.none()
+
+    def perform_create(self, serializer):
+        if self.request.user.is_authenticated:
+            cart = serializer.save(user=self.request.user)
+        else:
+            cart = serializer.save()
+            try:
+                self.request.session['cart_id'] = cart.id
+            except Exception:
+                pass
+        return cart
+
+    def get_object(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        pk = self.kwargs.get(lookup_url_kwarg or 'pk')
+        try:
+            cart = Cart.objects.get(pk=pk)
+        except Cart.DoesNotExist:
+            raise NotFound("Cart not found.")
+
+        user = self.request.user
+        if user.is_authenticated:
+            if cart.user_id != user.id:
+                raise PermissionDenied("You do not have permission to access this cart.")
+            return cart
+
+        session_cart_id = None
+        try:
+            session_cart_id = self.request.session.get('cart_id')
+        except Exception:
+            session_cart_id = None
+
+        if cart.user is None and (session_cart_id is None or str(session_cart_id) == str(cart.id)):
+            if session_cart_id is None:
+                try:
+                    self.request.session['cart_id'] = cart.id
+                except Exception:
+                    pass
+            return cart
+
+        raise PermissionDenied("You do not have permission to access this cart.")
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        return cart_store.write(request, response)
+
+    def my_cart(self, request, create=False):
+        """
+        The visitor's Cart row: the user's (created on demand, ephemeral
+        lines merged in) or the session's. None for an anonymous visitor
+        without one, unless `create` and no ephemeral store is configured.
+        """
+        user = request.user
+        if user.is_authenticated:
+            cart, _ = Cart.objects.get_or_create(user=user)
+            cart_store.promote(request, cart)
+            return cart
+
+        session_cart_id = request.session.get('cart_id')
+        if session_cart_id:
+            cart = Cart.objects.filter(pk=session_cart_id).first()
+            if cart is not None:
+                return cart
+        if not create or cart_store.get_store() is not None:
+            return None
+
+        cart = Cart.objects.create()
+        try:
+            request.session['cart_id'] = cart.id
+        except Exception:
+            pass
+        return cart
+
+    @action(detail=False, methods=["get"], url_path="my")
+    def my(self, request):
+        return Response(serialize_cart(self.my_cart(request), request))
+
+    @action(detail=False, methods=["get"], url_path="my/summary")
+    def my_summary(self, request):
+        """
+        GET /api/cart/my/summary/ -> {"id", "item_count", "subtotal"} from the
+        stored totals (core.carts): one cart row, no items, nothing created.
+        """
+        if request.user.is_authenticated:
+            if cart_store.load(request):
+                self.my_cart(request)
+            qs = Cart.objects.filter(user=request.user)
+        else:
+            session_cart_id = request.session.get("cart_id")
+            qs = Cart.objects.filter(pk=session_cart_id, user__isnull=True) if session_cart_id else Cart.objects.none()
+        row = qs.order_by("pk").values("id", "item_count", "subtotal").first()
+        if row is None:
+            cart = cart_store.EphemeralCart(cart_store.load(request), compact=True)
+            return Response({"id": None, "item_count": cart.item_count, "subtotal": str(cart.subtotal)})
+        row["subtotal"] = str(row["subtotal"])
+        return Response(row)
+
+    @action(detail=False, methods=["post"], url_path="my/ops")
+    def my_ops(self, request):
+        """
+        POST /api/cart/my/ops/: like /api/cart/{id}/ops/ on the visitor's own
+        cart, which is created here for an anonymous visitor's first add (or
+        kept in the ephemeral store).
+        """
+        serializer = CartOpsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ops = serializer.validated_data["ops"]
+        cart = self.my_cart(request, create=True)
+        try:
+            if cart is None:
+                cart_store.save(request, cart_store.apply_ops(cart_store.load(request), ops))
+            else:
+                carts.apply_ops(cart, ops)
+        except carts.CartOpError as exc:
+            return ops_error(exc)
+        return Response(serialize_cart(cart, request), status=status.HTTP_200_OK)
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(serialize_cart(self.get_object(), request))
+
+    @action(detail=True, methods=["post"])
+    def add_item(self, request, pk=None):
+        cart = self.get_object()
+        serializer = CartAddItemSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quantity = serializer.validated_data["quantity"]
+        size = serializer.validated_data["size"] or ""
+
+        product = get_object_or_404(Product, pk=serializer.validated_data["product_id"])
+        variant = inventory.find_variant(product.pk, size)
+        if variant is None:
+            return Response({"size": inventory.size_error(product.title, size)}, status=status.HTTP_400_BAD_REQUEST)
+
+        carts.add_line(cart, product, size, quantity, variant)
+
+        try:
+            if request.user.is_anonymous:
+                request.session.setdefault('cart_id', cart.id)
+        except Exception:
+            pass
+
+        return Response(serialize_cart(cart, request))
+        
+    def update(self, request, *args, **kwargs):
+        cart = self.get_object()
+        data = request.data.copy() if isinstance(request.data, dict) else request.data
+
+        logger.debug("[CartViewSet.update] data for update: %s", data)
+
+        # Ensure `items` is present and properly formatted (list of dicts with product_id or product keys)
+        items = data.get("items", None)
+        if items is None:
+            return Response({"detail": "No items provided"}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(items, list):
+            return Response({"detail": "items must be a list"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Use the CartSerializer.update explicitly (so nested logic runs exactly as defined)
+        serializer = self.get_serializer(cart, data=data, partial=False)
+        try:
+            serializer.is_valid(raise_exception=True)
+            updated = serializer.save()
+            return Response(serialize_cart(updated, request), status=status.HTTP_200_OK)
+        except serializers.ValidationError as ve:
+            logger.debug("[CartViewSet.update] validation errors: %s", ve.detail)
+            return Response({"detail": "validation_error", "errors": ve.detail}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as exc:
+            logger.exception("Cart update save failed")
+            return Response({"detail": "update_failed", "error": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+    @action(detail=True, methods=["post"], url_path="remove_item")
+    def remove_item(self, request, pk=None):
+        cart = self.get_object()
+        payload = request.data or {}
+
+        cart_item_id = payload.get("cartItemId") or payload.get("cart_item_id") or payload.get("id")
+        product_id = payload.get("productId") or payload.get("product_id")
+        size = (payload.get("size") or "").strip()
+
+        if cart_item_id:
+            qs = CartItem.objects.filter(pk=cart_item_id, cart=cart)
+        elif product_id:
+            qs = CartItem.objects.filter(cart=cart, product_id=product_id)
+            if size != "":
+                qs = qs.filter(size=size)
+        else:
+            return Response({"detail": "Provide cartItemId or productId"}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            quantity, amount = carts.items_totals(qs)
+            deleted_count, _ = qs.delete()
+            carts.apply_delta(cart, -quantity, -amount)
+        if deleted_count == 0:
+            if cart_item_id:
+                return Response({"detail": "Cart item not found"}, status=status.HTTP_404_NOT_FOUND)
+            return Response({"detail": "No matching cart item(s) found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(serialize_cart(cart, request), status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["post"])
+    def ops(self, request, pk=None):
+        """
+        POST /api/cart/{id}/ops/ with {"ops": [{"op": "add" | "set" | "remove",
+        "product_id", "size", "quantity"}, ...]}: applied in order, all or
+        nothing (core.carts.apply_ops), then the cart is rendered once.
+        """
+        cart = self.get_object()
+        serializer = CartOpsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            carts.apply_ops(cart, serializer.validated_data["ops"])
+        except carts.CartOpError as exc:
+            return ops_error(exc)
+        return Response(serialize_cart(cart, request), status=status.HTTP_200_OK)
+
+
+class CartItemViewSet(viewsets.GenericViewSet,
+                      mixins.DestroyModelMixin,
+                      mixins.RetrieveModelMixin,
+                      mixins.ListModelMixin):
+    """
+    DELETE /api/cart-items/<id>/  -> deletes a single CartItem and returns the updated cart
+    GET /api/cart-items/          -> list items for current user/session (optional)
+    """
+    serializer_class = CartItemSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.is_authenticated:
+            return CartItem.objects.filter(cart__user=user).select_related("cart", "product")
+        session_cart_id = None
+        try:
+            session_cart_id = self.request.session.get('cart_id')
+        except Exception:
+            session_cart_id = None
+        if session_cart_id:
+            return CartItem.objects.filter(cart_id=session_cart_id).select_related("cart", "product")
+        return CartItem.objects.none()
+
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()  # will ensure permissions/404
+        cart = instance.cart
+        with transaction.atomic():
+            instance.delete()
+            carts.apply_delta(cart, -instance.quantity, -carts.line_amount(instance.product.price, instance.quantity))
+        # return updated cart (request in context so image URLs are absolute)
+        return Response(serialize_cart(cart, request), status=status.HTTP_200_OK)
+
+
+class OrderCreateAPIView(CreateAPIView):
+    serializer_class = OrderCreateSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def create(self, request, *args, **kwargs):
+        try:
+            data = request.data.copy()
+            cart_id = data.get("cart_id")
+            if cart_id and not data.get("items"):
+                try:
+                    cart = Cart.objects.get(pk=cart_id)
+                except Cart.DoesNotExist:
+                    return Response({"cart_id": "Invalid cart_id"}, status=status.HTTP_400_BAD_REQUEST)
+                data["items"] = []
+                for ci in cart.items.all():
+                    data["items"].append({
+                        "product": ci.product_id,
+                        "variant": ci.variant_id,
+                        "quantity": ci.quantity,
+                        "size": ci.size
+                    })
+            # an anonymous visitor's ephemeral cart (core.cart_store)
+            from_store = not cart_id and not data.get("items")
+            if from_store:
+                data["items"] = [
+                    {"product": pid, "quantity": quantity, "size": size}
+                    for pid, size, quantity in cart_store.load(request)
+                ]
+            serializer = self.get_serializer(data=data)
+            serializer.is_valid(raise_exception=True)
+            order = serializer.save()
+            if cart_id:
+                try:
+                    carts.clear(Cart.objects.get(pk=cart_id))
+                except Cart.DoesNotExist:
+                    pass
+            response = Response({"order_id": order.id, "message": "Order created"}, status=status.HTTP_201_CREATED)
+            if from_store:
+                cart_store.save(request, [])
+                cart_store.write(request, response)
+            return response
+        except serializers.ValidationError:
+            # out of stock / unknown size: a 400, not a server error
+            raise
+        except Exception as exc:
+            logger.exception("Error creating order")
+            return Response({"detail": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
@@ -0,0 +1,59 @@
+# core/views_export.py
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import permissions
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.views import APIView
+
+from .exports import FORMATS, export_stream
+
+TRUE_VALUES = {"1", "true", "yes"}
+
+
+def _parse_moment(value, name):
+    if not value:
+        return None
+    try:
+        moment = parse_datetime(value) or parse_date(value)
+    except ValueError:
+        # well formed but not a real date, e.g. 2024-13-40
+        moment = None
+    if moment is None:
+        raise ValidationError({name: "Expected an ISO date or datetime."})
+    return moment
+
+
+class ExportAPIView(APIView):
+    """
+    GET /api/export/<dataset>.<fmt>   (staff only)
+
+    Streams every row of `dataset` ("products" or "orders") as NDJSON or CSV.
+    `?gzip=1` compresses on the fly and serves a .gz attachment. Orders take
+    optional `?since=` / `?until=` ISO dates (created >= since, < until).
+    """
+    permission_classes = [permissions.IsAdminUser]
+    datasets = ("products", "orders")
+
+    def get(self, request, dataset, fmt):
+        if dataset not in self.datasets or fmt not in FORMATS:
+            raise NotFound()
+        filters = {}
+        if dataset == "orders":
+            filters["since"] = _parse_moment(request.query_params.get("since"), "since")
+            filters["until"] = _parse_moment(request.query_params.get("until"), "until")
+        compress = request.query_params.get("gzip", "").lower() in TRUE_VALUES
+
+        filename = f"{dataset}.{fmt}"
+        content_type = FORMATS[fmt]
+        if compress:
+            filename += ".gz"
+            content_type = "application/gzip"
+        response = StreamingHttpResponse(
+            export_stream(dataset, fmt, compress=compress, **filters),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["Cache-Control"] = "no-store"
+        # stop nginx from buffering the stream so the download starts at once
+        response["X-Accel-Buffering"] = "no"
+        return response
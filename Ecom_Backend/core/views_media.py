@@ -0,0 +1,184 @@
+# core/views_media.py
+import mimetypes
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.encoding import filepath_to_uri
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .images import FORMATS, get_resize_cache, is_allowed_size, source_path
+from .storage import is_hashed_name
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def media_cache_control(path):
+    """Immutable for content-hashed names (HashedMediaStorage), MEDIA_CACHE_MAX_AGE otherwise."""
+    if is_hashed_name(path):
+        return IMMUTABLE_CACHE_CONTROL
+    return f"public, max-age={getattr(settings, 'MEDIA_CACHE_MAX_AGE', 3600)}"
+
+
+@require_safe
+def resized_media(request, width, height, path):
+    """
+    GET /media/r/<w>x<h>/<path> -> resized WebP/JPEG variant of a media file.
+    See core.images for the size whitelist and the disk LRU cache.
+    """
+    width, height = int(width), int(height)
+    if not is_allowed_size(width, height):
+        raise Http404("Unsupported image size.")
+    try:
+        source = source_path(path)
+    except SuspiciousFileOperation:
+        raise Http404("Image not found.")
+    if not source.is_file():
+        raise Http404("Image not found.")
+
+    fmt = "webp" if "image/webp" in request.META.get("HTTP_ACCEPT", "") else "jpeg"
+    cache = get_resize_cache()
+    _, digest = cache.variant_path(source, width, height, fmt)
+    etag = f'"{digest}"'
+    if etag in request.META.get("HTTP_IF_NONE_MATCH", ""):
+        response = HttpResponseNotModified()
+    else:
+        try:
+            handle = cache.open(source, width, height, fmt)
+        except (OSError, ValueError):
+            # not an image Pillow can read, or one past its decompression
+            # bomb limit (images.ImageTooLarge)
+            raise Http404("Image not found.")
+        response = FileResponse(handle, content_type=FORMATS[fmt][1])
+    response["ETag"] = etag
+    # a new upload under the same plain name must reach clients
+    response["Cache-Control"] = media_cache_control(path)
+    patch_vary_headers(response, ("Accept",))
+    return response
+
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(header, size):
+    """
+    Parse a single-range `Range: bytes=a-b` header.
+    Returns (start, end) inclusive, None to ignore the header, or "invalid".
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None  # multi-range or unknown unit: serve the whole file
+    first, last = match.groups()
+    if first == "" and last == "":
+        return None
+    if first == "":
+        length = int(last)
+        if length == 0:
+            return "invalid"
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return "invalid"
+    return start, min(end, size - 1)
+
+
+class _RangeFile:
+    """File wrapper streaming only bytes [start, end] of `handle`."""
+
+    def __init__(self, handle, start, end, block_size=64 * 1024):
+        self.handle = handle
+        self.remaining = end - start + 1
+        self.block_size = block_size
+        handle.seek(start)
+
+    def __iter__(self):
+        while self.remaining > 0:
+            chunk = self.handle.read(min(self.block_size, self.remaining))
+            if not chunk:
+                break
+            self.remaining -= len(chunk)
+            yield chunk
+
+    def close(self):
+        self.handle.close()
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Production media serving for MEDIA_ROOT uploads.
+
+    - conditional GET via ETag (mtime + size) and Last-Modified
+    - single byte Range requests (206 / 416)
+    - names written by HashedMediaStorage get an immutable far-future
+      Cache-Control, others MEDIA_CACHE_MAX_AGE
+    - with MEDIA_SENDFILE = "nginx" / "apache" the bytes are offloaded to
+      the front server via X-Accel-Redirect / X-Sendfile
+    """
+    try:
+        full_path = Path(safe_join(str(settings.MEDIA_ROOT), path))
+    except SuspiciousFileOperation:
+        raise Http404("File not found.")
+    try:
+        stat = full_path.stat()
+    except OSError:
+        raise Http404("File not found.")
+    if not full_path.is_file():
+        raise Http404("File not found.")
+
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = http_date(stat.st_mtime)
+    cache_control = media_cache_control(path)
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        response = _media_body(request, full_path, path, stat.st_size)
+    response["ETag"] = etag
+    response["Last-Modified"] = last_modified
+    response["Cache-Control"] = cache_control
+    return response
+
+
+def _media_body(request, full_path, path, size):
+    content_type, encoding = mimetypes.guess_type(str(full_path))
+    content_type = content_type or "application/octet-stream"
+
+    sendfile = getattr(settings, "MEDIA_SENDFILE", None)
+    if sendfile:
+        # front server streams the file and handles Range itself
+        response = HttpResponse(content_type=content_type)
+        if sendfile == "nginx":
+            prefix = getattr(settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+            response["X-Accel-Redirect"] = prefix + filepath_to_uri(path)
+        else:
+            response["X-Sendfile"] = str(full_path)
+        return response
+
+    byte_range = None
+    if "HTTP_RANGE" in request.META and "HTTP_IF_RANGE" not in request.META:
+        byte_range = _parse_range(request.META["HTTP_RANGE"], size)
+    if byte_range == "invalid":
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    handle = open(full_path, "rb")
+    if byte_range is None:
+        response = FileResponse(handle, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_RangeFile(handle, start, end), status=206, content_type=content_type)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(end - start + 1)
+    if encoding:
+        response["Content-Encoding"] = encoding
+    response["Accept-Ranges"] = "bytes"
+    return response
@@ -1,9 +1,10 @@
-from django.apps import AppConfig
-
-
-class PagesConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'pages'
-    
-    def ready(self):
-        import core.signals 
\ No newline at end of file
+from django.apps import AppConfig
+
+
+class PagesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'pages'
+    
+    def ready(self):
+        import core.signals
+        import pages.versioning  # noqa 
\ No newline at end of file
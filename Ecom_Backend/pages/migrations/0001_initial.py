@@ -1,93 +1,93 @@
-# Generated by Django 5.2.6 on 2025-09-19 01:16
-
-import django.db.models.deletion
-from django.db import migrations, models
-
-
-class Migration(migrations.Migration):
-
-    initial = True
-
-    dependencies = [
-    ]
-
-    operations = [
-        migrations.CreateModel(
-            name='AboutPage',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('section1_title', models.CharField(max_length=255)),
-                ('section1_content', models.TextField()),
-                ('section2_title', models.CharField(max_length=255)),
-                ('section2_content', models.TextField()),
-                ('overlay_image1', models.ImageField(upload_to='about/')),
-                ('overlay_image2', models.ImageField(upload_to='about/')),
-            ],
-        ),
-        migrations.CreateModel(
-            name='Banner',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('image', models.ImageField(upload_to='banners/')),
-                ('overlay_text', models.CharField(blank=True, max_length=200, null=True)),
-                ('button_text', models.CharField(default='Shop Now', max_length=50)),
-                ('button_link', models.URLField(default='#', max_length=300)),
-            ],
-        ),
-        migrations.CreateModel(
-            name='Category',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('title', models.CharField(max_length=100)),
-                ('image', models.ImageField(upload_to='categories/')),
-            ],
-        ),
-        migrations.CreateModel(
-            name='ContactPage',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('title', models.CharField(max_length=200)),
-                ('description', models.TextField()),
-                ('image', models.ImageField(upload_to='contact/')),
-                ('form_title', models.CharField(default='Enquiry Form', max_length=200)),
-                ('created_at', models.DateTimeField(auto_now_add=True)),
-                ('updated_at', models.DateTimeField(auto_now=True)),
-            ],
-        ),
-        migrations.CreateModel(
-            name='ContactSubmission',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('name', models.CharField(max_length=100)),
-                ('email', models.EmailField(max_length=254)),
-                ('phone', models.CharField(blank=True, max_length=20)),
-                ('message', models.TextField()),
-                ('submitted_at', models.DateTimeField(auto_now_add=True)),
-            ],
-        ),
-        migrations.CreateModel(
-            name='Overview',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('title', models.CharField(max_length=200)),
-                ('description', models.TextField()),
-            ],
-        ),
-        migrations.CreateModel(
-            name='AboutImage',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('image', models.ImageField(upload_to='about/')),
-                ('about_page', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='pages.aboutpage')),
-            ],
-        ),
-        migrations.CreateModel(
-            name='AboutFeature',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('title', models.CharField(max_length=255)),
-                ('text', models.TextField()),
-                ('about_page', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='features', to='pages.aboutpage')),
-            ],
-        ),
-    ]
+# Generated by Django 5.2.6 on 2025-09-19 01:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AboutPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section1_title', models.CharField(max_length=255)),
+                ('section1_content', models.TextField()),
+                ('section2_title', models.CharField(max_length=255)),
+                ('section2_content', models.TextField()),
+                ('overlay_image1', models.ImageField(upload_to='about/')),
+                ('overlay_image2', models.ImageField(upload_to='about/')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Banner',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.ImageField(upload_to='banners/')),
+                ('overlay_text', models.CharField(blank=True, max_length=200, null=True)),
+                ('button_text', models.CharField(default='Shop Now', max_length=50)),
+                ('button_link', models.URLField(default='#', max_length=300)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=100)),
+                ('image', models.ImageField(upload_to='categories/')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ContactPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('image', models.ImageField(upload_to='contact/')),
+                ('form_title', models.CharField(default='Enquiry Form', max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ContactSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('email', models.EmailField(max_length=254)),
+                ('phone', models.CharField(blank=True, max_length=20)),
+                ('message', models.TextField()),
+                ('submitted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Overview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AboutImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.ImageField(upload_to='about/')),
+                ('about_page', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='pages.aboutpage')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AboutFeature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('text', models.TextField()),
+                ('about_page', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='features', to='pages.aboutpage')),
+            ],
+        ),
+    ]
@@ -1,3 +1,31 @@
-from django.test import TestCase
-
-# Create your tests here.
+from django.test import TestCase
+
+from .models import Overview
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.overview = Overview.objects.create(title="Step up", description="Shoes for everyone.")
+
+    def test_not_modified_until_content_changes(self):
+        response = self.client.get("/api/overviews/")
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertEqual(self.client.get("/api/overviews/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(
+            self.client.get("/api/overviews/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]).status_code, 304,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.overview.title = "Step up, again"
+            self.overview.save()
+        response = self.client.get("/api/overviews/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["title"], "Step up, again")
+
+    def test_catalog_changes_do_not_touch_pages(self):
+        from core.response_cache import bump_catalog_version
+
+        etag = self.client.get(f"/api/overviews/{self.overview.pk}/")["ETag"]
+        bump_catalog_version()
+        self.assertEqual(self.client.get(f"/api/overviews/{self.overview.pk}/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
@@ -0,0 +1,32 @@
+# pages/versioning.py
+"""
+Bump the "pages" content version whenever CMS content changes.
+
+The version drives the ETag / Last-Modified validators of the pages
+viewsets (see core.conditional). Imported from PagesConfig.ready().
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.response_cache import bump_content_version
+
+from .models import Banner, Overview, Category, AboutPage, AboutImage, AboutFeature, ContactPage
+
+
+@receiver(post_save, sender=Banner)
+@receiver(post_delete, sender=Banner)
+@receiver(post_save, sender=Overview)
+@receiver(post_delete, sender=Overview)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=AboutPage)
+@receiver(post_delete, sender=AboutPage)
+@receiver(post_save, sender=AboutImage)
+@receiver(post_delete, sender=AboutImage)
+@receiver(post_save, sender=AboutFeature)
+@receiver(post_delete, sender=AboutFeature)
+@receiver(post_save, sender=ContactPage)
+@receiver(post_delete, sender=ContactPage)
+def bump_pages_version(sender, **kwargs):
+    transaction.on_commit(lambda: bump_content_version("pages"))
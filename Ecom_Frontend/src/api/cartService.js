@@ -77,11 +77,11 @@ async function safeLogResponse(err, label = "response") {
 }
 
 /** Try GET candidates for cart endpoints (relative paths) */
-async function tryGetCandidates(candidates = ["cart/my/", "cart/my", "cart/", "cart"]) {
+async function tryGetCandidates(candidates = ["cart/my/", "cart/my", "cart/", "cart"], params = {}) {
   let lastErr = null;
   for (const path of candidates) {
     try {
-      const res = await api.get(path);
+      const res = await api.get(path, { params });
       const data = res?.data;
       if (Array.isArray(data)) return data[0] || { items: [] };
       return data || { items: [] };
@@ -101,37 +101,26 @@ async function tryGetCandidates(candidates = ["cart/my/", "cart/my", "cart/", "c
   throw lastErr;
 }
 
-/** Create empty cart (relative path) */
-export async function createCart() {
-  try {
-    const res = await api.post("cart/", { items: [] });
-    return res.data || { items: [] };
-  } catch (err) {
-    await safeLogResponse(err, "createCart");
-    const html = detectHtml(err?.response?.data) || err?.serverHtml;
-    const e = new Error("createCart failed");
-    e.server = err?.response?.data || err?.message || err;
-    if (html) e.serverHtml = html;
-    throw e;
-  }
+/**
+ * Get the visitor's cart. Never creates one: an anonymous visitor without a
+ * cart gets an empty cart with no id, and the first add (cart/my/ops/)
+ * stores it.
+ * Pass { view: "compact" } for flat lines (id, product_id, title, price,
+ * main_image, size, quantity, line_total) instead of nested products.
+ */
+export async function getCart({ view } = {}) {
+  return tryGetCandidates(undefined, view ? { view } : {});
 }
 
-/** Get or create cart */
-export async function getCart() {
-  try {
-    const cart = await tryGetCandidates();
-    return cart;
-  } catch (err) {
-    const status = err?.response?.status;
-    if (status === 401 || status === 403) throw err;
-    if (err?.serverHtml) throw err;
-    try {
-      const created = await createCart();
-      return created;
-    } catch (createErr) {
-      throw createErr;
-    }
-  }
+/** Anonymous carts (user null) are only written through cart/my/ops/ */
+function isAnonymous(cart) {
+  return !cart?.user;
+}
+
+/** Stored totals only: { id, item_count, subtotal } (never creates a cart) */
+export async function getCartSummary() {
+  const res = await api.get("cart/my/summary/");
+  return res.data || { id: null, item_count: 0, subtotal: "0.00" };
 }
 
 /** convenience: return cart id or null */
@@ -160,14 +149,29 @@ function mergeItems(existingItems = [], incoming = { product_id: null, quantity:
   return normalized;
 }
 
-/** updateCart wrapper (relative paths) */
+/**
+ * updateCart wrapper (relative paths). A signed-in user's cart is PUT to
+ * cart/<id>/; an anonymous cart gets the same update as ops on cart/my/ops/.
+ */
 export async function updateCart(cartId = null, payload = { items: [], replace: false }) {
   try {
-    let id = cartId;
-    if (!id) {
-      const cart = await getCart();
-      id = cart?.id;
-      if (!id) throw new Error("No cart id available");
+    const cart = await getCart();
+    const id = cartId || cart?.id;
+    if (!id || isAnonymous(cart)) {
+      const keep = new Set((payload.items || []).map((it) => `${it.product_id}_${it.size || ""}`));
+      const removed = payload.replace
+        ? (cart?.items || [])
+            .map((ci) => ({ product_id: ci.product?.id ?? ci.product_id, size: ci.size || "" }))
+            .filter((ci) => !keep.has(`${ci.product_id}_${ci.size}`))
+            .map((ci) => ({ op: "remove", ...ci }))
+        : [];
+      const set = (payload.items || []).map((it) => ({
+        op: "set",
+        product_id: it.product_id,
+        size: it.size || "",
+        quantity: Number(it.quantity || 0),
+      }));
+      return await applyCartOps(null, [...removed, ...set]);
     }
     try {
       const res = await api.put(`cart/${id}/`, payload);
@@ -189,17 +193,38 @@ export async function updateCart(cartId = null, payload = { items: [], replace:
   }
 }
 
+/**
+ * applyCartOps: batched [{ op: "add" | "set" | "remove", product_id, size, quantity }],
+ * applied in order in one request; resolves to the updated cart.
+ * Without a cartId the ops go to the visitor's own cart (cart/my/ops/), which
+ * also works for anonymous carts that have no id yet (or never get one).
+ */
+export async function applyCartOps(cartId, ops = [], { view } = {}) {
+  const res = await api.post(`cart/${cartId ?? "my"}/ops/`, { ops }, { params: view ? { view } : {} });
+  notifyUpdated();
+  return res.data;
+}
+
 /**
  * addItem
  */
 export async function addItem(productId, quantity = 1, size = "") {
   try {
-    let cart = await getCart();
-    if (!cart || !cart.id) {
-      cart = await createCart();
+    // one request, and the only one that creates an anonymous cart
+    let opsErr;
+    try {
+      return await applyCartOps(null, [{ op: "add", product_id: productId, size, quantity: Number(quantity || 1) }]);
+    } catch (err) {
+      await safeLogResponse(err, "addItem.ops");
+      const status = err?.response?.status;
+      if (status === 400 || status === 401 || status === 403) throw err;
+      opsErr = err;
     }
+
+    // anonymous carts are only written through the ops endpoint
+    const cart = await getCart();
+    if (!cart?.id || isAnonymous(cart)) throw opsErr;
     const cartId = cart.id;
-    if (!cartId) throw new Error("No cart id available");
 
     // Expanded candidate list (common variants) to increase chance of matching backend during debugging
     const paths = [
@@ -278,7 +303,16 @@ export async function removeItem({ cartId = null, cart = null, cartItemId = null
       current = await getCart();
     }
     const id = cartId || current?.id;
-    if (!id) throw new Error("No cart id to remove from");
+    if (!id || isAnonymous(current)) {
+      // anonymous: one "remove" op on cart/my/ops/, by product + size
+      let target = productId != null ? { product_id: productId, size: size || "" } : null;
+      if (!target && cartItemId != null) {
+        const line = (current?.items || []).find((ci) => String(ci.id) === String(cartItemId));
+        if (line) target = { product_id: line.product?.id ?? line.product_id, size: line.size || "" };
+      }
+      if (!target) throw new Error("No cart line to remove");
+      return await applyCartOps(null, [{ op: "remove", ...target }]);
+    }
 
     // 1) If cartItemId provided: attempt DELETE cart-items/<id>/
     if (cartItemId != null) {
@@ -383,9 +417,10 @@ export async function removeItem({ cartId = null, cart = null, cartItemId = null
 export default {
   api,
   getCart,
+  getCartSummary,
   getCartId,
-  createCart,
   addItem,
   updateCart,
+  applyCartOps,
   removeItem,
 };
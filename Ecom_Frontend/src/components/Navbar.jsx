@@ -18,12 +18,6 @@ export default function Navbar({ cartCount: cartCountProp = null }) {
     (typeof import.meta !== "undefined" ? import.meta.env.VITE_API_URL : "") ||
     "http://127.0.0.1:8000/api";
 
-  // helper to compute total quantity
-  const computeCountFromCart = useCallback((cartData) => {
-    if (!cartData || !Array.isArray(cartData.items)) return 0;
-    return cartData.items.reduce((sum, it) => sum + (Number(it.quantity) || 0), 0);
-  }, []);
-
   // fetch logo once
   useEffect(() => {
     let mounted = true;
@@ -56,16 +50,16 @@ export default function Navbar({ cartCount: cartCountProp = null }) {
   // refresh cart count (uses cartService.getCart so it respects session/token)
   const refreshCartCount = useCallback(async () => {
     try {
-      const cart = await cartService.getCart();
-      const cnt = computeCountFromCart(cart);
-      setCartCount(cnt);
+      // stored total only: no cart lines or products are loaded
+      const summary = await cartService.getCartSummary();
+      setCartCount(Number(summary?.item_count) || 0);
     } catch (err) {
       // on error, show zero (don't break UI)
       // eslint-disable-next-line no-console
       console.warn("Navbar: failed to fetch cart count", err?.response?.data || err.message || err);
       setCartCount(0);
     }
-  }, [computeCountFromCart]);
+  }, []);
 
   // get current user info from backend (optional endpoint /auth/me/)
   const fetchCurrentUser = useCallback(async () => {
@@ -90,12 +90,21 @@ export default function ProductCard({ product = {}, onAddToCart }) {
   async function handleAdd(e) {
     stop(e);
     if (adding) return;
+
+    // stock is per size: a product with several sizes needs one picked here,
+    // a single-size product uses its only size
+    const sizes = Array.isArray(product.sizes) ? product.sizes : [];
+    const chosenSize = size || (sizes.length === 1 ? String(sizes[0].label ?? sizes[0].id ?? "") : "");
+    if (sizes.length > 1 && !chosenSize) {
+      alert("Please choose a size first.");
+      return;
+    }
     setAdding(true);
 
     try {
       if (!product?.id) throw new Error("Product ID missing");
 
-      const payload = { productId: product.id, qty: Number(qty || 1), size: size || "" };
+      const payload = { productId: product.id, qty: Number(qty || 1), size: chosenSize };
 
       if (typeof onAddToCart === "function") {
         await onAddToCart(payload);
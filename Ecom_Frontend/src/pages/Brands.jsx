@@ -15,14 +15,18 @@ const makeAbsolute = (url) => {
   return url;
 };
 
-// helper to fetch a single product by id (returns null on error)
-const fetchProductById = async (id) => {
+// helper to fetch several products in one request: { [id]: product }
+// (missing / inactive ids are simply absent; empty object on error)
+const fetchProductsByIds = async (ids) => {
   try {
-    const res = await axios.get(`${API_URL}/products/${id}/`, { timeout: 10000 });
-    return res.data || null;
+    const res = await axios.get(`${API_URL}/products/batch/`, {
+      params: { ids: ids.join(",") },
+      timeout: 10000,
+    });
+    return res.data?.results || {};
   } catch (err) {
-    console.warn(`Failed to fetch product ${id}`, err);
-    return null;
+    console.warn(`Failed to fetch products ${ids.join(",")}`, err);
+    return {};
   }
 };
 
@@ -70,9 +74,9 @@ export default function Brands() {
           return { ...p, __imageSrc: makeAbsolute(img) || PLACEHOLDER };
         });
 
-        // 2) fetch kids products by id (parallel)
-        const kidsPromises = KIDS_IDS.map((id) => fetchProductById(id));
-        const kidsResults = await Promise.all(kidsPromises);
+        // 2) fetch kids + mens products by id (one batch request)
+        const byId = await fetchProductsByIds([...KIDS_IDS, ...MENS_IDS]);
+        const kidsResults = KIDS_IDS.map((id) => byId[id] || null);
         const normalizedKids = kidsResults
           .filter(Boolean)
           .map((p) => {
@@ -85,9 +89,8 @@ export default function Brands() {
             return { ...p, __imageSrc: makeAbsolute(img) || PLACEHOLDER };
           });
 
-        // 3) fetch mens products by id (parallel) - may be used after expand
-        const mensPromises = MENS_IDS.map((id) => fetchProductById(id));
-        const mensResults = await Promise.all(mensPromises);
+        // 3) mens products - may be used after expand
+        const mensResults = MENS_IDS.map((id) => byId[id] || null);
         const normalizedMens = mensResults
           .filter(Boolean)
           .map((p) => {
@@ -92,16 +92,8 @@ export default function Cart() {
     setActionLoading(true);
     setMessage("");
     try {
-      // ensure we have a cart id (getCart will create one if backend supports)
-      let cartId = cartData?.id;
-      if (!cartId) {
-        const created = await cartService.getCart(); // will try GET then POST create
-        cartId = created?.id;
-      }
-      if (!cartId) {
-        setMessage("No cart available to update.");
-        return null;
-      }
+      // a null id is fine: cartService then updates the visitor's own cart (cart/my/)
+      const cartId = cartData?.id ?? null;
 
       const payload = {
         items: buildPayloadItems(items),
@@ -181,9 +181,10 @@ export default function Checkout() {
       }
 
       // 2) Place order
-      if (cartId && !(location.state && location.state.fromBuyNow)) {
+      // cart order: by cart_id, or (anonymous cart kept outside the database) the server-side cart
+      if (!(location.state && location.state.fromBuyNow)) {
         const payload = {
-          cart_id: cartId,
+          ...(cartId ? { cart_id: cartId } : {}),
           fullname: `${form.first_name} ${form.last_name}`.trim(),
           email: form.email,
           shipping_address: form.address_line1 + (form.landmark ? ` | ${form.landmark}` : ""),
@@ -264,34 +264,19 @@ export default function WomensPage() {
     [fetchCartPreview]
   );
 
-  // Update entire cart items (sync) via cartService.updateCart
+  // Update entire cart items (sync) via cartService.updateCart, which turns
+  // the update into ops on cart/my/ops/ for anonymous visitors
   // items should be array of { productId, quantity, size }
   const updateCart = useCallback(
     async (items = []) => {
       try {
         setCartLoading(true);
-        // get or create cart
-        let cart = await cartService.getCart();
-        if (!cart || !cart.id) {
-          // try cartService.createCart if available
-          if (typeof cartService.createCart === "function") {
-            const create = await cartService.createCart({ items: [] });
-            cart = create;
-          } else {
-            // fallback: create via API directly
-            const createdRes = await axios.post(`${normalizedApi}/cart/`, { items: [] });
-            cart = createdRes.data;
-          }
-        }
-        const id = cart?.id;
-        if (!id) throw new Error("Could not obtain cart id to update");
-
         const payload = {
           items: items.map((it) => ({ product_id: it.productId, quantity: it.quantity, size: it.size || "" })),
           replace: true,
         };
 
-        await cartService.updateCart(id, payload);
+        await cartService.updateCart(null, payload);
         await fetchCartPreview();
       } catch (err) {
         console.error("Failed to update cart", err);
@@ -300,26 +285,15 @@ export default function WomensPage() {
         setCartLoading(false);
       }
     },
-    [fetchCartPreview, normalizedApi]
+    [fetchCartPreview]
   );
 
-  // Remove a single cart item by fetching current cart and rewriting without that item
+  // Remove a single cart item with one "remove" op on the visitor's cart
   const removeItemFromCart = useCallback(
     async (productId, size = "") => {
       try {
         setCartLoading(true);
-        const cart = await cartService.getCart();
-        if (!cart || !cart.items) return;
-        const remaining = cart.items.filter(
-          (it) => !(it.product?.id === productId && (it.size || "") === (size || ""))
-        );
-        const payloadItems = remaining.map((it) => ({
-          product_id: it.product.id,
-          quantity: it.quantity,
-          size: it.size || "",
-        }));
-        // update server cart to remaining items (replace)
-        await cartService.updateCart(cart.id, { items: payloadItems, replace: true });
+        await cartService.applyCartOps(null, [{ op: "remove", product_id: productId, size: size || "" }], { view: "compact" });
         await fetchCartPreview();
       } catch (err) {
         console.error("Failed to remove item from cart", err);